@@ -1,7 +1,13 @@
 from playwright.sync_api import sync_playwright, TimeoutError
-import json
 import time
 from datetime import datetime
+import os
+import sys
+
+# Shared scraping helpers live in scrape_data/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape_data"))
+from ndjson_sink import write_json_array
+from rate_limiter import AdaptiveRateLimiter, BACKOFF_STATUSES
 
 def get_recipe_urls(page, page_url):
     """Get all recipe URLs from the page using specific HTML structure"""
@@ -48,7 +54,9 @@ def get_recipe_urls(page, page_url):
         print(f"Error finding links: {str(e)}")
         return []
 
-def scrape_recipes(url, max_retries=3):
+def scrape_recipes(url, max_retries=3, limiter=None):
+    # Backs off on 429/5xx and timeouts instead of retrying on a fixed timer
+    limiter = limiter or AdaptiveRateLimiter()
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(
@@ -60,7 +68,11 @@ def scrape_recipes(url, max_retries=3):
         for attempt in range(max_retries):
             try:
                 print(f"\nAccessing URL: {url}")
-                page.goto(url, wait_until="networkidle")
+                with limiter.track_sync(url) as outcome:
+                    response = page.goto(url, wait_until="networkidle")
+                    outcome.report(response.status if response else None)
+                if response and response.status in BACKOFF_STATUSES:
+                    raise RuntimeError(f"HTTP {response.status} for {url}")
                 page.wait_for_timeout(2000)  # Increased wait time
                 
                 # Get all recipe URLs
@@ -75,7 +87,7 @@ def scrape_recipes(url, max_retries=3):
             except TimeoutError:
                 if attempt < max_retries - 1:
                     print(f"\nTimeout occurred. Retrying... ({attempt + 1}/{max_retries})")
-                    time.sleep(3)
+                    time.sleep(limiter.backoff(attempt))
                     continue
                 else:
                     print("\nMax retries reached. Could not scrape recipes.")
@@ -85,7 +97,7 @@ def scrape_recipes(url, max_retries=3):
                 print(f"\nError occurred: {str(e)}")
                 if attempt < max_retries - 1:
                     print("Retrying...")
-                    time.sleep(3)
+                    time.sleep(limiter.backoff(attempt))
                     continue
                 return None
 
@@ -94,8 +106,8 @@ def save_recipes(recipes_data, filename="recipes.json"):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"recipes_page.json"
         
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(recipes_data, f, indent=4, ensure_ascii=False)
+        # Streamed element by element rather than one json.dump of the whole list
+        write_json_array(recipes_data, filename)
         
         print(f"\nSuccessfully scraped {len(recipes_data)} recipes!")
         print(f"Data saved to: {filename}")
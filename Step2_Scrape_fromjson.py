@@ -1,14 +1,29 @@
-from playwright.sync_api import sync_playwright, TimeoutError
 import json
 import time
-import random
 from datetime import datetime
-from tqdm import tqdm
 import argparse
+import asyncio
+import os
+import sys
+
+# Shared scraping helpers live in scrape_data/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape_data"))
+from engine import CrawlSettings, scrape_recipes, shard_settings, requeue_interrupted, DETAIL_CONCURRENCY, PER_HOST_CONCURRENCY, ENGINES
+from site_adapters import MyresipiAdapter
+from sharding import resolve_shards, split_by_key, run_sharded, shard_path
+from page_pool import POOL_SIZE, RECYCLE_AFTER
+from rate_limiter import DEFAULT_RATE, MAX_RATE
+from resource_policy import POLICIES, DEFAULT_POLICY
+from page_readiness import EMULATION_CHOICES
+from page_validators import PAGE_VALIDATORS_FILE
+from ndjson_sink import NdjsonSink, write_json_array, read_ndjson, is_ndjson
+
 
 def load_recipe_urls(json_file):
-    """Load recipe URLs from a JSON file"""
+    """Load recipe URLs from a JSON array or JSON Lines file"""
     try:
+        if is_ndjson(json_file):
+            return [recipe["recipe_url"] for recipe in read_ndjson(json_file)]
         with open(json_file, "r", encoding="utf-8") as f:
             data = json.load(f)
             recipe_urls = [recipe["recipe_url"] for recipe in data]
@@ -17,214 +32,84 @@ def load_recipe_urls(json_file):
         print(f"Error loading JSON file: {str(e)}")
         return []
 
-def scrape_recipe_details(context, recipe_url):
-    """Scrape details for a single recipe URL using human-like behavior"""
-    try:
-        # Create a new page with the existing context
-        page = context.new_page()
-        print(f"\nScraping details from: {recipe_url}")
-        
-        # Add reduced random delay before navigation
-        page.wait_for_timeout(random.randint(500, 1000))
-        
-        # Navigate to the page with human-like behavior
-        page.goto(recipe_url, wait_until="domcontentloaded")
-        page.mouse.move(random.randint(100, 500), random.randint(100, 500))
-        page.wait_for_timeout(random.randint(500, 1000))
-        
-        # Scroll down slowly like a human (with reduced interval)
-        page.evaluate('''() => {
-            return new Promise((resolve) => {
-                let totalHeight = 0;
-                const distance = 100;
-                const timer = setInterval(() => {
-                    window.scrollBy(0, distance);
-                    totalHeight += distance;
-                    if(totalHeight >= document.body.scrollHeight){
-                        clearInterval(timer);
-                        resolve();
-                    }
-                }, 50);
-            });
-        }''')
-        
-        page.wait_for_timeout(random.randint(500, 1000))
-
-        # Extract all data using JavaScript evaluation
-        details = page.evaluate('''() => {
-            const result = {};
-            const contentDiv = document.querySelector('div.fusion-content-tb');
-            if (!contentDiv) return result;
-
-            // Get the title
-            const titleElement = contentDiv.querySelector('h3');
-            result.title = titleElement ? titleElement.textContent.trim() : '';
-
-            // Get the image URL from the p tag after h3 title
-            const h3Element = contentDiv.querySelector('h3');
-            if (h3Element) {
-                const pElement = h3Element.nextElementSibling;
-                if (pElement && pElement.tagName === 'P') {
-                    const imgElement = pElement.querySelector('img[srcset]');
-                    if (imgElement) {
-                        const srcset = imgElement.getAttribute('srcset');
-                        // Get the highest resolution image URL (last one in srcset)
-                        const urls = srcset.split(',').map(s => s.trim().split(' ')[0]);
-                        result.image_url = urls[urls.length - 1];
-                    }
-                }
-            }
-
-            // Get ingredients
-            result.ingredients = {};
-            let currentElement = contentDiv.querySelector('h3').nextElementSibling;
-            while (currentElement) {
-                // Stop if we reach the instructions section
-                if (currentElement.tagName === 'P' && currentElement.querySelector('strong') && 
-                    currentElement.querySelector('strong').textContent.trim().toLowerCase().startsWith('cara')) {
-                    break;
-                }
-
-                // Check if the current element is a strong tag with "Bahan-bahan"
-                if (currentElement.tagName === 'P' && currentElement.querySelector('strong')) {
-                    const header = currentElement.querySelector('strong').textContent.trim();
-                    if (header.toLowerCase().includes('bahan')) {
-                        const ingredients = [];
-                        let nextElement = currentElement.nextElementSibling;
-
-                        // Collect all ingredients from ul/ol lists
-                        while (nextElement && (nextElement.tagName === 'UL' || nextElement.tagName === 'OL')) {
-                            ingredients.push(...Array.from(nextElement.querySelectorAll('li')).map(
-                                li => li.textContent.trim()
-                            ));
-                            nextElement = nextElement.nextElementSibling;
-                        }
-
-                        // Add ingredients to the result
-                        if (ingredients.length > 0) {
-                            result.ingredients[header] = ingredients;
-                        }
-                    }
-                }
-
-                currentElement = currentElement.nextElementSibling;
-            }
-
-            // Get instructions
-            const instructions = [];
-            const instructionsHeaders = Array.from(contentDiv.querySelectorAll('p strong')).filter(
-                el => el.textContent.trim().toLowerCase().startsWith('cara')
-            );
-            if (instructionsHeaders.length > 0) {
-                for (const header of instructionsHeaders) {
-                    let currentElement = header.closest('p').nextElementSibling;
-                    while (currentElement) {
-                        if (currentElement.tagName === 'OL' || currentElement.tagName === 'UL') {
-                            // Append all steps from the list
-                            instructions.push(...Array.from(currentElement.querySelectorAll('li')).map(
-                                li => li.textContent.trim()
-                            ));
-                        } else if (currentElement.tagName === 'P' && /\\d+\\./.test(currentElement.textContent.trim())) {
-                            // Append steps from p tags containing numbers (e.g., "1.", "2.")
-                            instructions.push(currentElement.textContent.trim());
-                        }
-                        currentElement = currentElement.nextElementSibling;
-                    }
-                }
-            }
-
-            // Case 2: Instructions in p tags containing numbers (e.g., "1.", "2.")
-            if (instructions.length === 0) {
-                const instructionElements = contentDiv.querySelectorAll('p');
-                instructionElements.forEach(el => {
-                    const text = el.textContent.trim();
-                    if (/\\d+\\./.test(text)) {  // Check if the text contains a number followed by a dot
-                        instructions.push(text);
-                    }
-                });
-            }
-
-            result.instructions = instructions;
-
-            return result;
-        }''')
-
-        # Update the recipe data with all scraped details
-        recipe_data = {
-            "recipe_url": recipe_url,
-            "details": details
-        }
-        
-        page.close()
-        return recipe_data
-        
-    except Exception as e:
-        print(f"Error scraping recipe details: {str(e)}")
-        return {"recipe_url": recipe_url, "details": {}}
-
-def scrape_recipes_from_json(json_file, max_retries=3):
-    """Scrape recipes using URLs from a JSON file"""
+async def scrape_recipe_urls(recipe_urls, source, settings=None, sink=None):
+    """Scrape the given recipe URLs; returns (recipes, changed)
+
+    `changed` lists the recipes that are new or modified according to the
+    validator store (all of them without one). Recipes go through the shared
+    scraping engine with the myresipi adapter, so pooling, concurrency, rate
+    limiting, request blocking and the crawl journal work as in the category
+    crawler. Each recipe is also written to `sink` the moment it is scraped.
+    """
+    recipes = [{"recipe_url": recipe_url, "details": {}} for recipe_url in recipe_urls]
+    changed = await scrape_recipes(
+        recipes,
+        settings,
+        source=source,
+        on_recipe_done=sink.write if sink else None,
+        adapter=MyresipiAdapter()
+    )
+    return recipes, changed
+
+async def scrape_recipes_from_json(json_file, settings=None, sink=None):
+    """Scrape recipes using URLs from a JSON file; returns (recipes, changed)"""
     # Load recipe URLs from the JSON file
     recipe_urls = load_recipe_urls(json_file)
     if not recipe_urls:
         print("No recipe URLs found in the JSON file.")
-        return None
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080},
-            extra_http_headers={
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Sec-Ch-Ua': '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-                'Sec-Ch-Ua-Mobile': '?0',
-                'Sec-Ch-Ua-Platform': '"Windows"',
-                'Upgrade-Insecure-Requests': '1',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-        )
-
-        # Scrape details for each recipe with progress bar
-        detailed_recipes = []
-        with tqdm(total=len(recipe_urls), desc="Scraping recipes") as pbar:
-            for recipe_url in recipe_urls:
-                for attempt in range(max_retries):
-                    try:
-                        detailed_recipe = scrape_recipe_details(context, recipe_url)
-                        detailed_recipes.append(detailed_recipe)
-                        time.sleep(0.5)  # Reduced delay between requests
-                        break
-                    except TimeoutError:
-                        if attempt < max_retries - 1:
-                            print(f"\nTimeout occurred. Retrying... ({attempt + 1}/{max_retries})")
-                            time.sleep(3)
-                            continue
-                        else:
-                            print("\nMax retries reached. Could not scrape recipe.")
-                            detailed_recipes.append({"recipe_url": recipe_url, "details": {}})
-                    except Exception as e:
-                        print(f"\nError occurred: {str(e)}")
-                        if attempt < max_retries - 1:
-                            print("Retrying...")
-                            time.sleep(3)
-                            continue
-                        detailed_recipes.append({"recipe_url": recipe_url, "details": {}})
-                pbar.update(1)
-        
-        context.close()
-        browser.close()
-        return detailed_recipes
+        return None, []
+    return await scrape_recipe_urls(recipe_urls, json_file, settings, sink)
+
+def scrape_shard(recipe_urls, source, settings, stream_file):
+    """Process entry point of a sharded run: its own event loop, browser and limiter"""
+    with NdjsonSink(stream_file) as sink:
+        return asyncio.run(scrape_recipe_urls(recipe_urls, source, settings, sink))
 
-def save_recipes(recipes_data, filename="recipes.json"):
+def scrape_sharded(json_file, settings, shards, stream_file):
+    """Split the URLs by a hash of recipe_url across `shards` processes
+
+    Each shard streams to its own JSON Lines file next to `stream_file`. The
+    merged recipes come back in input order, exactly as a single process
+    would return them.
+    """
+    recipe_urls = load_recipe_urls(json_file)
+    if not recipe_urls:
+        print("No recipe URLs found in the JSON file.")
+        return None, []
+
+    stem = stream_file.rsplit(".", 1)[0]
+    groups = split_by_key(recipe_urls, shards, key=lambda url: url or "")
+    shard_args = [
+        (group, json_file, shard_settings(settings, shards), f"{stem}.shard{index}.ndjson")
+        for index, group in enumerate(groups) if group
+    ]
+    # Every process reports its own metrics
+    for index, (_, _, shard, _) in enumerate(shard_args):
+        shard.metrics_file = shard_path(shard.metrics_file, index)
+        shard.prometheus_file = shard_path(shard.prometheus_file, index)
+    requeue_interrupted(settings)
+    print(f"\nScraping in {len(shard_args)} processes, {len(recipe_urls)} recipes")
+
+    by_url = {}
+    changed_urls = set()
+    for result in run_sharded(scrape_shard, shard_args):
+        if result is None:
+            continue
+        recipes, changed = result
+        by_url.update((recipe["recipe_url"], recipe) for recipe in recipes)
+        changed_urls.update(recipe["recipe_url"] for recipe in changed)
+
+    # Recipes of a crashed shard stay in the output with empty details
+    recipes = [by_url.get(url, {"recipe_url": url, "details": {}}) for url in recipe_urls]
+    return recipes, [recipe for recipe in recipes if recipe["recipe_url"] in changed_urls]
+
+def save_recipes(recipes_data, filename="recipes.json", prefix="recipes"):
     if recipes_data:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"recipes_{timestamp}.json"
+        filename = f"{prefix}_{timestamp}.json"
         
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(recipes_data, f, indent=4, ensure_ascii=False)
+        # Streamed element by element rather than one json.dump of the whole list
+        write_json_array(recipes_data, filename)
         
         print(f"\nSuccessfully scraped {len(recipes_data)} recipes!")
         print(f"Data saved to: {filename}")
@@ -234,17 +119,67 @@ def save_recipes(recipes_data, filename="recipes.json"):
 def main():
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Scrape recipe details from MyResipi.com")
-    parser.add_argument("json_file", help="Path to the JSON file containing recipe URLs")
+    parser.add_argument("json_file", help="Path to the JSON (or .ndjson) file containing recipe URLs")
+    parser.add_argument("--concurrency", type=int, default=DETAIL_CONCURRENCY, help="Number of recipes scraped in parallel")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_CONCURRENCY, help="Maximum in-flight requests per host")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="Number of warm browser contexts shared by the workers")
+    parser.add_argument("--recycle-after", type=int, default=RECYCLE_AFTER, help="Navigations per browser context before it is replaced")
+    parser.add_argument("--engine", choices=ENGINES, default="http", help="Static HTTP parse with browser fallback, or browser only")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Starting requests per second per host; adapts to the host's responses")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE, help="Highest requests per second the adaptive limiter may reach per host")
+    parser.add_argument("--emulation", choices=EMULATION_CHOICES, default="none", help="Opt-in human emulation (random waits, mouse move, scrolling) around each page load")
+    parser.add_argument("--block", choices=POLICIES, default=DEFAULT_POLICY, help="Browser request blocking: off, light (images/media/fonts/third-party scripts) or strict (also stylesheets and all scripts)")
+    parser.add_argument("--archive", default=None, help="Keep every fetched listing/detail page in this compressed archive for offline re-extraction (see page_archive.py)")
+    parser.add_argument("--validators", default=PAGE_VALIDATORS_FILE, help="SQLite store of ETag/Last-Modified/content hash per recipe_url")
+    parser.add_argument("--incremental", action="store_true", help="Skip unchanged recipes via conditional requests and also save only the new or modified ones")
+    parser.add_argument("--metrics", default=None, help="Write per-phase timing histograms (p50/p95/p99) and counters to this JSON file")
+    parser.add_argument("--prometheus", default=None, help="Also write the metrics in Prometheus text exposition format to this file")
+    parser.add_argument("--shards", type=int, default=1, help="Worker processes, each with its own browser, splitting the URLs by hash; 0 uses one per CPU core")
+    parser.add_argument("--state", default=None, help="SQLite crawl journal; an interrupted run resumes from it instead of starting over")
+    parser.add_argument("--fresh", action="store_true", help="Discard the existing crawl journal and start from zero")
     args = parser.parse_args()
 
+    if args.fresh and args.state and os.path.exists(args.state):
+        os.remove(args.state)
+
+    settings = CrawlSettings(
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        delay=1 / args.rate if args.rate > 0 else 0,
+        max_rate=args.max_rate,
+        pool_size=args.pool_size,
+        recycle_after=args.recycle_after,
+        engine=args.engine,
+        state_file=args.state,
+        validators_file=args.validators,
+        incremental=args.incremental,
+        resource_policy=args.block,
+        emulation=args.emulation,
+        archive_dir=args.archive,
+        metrics_file=args.metrics,
+        prometheus_file=args.prometheus
+    )
+
     start_time = time.time()
     
     print("\nScraping recipes from MyResipi.com")
     print("=============================================================================================================")
     
-    # Scrape recipes using URLs from the JSON file
-    recipes_data = scrape_recipes_from_json(args.json_file)
+    # Scrape recipes using URLs from the JSON file, streaming each one to disk as it lands
+    stream_file = f"recipes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+    shards = resolve_shards(args.shards)
+    if shards > 1:
+        recipes_data, changed = scrape_sharded(args.json_file, settings, shards, stream_file)
+        print(f"\nStreamed recipes to: {stream_file.rsplit('.', 1)[0]}.shard*.ndjson")
+    else:
+        with NdjsonSink(stream_file) as sink:
+            recipes_data, changed = asyncio.run(scrape_recipes_from_json(args.json_file, settings, sink))
+        print(f"\nStreamed {sink.written} recipes to: {stream_file}")
     save_recipes(recipes_data)
+    if args.incremental:
+        # Only new or modified recipes need enrichment and embedding again
+        print(f"\nNew or modified recipes: {len(changed)}")
+        save_recipes(changed, prefix="recipes_changed")
     
     elapsed_time = time.time() - start_time
     print(f"\nScraping completed in {elapsed_time:.2f} seconds")
@@ -0,0 +1,173 @@
+"""Recall and QPS of the IVF index against exact search.
+
+Two datasets are measured: the recipes in data/*.json, embedded with the
+local fake provider and queried with the first few main ingredients of
+random recipes (the shape of a search_recipe.py query), and a synthetic
+set of clustered unit vectors (1M by default) queried with fresh points
+from the same clusters. For each nprobe the report gives recall@k against
+the exact top k, queries/sec, p95 latency and the share of rows scanned,
+next to exact search over the same rows.
+
+The synthetic set is generated in memory (count x dims x 4 bytes, 512 MB
+for the default 1M x 128); building its IVF index streams the rows and
+only holds the k-means sample (see ann_index.build_ivf).
+
+    python benchmarks/bench_ann.py
+    python benchmarks/bench_ann.py --synthetic 200000 --dims 256 --nprobe 4 16 64
+    python benchmarks/bench_ann.py --synthetic 0 --output ann.json   # recipes only
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "embeddings"))
+
+from ann_index import IVFIndex, build_ivf
+from batch_embeddings import BatchEmbedder, ingredients_text
+from fake_embeddings import FakeEmbeddingClient
+from vector_index import VectorIndex, build_index, normalize_rows, write_index
+
+SYNTHETIC_COUNT = 1_000_000
+SYNTHETIC_DIMS = 128
+SYNTHETIC_CLUSTERS = 2000
+# Norm of the noise added to a cluster centre, relative to the (unit) centre
+SYNTHETIC_NOISE = 1.2
+# Rows generated at once, to bound memory
+GENERATE_CHUNK = 100_000
+NPROBES = [1, 2, 4, 8, 16, 32, 64]
+
+
+def clustered_vectors(rng: np.random.Generator, centres: np.ndarray, count: int) -> np.ndarray:
+    dims = centres.shape[1]
+    vectors = np.empty((count, dims), dtype=np.float32)
+    for start in range(0, count, GENERATE_CHUNK):
+        n = min(GENERATE_CHUNK, count - start)
+        noise = rng.standard_normal((n, dims), dtype=np.float32) * (SYNTHETIC_NOISE / np.sqrt(dims))
+        vectors[start:start + n] = normalize_rows(centres[rng.integers(len(centres), size=n)] + noise)
+    return vectors
+
+
+def synthetic_dataset(workdir: str, count: int, dims: int, clusters: int, queries: int, seed: int):
+    rng = np.random.default_rng(seed)
+    centres = normalize_rows(rng.standard_normal((clusters, dims), dtype=np.float32))
+    path = os.path.join(workdir, "synthetic")
+    write_index(path, clustered_vectors(rng, centres, count), [], "synthetic")
+    return path, clustered_vectors(rng, centres, queries)
+
+
+def recipe_dataset(workdir: str, files, queries: int, seed: int):
+    recipes = []
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            recipes.extend(json.load(f))
+    embedder = BatchEmbedder(FakeEmbeddingClient())
+    path = os.path.join(workdir, "recipes")
+    build_index(recipes, embedder, path)
+    rng = random.Random(seed)
+    with_ingredients = [r for r in recipes if r['details'].get('main_ingredients')]
+    texts = [
+        ingredients_text(rng.choice(with_ingredients)['details']['main_ingredients'][:rng.randint(2, 4)])
+        for _ in range(queries)
+    ]
+    return path, np.array(embedder.embed(texts), dtype=np.float32)
+
+
+def run_queries(index: VectorIndex, queries: np.ndarray, k: int):
+    """Top-k rows of every query, with queries/sec and p95 latency in ms."""
+    results, latencies = [], []
+    index.top_rows(queries[0], k)  # page the index in before timing
+    started = time.perf_counter()
+    for query in queries:
+        t = time.perf_counter()
+        results.append(index.top_rows(query, k)[0])
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+    return results, len(queries) / elapsed, float(np.percentile(latencies, 95) * 1000)
+
+
+def bench_dataset(name: str, exact_path: str, queries: np.ndarray, args) -> list:
+    ivf_path = exact_path + "-ivf"
+    print(f"\n{name}: building IVF index ...")
+    started = time.perf_counter()
+    build_ivf(VectorIndex(exact_path), ivf_path, args.nlist)
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    ivf = IVFIndex(ivf_path)
+    load_ms = (time.perf_counter() - started) * 1000
+    # The IVF directory holds the same rows, so exact search over it gives the ground truth in its row order
+    exact = VectorIndex(ivf_path)
+    print(f"{name}: {len(exact)} x {exact.dims} vectors, {ivf.nlist} lists, built in {build_seconds:.1f}s, "
+          f"opened in {load_ms:.1f} ms")
+
+    truth, qps, p95 = run_queries(exact, queries, args.k)
+    rows = [{"dataset": name, "index": "exact", "nprobe": None, "recall": 1.0, "qps": qps, "p95_ms": p95, "scanned": 1.0}]
+    sizes = np.diff(ivf.offsets)
+    for nprobe in sorted(set(min(n, ivf.nlist) for n in args.nprobe)):
+        ivf.nprobe = nprobe
+        found, qps, p95 = run_queries(ivf, queries, args.k)
+        recall = np.mean([len(set(f.tolist()) & set(t.tolist())) / len(t) for f, t in zip(found, truth)])
+        rows.append({
+            "dataset": name, "index": "ivf", "nprobe": nprobe, "recall": float(recall), "qps": qps, "p95_ms": p95,
+            # Expected share of rows scored: nprobe lists of average size
+            "scanned": float(min(1.0, nprobe * sizes.mean() / len(ivf)))
+        })
+    for row in rows:
+        row.update(count=len(exact), dims=exact.dims, nlist=ivf.nlist, build_seconds=build_seconds, load_ms=load_ms)
+    return rows
+
+
+def print_table(results, k):
+    header = f"{'dataset':<11}{'index':<7}{'nprobe':>7}{f'recall@{k}':>11}{'qps':>11}{'p95 ms':>9}{'scanned':>9}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        nprobe = "-" if r["nprobe"] is None else r["nprobe"]
+        print(f"{r['dataset']:<11}{r['index']:<7}{nprobe:>7}{r['recall']:>11.3f}{r['qps']:>11.0f}"
+              f"{r['p95_ms']:>9.3f}{r['scanned']:>9.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IVF recall and QPS against exact search")
+    parser.add_argument("--recipes", nargs="*", default=None, help="Recipe JSON files (default data/*.json; none to skip)")
+    parser.add_argument("--synthetic", type=int, default=SYNTHETIC_COUNT, help="Synthetic vectors (0 to skip)")
+    parser.add_argument("--dims", type=int, default=SYNTHETIC_DIMS, help="Dimensions of the synthetic vectors")
+    parser.add_argument("--clusters", type=int, default=SYNTHETIC_CLUSTERS, help="Clusters the synthetic vectors are drawn from")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10, help="Results per query that recall is measured on")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default about 4 * sqrt(N))")
+    parser.add_argument("--nprobe", nargs="+", type=int, default=NPROBES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="Keep the built indexes here instead of a temporary directory")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    files = glob.glob(os.path.join(REPO_DIR, "data", "*.json")) if args.recipes is None else args.recipes
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        if files:
+            path, queries = recipe_dataset(workdir, files, args.queries, args.seed)
+            results += bench_dataset("recipes", path, queries, args)
+        if args.synthetic:
+            print(f"\nGenerating {args.synthetic} synthetic vectors of {args.dims} dims ...")
+            path, queries = synthetic_dataset(workdir, args.synthetic, args.dims, args.clusters, args.queries, args.seed)
+            results += bench_dataset("synthetic", path, queries, args)
+
+    print_table(results, args.k)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"k": args.k, "queries": args.queries, "results": results}, f, indent=4)
+        print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Offline scraper benchmark against the local fixture server.
+
+Runs the scraping engine for every combination of site, engine and
+concurrency against benchmarks/fixture_server.py and reports recipes/sec,
+p95 time per recipe, peak RSS of the Python process and of its Chromium
+children, and the peak number of Chromium processes. Each scenario runs in
+a fresh subprocess so memory and process counts do not leak between runs.
+
+    python benchmarks/bench_scrapers.py --engines http browser --concurrency 1 4 8
+    python benchmarks/bench_scrapers.py --latency 0.05 --error-rate 0.02 --output bench.json
+    python benchmarks/bench_scrapers.py --baseline bench.json   # exits 1 on a regression
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "scrape_data"))
+
+from fixture_server import FixtureServer, CATEGORIES, PAGES_PER_CATEGORY, RECIPES_PER_PAGE
+
+SITES = ["resepichenom", "myresipi"]
+ENGINES = ["http", "browser"]
+# Politeness is not what is being measured: let concurrency be the only limit
+BENCH_MAX_RATE = 1000.0
+# Seconds between samples of the Chromium process tree
+SAMPLE_INTERVAL = 0.2
+# Marks the scenario result among everything else a subprocess prints
+RESULT_PREFIX = "BENCH_RESULT "
+# Relative drop in recipes/sec that counts as a regression against --baseline
+DEFAULT_TOLERANCE = 0.2
+
+
+class ProcessSampler:
+    """Samples this process's Chromium descendants from /proc (Linux only)."""
+
+    def __init__(self):
+        self.peak_processes = 0
+        self.peak_browser_rss = 0
+        self.available = os.path.isdir("/proc")
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if self.available else 0
+
+    def _descendants(self):
+        parents = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # The command name is in parentheses and may itself contain spaces
+            name = stat[stat.index("(") + 1:stat.rindex(")")]
+            ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+            parents[int(entry)] = (ppid, name)
+
+        found = []
+        frontier = [os.getpid()]
+        while frontier:
+            parent = frontier.pop()
+            for pid, (ppid, name) in parents.items():
+                if ppid == parent:
+                    found.append((pid, name))
+                    frontier.append(pid)
+        return found
+
+    def sample(self):
+        if not self.available:
+            return
+        chromium = [pid for pid, name in self._descendants() if "chrom" in name.lower() or "headless" in name.lower()]
+        rss = 0
+        for pid in chromium:
+            try:
+                with open(f"/proc/{pid}/statm", "r") as f:
+                    rss += int(f.read().split()[1]) * self._page_size
+            except OSError:
+                continue
+        self.peak_processes = max(self.peak_processes, len(chromium))
+        self.peak_browser_rss = max(self.peak_browser_rss, rss)
+
+    async def run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+
+async def run_scenario(scenario):
+    """Scrape the fixtures once with the given settings; runs inside the subprocess."""
+    from engine import ScrapeEngine, CrawlSettings
+    from site_adapters import ResepichenomAdapter, MyresipiAdapter
+
+    concurrency = scenario["concurrency"]
+    settings = CrawlSettings(
+        concurrency=concurrency,
+        per_host=concurrency,
+        delay=0,
+        max_rate=BENCH_MAX_RATE,
+        pool_size=concurrency,
+        engine=scenario["engine"],
+        state_file=None,
+        resource_policy=scenario["block"]
+    )
+    sampler = ProcessSampler()
+    sampling = asyncio.create_task(sampler.run())
+    started = time.perf_counter()
+    try:
+        if scenario["site"] == "resepichenom":
+            async with ScrapeEngine(ResepichenomAdapter(), settings) as engine:
+                results = await engine.crawl_categories(scenario["categories"])
+                recipes = [recipe for titles in results.values() for recipe in titles]
+                metrics = engine.metrics.report()
+        else:
+            recipes = [{"recipe_url": url, "details": {}} for url in scenario["urls"]]
+            async with ScrapeEngine(MyresipiAdapter(), settings) as engine:
+                await engine.scrape_recipes(recipes, "benchmark")
+                metrics = engine.metrics.report()
+    finally:
+        elapsed = time.perf_counter() - started
+        sampler.sample()
+        sampling.cancel()
+
+    scraped = sum(1 for recipe in recipes if recipe["details"])
+    recipe_phase = metrics["phases"].get("recipe", {})
+    return {
+        "site": scenario["site"],
+        "engine": scenario["engine"],
+        "concurrency": concurrency,
+        "recipes": len(recipes),
+        "scraped": scraped,
+        "seconds": round(elapsed, 3),
+        "recipes_per_sec": round(scraped / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_recipe_seconds": recipe_phase.get("p50", 0.0),
+        "p95_recipe_seconds": recipe_phase.get("p95", 0.0),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_browser_rss_mb": round(sampler.peak_browser_rss / (1024 * 1024), 1) if sampler.available else None,
+        "peak_chromium_processes": sampler.peak_processes if sampler.available else None,
+        "retries": metrics["counters"].get("retries", 0) + metrics["counters"].get("http_retries", 0),
+        "browser_fallbacks": metrics["counters"].get("browser_fallbacks", 0)
+    }
+
+
+def run_in_subprocess(scenario):
+    """Run one scenario in a fresh interpreter and return its result dict (or None)."""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--scenario", json.dumps(scenario)],
+        capture_output=True,
+        text=True
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    print(f"\nScenario {scenario['site']}/{scenario['engine']}/{scenario['concurrency']} failed:")
+    print((completed.stderr or completed.stdout)[-2000:])
+    return None
+
+
+def print_table(results):
+    header = f"{'site':<14}{'engine':<9}{'conc':>5}{'recipes':>9}{'rec/s':>9}{'p95 s':>8}{'rss MB':>9}{'chrome MB':>11}{'chrome #':>10}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        browser_rss = "-" if r["peak_browser_rss_mb"] is None else r["peak_browser_rss_mb"]
+        processes = "-" if r["peak_chromium_processes"] is None else r["peak_chromium_processes"]
+        print(f"{r['site']:<14}{r['engine']:<9}{r['concurrency']:>5}{r['scraped']:>5}/{r['recipes']:<3}"
+              f"{r['recipes_per_sec']:>9}{r['p95_recipe_seconds']:>8}{r['peak_rss_mb']:>9}{browser_rss:>11}{processes:>10}")
+
+
+def compare(results, baseline_file, tolerance):
+    """Print scenarios whose recipes/sec dropped by more than `tolerance`; return how many."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = {(r["site"], r["engine"], r["concurrency"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    for r in results:
+        before = baseline.get((r["site"], r["engine"], r["concurrency"]))
+        if not before or not before["recipes_per_sec"]:
+            continue
+        change = r["recipes_per_sec"] / before["recipes_per_sec"] - 1
+        if change < -tolerance:
+            regressions += 1
+            print(f"REGRESSION {r['site']}/{r['engine']}/{r['concurrency']}: "
+                  f"{before['recipes_per_sec']} -> {r['recipes_per_sec']} recipes/sec ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against local fixtures")
+    parser.add_argument("--sites", nargs="+", choices=SITES, default=SITES)
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--categories", type=int, default=CATEGORIES, help="resepichenom categories served")
+    parser.add_argument("--pages", type=int, default=PAGES_PER_CATEGORY, help="Listing pages per category")
+    parser.add_argument("--per-page", type=int, default=RECIPES_PER_PAGE, help="Recipes per listing page")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra random seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of page responses answered with 503")
+    parser.add_argument("--block", default="light", help="Resource policy for detail pages")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Earlier --output file to compare recipes/sec against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative drop in recipes/sec before a scenario counts as a regression")
+    parser.add_argument("--scenario", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        result = asyncio.run(run_scenario(json.loads(args.scenario)))
+        print(RESULT_PREFIX + json.dumps(result))
+        return
+
+    results = []
+    server = FixtureServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        categories=args.categories, pages=args.pages, per_page=args.per_page
+    )
+    with server:
+        print(f"Fixture server on {server.base_url}")
+        for site in args.sites:
+            for engine in args.engines:
+                for concurrency in args.concurrency:
+                    scenario = {
+                        "site": site,
+                        "engine": engine,
+                        "concurrency": concurrency,
+                        "block": args.block,
+                        "categories": server.category_urls(),
+                        "urls": server.myresipi_urls()
+                    }
+                    print(f"Running {site} / {engine} / concurrency {concurrency} ...")
+                    result = run_in_subprocess(scenario)
+                    if result:
+                        results.append(result)
+
+    print_table(results)
+    print(f"\nServer: {server.requests} requests, {server.errors} injected errors")
+
+    if args.output:
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {
+                "latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate,
+                "categories": args.categories, "pages": args.pages, "per_page": args.per_page, "block": args.block
+            },
+            "results": results
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"Results saved to: {args.output}")
+
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Local HTTP server that serves the recipe sites from fixtures.
+
+Listing pages, detail pages and static assets of resepichenom.com and
+myresipi.com are rendered from the HTML templates in benchmarks/fixtures/,
+so the scrapers can be exercised without network access. Every response
+can be delayed (`latency` + up to `jitter` seconds) and a share of them can
+fail with 503 (`error_rate`), with a seeded RNG so runs are repeatable.
+
+URL layout (relative to `base_url`):
+    /resepichenom/kategori/<category>?page=<n>   listing page
+    /resepichenom/resepi/<slug>                  detail page
+    /myresipi/<slug>/                            detail page
+    /static/<anything>                           filler asset
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from typing import Dict, List
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Shape of the fake resepichenom catalogue
+CATEGORIES = 3
+PAGES_PER_CATEGORY = 3
+RECIPES_PER_PAGE = 9
+# Size of every /static/ response, roughly a compressed recipe photo
+STATIC_BYTES = 40 * 1024
+
+
+def _template(name: str) -> Template:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+
+class FixtureServer:
+    """Threaded fixture server running in a background thread.
+
+    Use as a context manager; `base_url` is only known once it has started
+    (port 0 picks a free port).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 0.0,
+        seed: int = 0,
+        categories: int = CATEGORIES,
+        pages: int = PAGES_PER_CATEGORY,
+        per_page: int = RECIPES_PER_PAGE
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.categories = [f"kategori-{n}" for n in range(1, categories + 1)]
+        self.pages = pages
+        self.per_page = per_page
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+        self._listing = _template("resepichenom_listing.html")
+        self._card = _template("resepichenom_card.html")
+        self._resepichenom_detail = _template("resepichenom_detail.html")
+        self._myresipi_detail = _template("myresipi_detail.html")
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def category_urls(self) -> Dict[str, str]:
+        """{category: listing URL} for the resepichenom category crawler."""
+        return {category: f"{self.base_url}/resepichenom/kategori/{category}" for category in self.categories}
+
+    def myresipi_urls(self) -> List[str]:
+        """Detail URLs for the myresipi scrapers, as many as the resepichenom catalogue."""
+        total = len(self.categories) * self.pages * self.per_page
+        return [f"{self.base_url}/myresipi/resipi-{n}/" for n in range(1, total + 1)]
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ------------------------------------------------------------------ handlers
+
+    def _handle(self, request):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay > 0:
+            time.sleep(delay)
+
+        url = urlparse(request.path)
+        if url.path.startswith("/static/"):
+            # Assets never fail so error injection only hits the pages being scraped
+            self._send(request, 200, b"\0" * STATIC_BYTES, "application/octet-stream")
+            return
+        if fail:
+            self._send(request, 503, b"Service Unavailable", "text/plain", {"Retry-After": f"{self.retry_after:g}"})
+            return
+
+        body = self._render(url.path, parse_qs(url.query))
+        if body is None:
+            self._send(request, 404, b"Not Found", "text/plain")
+            return
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self._send(request, 304, b"", None, {"ETag": etag})
+            return
+        self._send(request, 200, body, "text/html; charset=utf-8", {"ETag": etag})
+
+    def _render(self, path: str, query: Dict[str, List[str]]):
+        parts = [part for part in path.split("/") if part]
+        if parts[:2] == ["resepichenom", "kategori"] and len(parts) == 3 and parts[2] in self.categories:
+            try:
+                page = int(query.get("page", ["1"])[0])
+            except ValueError:
+                return None
+            if not 1 <= page <= self.pages:
+                return None
+            return self._render_listing(parts[2], page).encode("utf-8")
+        if parts[:2] == ["resepichenom", "resepi"] and len(parts) == 3:
+            slug = parts[2]
+            return self._resepichenom_detail.substitute(slug=slug, title=self._title(slug)).encode("utf-8")
+        if parts[:1] == ["myresipi"] and len(parts) == 2:
+            slug = parts[1]
+            return self._myresipi_detail.substitute(slug=slug, title=self._title(slug)).encode("utf-8")
+        return None
+
+    def _render_listing(self, category: str, page: int) -> str:
+        cards = []
+        for n in range(1, self.per_page + 1):
+            slug = f"{category}-{page}-{n}"
+            cards.append(self._card.substitute(
+                href=f"/resepichenom/resepi/{slug}", slug=slug, title=self._title(slug)
+            ))
+        return self._listing.substitute(
+            category=category,
+            cards="".join(cards),
+            page=page,
+            total=self.pages,
+            prev=max(1, page - 1),
+            next=min(self.pages, page + 1)
+        )
+
+    @staticmethod
+    def _title(slug: str) -> str:
+        return "Resepi " + slug.replace("-", " ").title()
+
+    @staticmethod
+    def _send(request, status, body, content_type, headers=None):
+        request.send_response(status)
+        if content_type:
+            request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        if body and request.command != "HEAD":
+            request.wfile.write(body)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the recipe site fixtures locally")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra random seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of page responses answered with 503")
+    args = parser.parse_args()
+
+    with FixtureServer(port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate) as fixture_server:
+        print(f"Serving fixtures on {fixture_server.base_url}")
+        for category, url in fixture_server.category_urls().items():
+            print(f"  {category}: {url}")
+        print(f"  myresipi: {fixture_server.myresipi_urls()[0]} ...")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
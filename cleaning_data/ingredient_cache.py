@@ -0,0 +1,180 @@
+"""Persistent cache of LLM main_ingredients results.
+
+Entries are keyed by a hash of the normalized ingredient lines plus the
+model and prompt version, so an unchanged recipe (or another recipe with
+the very same ingredient list) never pays for a second request, while a
+new model or an edited prompt starts from a clean slate.
+
+    python cleaning_data/ingredient_cache.py stats
+    python cleaning_data/ingredient_cache.py evict --max-age-days 90 --max-entries 50000
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAIN_INGREDIENTS_CACHE_FILE = "main_ingredients_cache.db"
+
+
+def normalize_lines(lines: Iterable[str]) -> List[str]:
+    """Lowercase and collapse whitespace so cosmetic re-scrape differences still hit."""
+    return [" ".join(line.lower().split()) for line in lines if line and line.strip()]
+
+
+def cache_key(lines: Iterable[str], model: str, prompt_version: str) -> str:
+    canonical = json.dumps([model, prompt_version, normalize_lines(lines)], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class IngredientCache:
+    """SQLite-backed key -> main_ingredients store with hit-rate accounting.
+
+    `hits` and `misses` count lookups made through this instance; `evict()`
+    drops entries unused for too long and then the least recently used
+    ones until the cache fits the given entry/byte budget.
+    """
+
+    def __init__(self, path: str = MAIN_INGREDIENTS_CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("pragma journal_mode=wal")
+        self.conn.execute(
+            """create table if not exists main_ingredients (
+                key text primary key,
+                model text,
+                prompt_version text,
+                main_ingredients text,
+                size integer,
+                created_at real,
+                last_used_at real
+            )"""
+        )
+        self.conn.execute("create index if not exists main_ingredients_by_use on main_ingredients (last_used_at)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Cached results for the given keys; marks them as used."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        # SQLite caps the number of bound parameters per statement
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self.conn.execute(
+                f"select key, main_ingredients from main_ingredients where key in ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update((key, json.loads(value)) for key, value in rows)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "update main_ingredients set last_used_at = ? where key = ?", [(now, key) for key in found]
+                )
+        return found
+
+    def get(self, key: str) -> Optional[List[str]]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, entries: Iterable[Tuple[str, List[str]]], model: str, prompt_version: str):
+        now = time.time()
+        rows = []
+        for key, names in entries:
+            value = json.dumps(names, ensure_ascii=False)
+            rows.append((key, model, prompt_version, value, len(value.encode('utf-8')), now, now))
+        with self.conn:
+            self.conn.executemany(
+                "insert or replace into main_ingredients (key, model, prompt_version, main_ingredients, size, created_at, last_used_at) values (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict:
+        entries, size, oldest = self.conn.execute(
+            "select count(*), coalesce(sum(size), 0), min(last_used_at) from main_ingredients"
+        ).fetchone()
+        versions = {
+            f"{model}/{version}": count for model, version, count in self.conn.execute(
+                "select model, prompt_version, count(*) from main_ingredients group by model, prompt_version"
+            )
+        }
+        return {
+            "entries": entries,
+            "bytes": size,
+            "oldest_use": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(oldest)) if oldest else None,
+            "versions": versions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate(), 4)
+        }
+
+    def evict(self, max_age_days: Optional[float] = None, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> int:
+        """Drop stale entries, then least recently used ones over budget; returns how many went."""
+        removed = 0
+        with self.conn:
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                removed += self.conn.execute("delete from main_ingredients where last_used_at < ?", (cutoff,)).rowcount
+            if max_entries is not None:
+                removed += self.conn.execute(
+                    """delete from main_ingredients where key in (
+                        select key from main_ingredients order by last_used_at desc limit -1 offset ?)""",
+                    (max_entries,)
+                ).rowcount
+            if max_bytes is not None:
+                # Keep the most recently used entries whose sizes add up to the budget
+                keep, total = [], 0
+                for key, size in self.conn.execute("select key, size from main_ingredients order by last_used_at desc"):
+                    if total + size > max_bytes:
+                        break
+                    keep.append(key)
+                    total += size
+                self.conn.execute("create temp table if not exists keep_keys (key text primary key)")
+                self.conn.execute("delete from keep_keys")
+                self.conn.executemany("insert into keep_keys values (?)", [(key,) for key in keep])
+                removed += self.conn.execute(
+                    "delete from main_ingredients where key not in (select key from keep_keys)"
+                ).rowcount
+        if removed:
+            self.conn.execute("vacuum")
+        return removed
+
+    def print_summary(self):
+        print(f"Main ingredients cache {self.path}: {self.hits} hits, {self.misses} misses "
+              f"({self.hit_rate():.0%} hit rate)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or trim the main_ingredients LLM cache")
+    parser.add_argument("command", choices=["stats", "evict"])
+    parser.add_argument("--cache", default=MAIN_INGREDIENTS_CACHE_FILE)
+    parser.add_argument("--max-age-days", type=float, default=None, help="Drop entries not used for this many days")
+    parser.add_argument("--max-entries", type=int, default=None, help="Keep at most this many most recently used entries")
+    parser.add_argument("--max-bytes", type=int, default=None, help="Keep at most this many bytes of cached results")
+    args = parser.parse_args()
+
+    with IngredientCache(args.cache) as cache:
+        if args.command == "evict":
+            removed = cache.evict(args.max_age_days, args.max_entries, args.max_bytes)
+            print(f"Evicted {removed} entries")
+        print(json.dumps(cache.stats(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Rule- and lexicon-based parser for Malay ingredient lines.
+
+Splits lines like "1/2 ekor ayam, potong kepada 5 bahagian" or
+"2 sb sos tiram" into quantity, unit, name and preparation without any
+model call. Lines it cannot read with confidence (notes, several
+ingredients in one line, long free text) are reported as unresolved so
+llm_enrichment.py only sends those to the LLM.
+
+    python cleaning_data/ingredient_parser.py data/*.json              # coverage report
+    python cleaning_data/ingredient_parser.py data/ayam_115.json --show-unresolved
+    python cleaning_data/ingredient_parser.py --line "1 inci halia, dihiris nipis"
+"""
+import argparse
+import json
+import re
+import time
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Canonical unit -> spellings seen in the scraped recipes
+UNITS = {
+    "sudu besar": ["sudu besar", "sudu makan", "camca besar", "sb", "s/b", "tablespoons", "tablespoon", "tbsp"],
+    "sudu kecil": ["sudu kecil", "sudu teh", "camca kecil", "sk", "s/k", "st", "teaspoons", "teaspoon", "tsp"],
+    "sudu": ["sudu", "camca"],
+    "cawan": ["cawan", "cwn", "cup", "cups"],
+    "mangkuk": ["mangkuk"],
+    "gelas": ["gelas"],
+    "senduk": ["senduk"],
+    "biji": ["biji", "bj"],
+    "ulas": ["ulas"],
+    "batang": ["batang"],
+    "tangkai": ["tangkai"],
+    "ekor": ["ekor"],
+    "ketul": ["ketul"],
+    "helai": ["helai", "hlai"],
+    "keping": ["keping"],
+    "kuntum": ["kuntum"],
+    "kiub": ["kiub"],
+    "ikat": ["ikat"],
+    "pek": ["pek", "peket", "paket", "packet", "sachet"],
+    "tin": ["tin"],
+    "botol": ["botol"],
+    "kotak": ["kotak"],
+    "bungkus": ["bungkus"],
+    "genggam": ["genggam"],
+    "cubit": ["cubit"],
+    "ruas": ["ruas"],
+    "bilah": ["bilah"],
+    "labu": ["labu"],
+    "inci": ["inci", "inch"],
+    "cm": ["cm"],
+    "gram": ["gram", "gm", "gr", "g"],
+    "kg": ["kg", "kilo", "kilogram"],
+    "ml": ["ml"],
+    "liter": ["liter", "litre", "l"]
+}
+# Sizes that qualify the unit, not the ingredient: "1/2 cawan kecil ikan bilis", "2 ketul besar dada ayam"
+UNIT_SIZES = ["kecil", "besar", "sederhana"]
+# Quantities written as words: "satu tangkai daun kari"
+WORD_NUMBERS = {"satu": 1.0, "dua": 2.0, "tiga": 3.0, "empat": 4.0, "lima": 5.0, "setengah": 0.5, "separuh": 0.5, "suku": 0.25}
+# Amounts without a number: "Sedikit air", "Secubit garam"
+VAGUE_AMOUNTS = {"sedikit": "sedikit", "secubit": "cubit", "segenggam": "genggam", "sejemput": "cubit"}
+
+# Verb stems of preparation clauses; also matched with the passive di- prefix
+PREP_STEMS = [
+    "cincang", "hiris", "potong", "tumbuk", "titik", "ketuk", "kisar", "parut", "mayang", "carik",
+    "buang", "kupas", "bancuh", "belah", "rendam", "lenyek", "racik", "siat", "toskan", "perah",
+    "simpul", "celur", "blend", "cuci", "bersihkan", "ramas", "tumis", "lecur", "koyak"
+]
+# Stems that are also part of ingredient names ("telur rebus", "bawang goreng"): only the di- form counts
+PASSIVE_ONLY_STEMS = ["rebus", "goreng", "panggang", "kukus", "bakar", "masak", "perap"]
+# Words that start a usage note rather than a name
+PREP_WORDS = ["untuk", "secukup", "secukupnya", "jika", "kalau", "mengikut", "ikut", "saiz", "yang", "bersama", "sebagai", "anggaran", "lebih", "kira-kira", "yg", "utk", "dgn"]
+# Lines starting with these are notes or substitutions, left for the LLM
+NOTE_WORDS = ["atau", "ataupun", "boleh", "nota", "note", "tambahan", "lebihan", "bahan", "for", "anggaran", "beberapa", "kalau", "jika"]
+# Leading nouns of the form "hirisan daun ketumbar"
+PREP_NOUNS = ["hirisan", "cincangan", "parutan", "perahan", "tumbukan", "kisaran", "potongan", "racikan", "ketulan"]
+PREP_ADVERBS = ["halus", "kasar", "nipis", "tebal", "kecil", "besar"]
+# Trailing size words dropped from names ("bawang merah kecil" -> "bawang merah")
+SIZE_WORDS = ["kecil", "sederhana"]
+
+# A name longer than this is more likely a sentence than an ingredient
+MAX_NAME_LENGTH = 40
+MAX_NAME_WORDS = 5
+
+_FRACTIONS = {"½": " 1/2", "¼": " 1/4", "¾": " 3/4", "⅓": " 1/3", "⅔": " 2/3", "⅛": " 1/8"}
+_NUMBER = r"\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?"
+_UNIT_ALIASES = sorted(((alias, unit) for unit, aliases in UNITS.items() for alias in aliases), key=lambda item: -len(item[0]))
+_UNIT_LOOKUP = {alias: unit for alias, unit in _UNIT_ALIASES}
+_UNIT = "|".join(re.escape(alias) for alias, _ in _UNIT_ALIASES)
+
+_QUANTITY_RE = re.compile(
+    rf"^(?P<low>{_NUMBER})\s*(?:(?P<low_unit>{_UNIT})\b\s*)?"
+    rf"(?:(?:-|–|hingga|ke|atau)\s*(?P<high>{_NUMBER})\s*(?:(?P<high_unit>{_UNIT})\b)?\s*)?",
+    re.IGNORECASE
+)
+_UNIT_RE = re.compile(rf"^(?P<unit>{_UNIT})\b\.?\s*", re.IGNORECASE)
+# Alternative measure after the first one: "60g /4 sudu besar mentega", "1.4 kilo/ 1 ekor ayam"
+_ALTERNATIVE_RE = re.compile(rf"^/\s*(?:{_NUMBER})\s*(?:{_UNIT})\b\s*", re.IGNORECASE)
+_SE_UNIT_RE = re.compile(rf"^se(?P<unit>{_UNIT})\b\s*", re.IGNORECASE)
+_PAREN_RE = re.compile(r"\(([^)]*)\)")
+_PREP_RE = re.compile(
+    r"\b(?:(?:di)?(?:{stems})(?:kan)?|di(?:{passive})|{words})\b".format(
+        stems="|".join(PREP_STEMS), passive="|".join(PASSIVE_ONLY_STEMS), words="|".join(re.escape(w) for w in PREP_WORDS)
+    ),
+    re.IGNORECASE
+)
+_PREP_NOUN_RE = re.compile(
+    r"^(?P<noun>{nouns})(?:\s+(?:{adverbs}))?\s+".format(nouns="|".join(PREP_NOUNS), adverbs="|".join(PREP_ADVERBS)),
+    re.IGNORECASE
+)
+_SIZE_RE = re.compile(r"\s+(?:{})$".format("|".join(SIZE_WORDS)), re.IGNORECASE)
+_NAME_RE = re.compile(r"^[^\W\d_][^\W\d_\s'&-]*(?:[\s'&-]+[^\W\d_]+)*$")
+_NOTE_RE = re.compile(r"^(?:{})\b".format("|".join(NOTE_WORDS)), re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ParsedIngredient:
+    raw: str
+    quantity: Optional[float]
+    # Upper end of a range such as "2-3 ulas"
+    quantity_max: Optional[float]
+    unit: Optional[str]
+    name: str
+    prep: Optional[str]
+    # Parentheticals and alternative measures, kept for reference
+    note: Optional[str]
+
+    @property
+    def confident(self) -> bool:
+        """Whether `name` can be used as a main ingredient without asking the LLM."""
+        name = self.name
+        return (
+            bool(name)
+            and len(name) <= MAX_NAME_LENGTH
+            and len(name.split()) <= MAX_NAME_WORDS
+            and " dan " not in f" {name} "
+            and bool(_NAME_RE.match(name))
+            and not _NOTE_RE.match(name)
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def normalize_line(line: str) -> str:
+    # Mojibake from a double-encoded "½" is common in the scraped data
+    line = line.replace("Â", "").replace("\xa0", " ")
+    for char, text in _FRACTIONS.items():
+        line = line.replace(char, text)
+    return " ".join(line.split()).strip(" *-•")
+
+
+def parse_number(text: Optional[str]) -> Optional[float]:
+    if not text:
+        return None
+    text = text.replace(",", ".").strip()
+    total = 0.0
+    for part in text.split():
+        if "/" in part:
+            numerator, denominator = part.split("/", 1)
+            if float(denominator) == 0:
+                return None
+            total += float(numerator) / float(denominator)
+        else:
+            total += float(part)
+    return round(total, 4)
+
+
+def _canonical_unit(alias: Optional[str]) -> Optional[str]:
+    return _UNIT_LOOKUP.get(alias.lower()) if alias else None
+
+
+@lru_cache(maxsize=65536)
+def parse_ingredient(line: str) -> ParsedIngredient:
+    """Parse one ingredient line; cached because lines repeat across recipes."""
+    text = normalize_line(line)
+    notes = [note.strip() for note in _PAREN_RE.findall(text) if note.strip()]
+    text = " ".join(_PAREN_RE.sub(" ", text).split())
+
+    quantity = quantity_max = unit = None
+    match = _QUANTITY_RE.match(text)
+    if match:
+        quantity = parse_number(match.group("low"))
+        unit = _canonical_unit(match.group("low_unit"))
+        high_unit = _canonical_unit(match.group("high_unit"))
+        if match.group("high"):
+            if unit and high_unit and high_unit != unit:
+                # "800g-1kg": keep the first measure, note the other
+                notes.append(f"{match.group('high')}{match.group('high_unit')}")
+            else:
+                quantity_max = parse_number(match.group("high"))
+                unit = unit or high_unit
+        text = text[match.end():]
+        if not unit:
+            unit_match = _UNIT_RE.match(text)
+            if unit_match:
+                unit = _canonical_unit(unit_match.group("unit"))
+                text = text[unit_match.end():]
+    else:
+        first, _, rest = text.partition(" ")
+        unit_match = _UNIT_RE.match(text)
+        if unit_match and " " in text[unit_match.end():].strip():
+            # Quantity missing in the source: "sudu besar serbuk perasa"
+            unit = _canonical_unit(unit_match.group("unit"))
+            text = text[unit_match.end():]
+        elif first.lower() in WORD_NUMBERS and _UNIT_RE.match(rest):
+            quantity = WORD_NUMBERS[first.lower()]
+            unit_match = _UNIT_RE.match(rest)
+            unit = _canonical_unit(unit_match.group("unit"))
+            text = rest[unit_match.end():]
+        elif first.lower() in VAGUE_AMOUNTS:
+            unit = VAGUE_AMOUNTS[first.lower()]
+            text = rest
+        else:
+            se_match = _SE_UNIT_RE.match(text)
+            if se_match:
+                quantity = 1.0
+                unit = _canonical_unit(se_match.group("unit"))
+                text = text[se_match.end():]
+
+    alternative = _ALTERNATIVE_RE.match(text)
+    if alternative:
+        notes.append(alternative.group(0).strip(" /"))
+        text = text[alternative.end():]
+    if unit and " " not in unit:
+        size, _, rest = text.partition(" ")
+        if size.lower() in UNIT_SIZES and rest:
+            unit = f"{unit} {size.lower()}"
+            text = rest
+
+    name, *rest = re.split(r"\s*[,;]\s*|\s+-\s+", text, maxsplit=1)
+    preps = []
+    noun = _PREP_NOUN_RE.match(name)
+    if noun:
+        preps.append(noun.group(0).strip())
+        name = name[noun.end():]
+    clause = _PREP_RE.search(name)
+    if clause and clause.start() > 0:
+        preps.append(name[clause.start():].strip())
+        name = name[:clause.start()]
+    preps.extend(part for part in rest if part)
+
+    # "bawang besar/holland", "tepung jagung atau tepung kentang": the first choice is the ingredient
+    name, *alternatives = re.split(r"\s*/\s*|\s+atau\s+", name.strip(), maxsplit=1, flags=re.IGNORECASE)
+    notes.extend(alternative.strip() for alternative in alternatives if alternative.strip())
+    name = name.strip(" .:*-")
+    if len(name.split()) > 1:
+        name = _SIZE_RE.sub("", name)
+
+    return ParsedIngredient(
+        raw=line,
+        quantity=quantity,
+        quantity_max=quantity_max,
+        unit=unit,
+        name=name.lower(),
+        prep=", ".join(preps) or None,
+        note="; ".join(notes) or None
+    )
+
+
+def main_ingredients(lines: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """(names parsed with confidence, deduplicated in line order; lines left for the LLM)."""
+    names = []
+    unresolved = []
+    for line in lines:
+        if not line or not line.strip():
+            continue
+        parsed = parse_ingredient(line)
+        if not parsed.confident:
+            unresolved.append(line)
+        elif parsed.name not in names:
+            names.append(parsed.name)
+    return names, unresolved
+
+
+def merge_names(*name_lists: Iterable[str]) -> List[str]:
+    """Concatenate name lists, dropping case-insensitive duplicates."""
+    merged = []
+    seen = set()
+    for names in name_lists:
+        for name in names:
+            key = name.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(name.strip())
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse Malay ingredient lines and report how many need the LLM")
+    parser.add_argument("files", nargs="*", help="Recipe JSON files to measure coverage on")
+    parser.add_argument("--line", action="append", default=[], help="Parse this line and print the result")
+    parser.add_argument("--show-unresolved", action="store_true", help="Print every line the parser leaves for the LLM")
+    args = parser.parse_args()
+
+    for line in args.line:
+        parsed = parse_ingredient(line)
+        print(json.dumps(dict(parsed.to_dict(), confident=parsed.confident), indent=4, ensure_ascii=False))
+
+    recipes = []
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            recipes.extend(json.load(f))
+    if not recipes:
+        return
+
+    started = time.perf_counter()
+    lines = unresolved = fully_parsed = 0
+    for recipe in recipes:
+        recipe_lines = [line for group in recipe["details"]["ingredients"].values() for line in group]
+        _, left = main_ingredients(recipe_lines)
+        lines += len(recipe_lines)
+        unresolved += len(left)
+        fully_parsed += not left
+        if args.show_unresolved:
+            for line in left:
+                print(f"  {recipe.get('title', '')}: {line}")
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(recipes)} recipes, {lines} lines in {elapsed:.3f}s ({len(recipes) / elapsed:.0f} recipes/sec)")
+    print(f"Parsed locally: {lines - unresolved}/{lines} lines ({(lines - unresolved) / max(lines, 1):.1%}), "
+          f"{fully_parsed}/{len(recipes)} recipes need no LLM call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Async main-ingredient extraction for whole recipe files.
+
+Instead of one blocking chat completion per recipe, recipes are packed
+into batches of `batch_size`, each batch is sent as one structured (JSON)
+request and the answer is split back out per recipe. Up to `concurrency`
+requests are in flight at once, and rate limits (429), server errors and
+timeouts are retried with exponential backoff that honours Retry-After.
+Recipes missing from a batch answer are retried one by one with the
+original single-recipe prompt. Lines the local ingredient_parser.py can
+read never reach the model at all. Answers are kept in a persistent cache
+(ingredient_cache.py), so re-runs only pay for changed recipes.
+
+    python cleaning_data/llm_enrichment.py data/recipe_titles_ayam_115.json
+    python cleaning_data/llm_enrichment.py data/recipe_titles_*.json --concurrency 16 --batch-size 8
+    python cleaning_data/llm_enrichment.py data/recipe_titles_ayam_115.json --base-url http://127.0.0.1:8001/v1
+
+`--base-url` points the client at any OpenAI-compatible server, such as
+cleaning_data/stub_model_server.py for offline runs.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+from typing import Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+import openai
+from openai import AsyncOpenAI
+from tqdm import tqdm
+
+from ingredient_cache import IngredientCache, cache_key, MAIN_INGREDIENTS_CACHE_FILE
+from ingredient_parser import main_ingredients, merge_names
+
+MODEL = "gpt-3.5-turbo"
+# Requests in flight at once
+CONCURRENCY = 8
+# Recipes packed into one request
+BATCH_SIZE = 5
+MAX_RETRIES = 5
+# Seconds before the first retry; doubles with every attempt
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+SYSTEM_PROMPT = "Extract only the main ingredient names without quantities or measurements."
+BATCH_SYSTEM_PROMPT = (
+    "Extract only the main ingredient names without quantities or measurements. "
+    "You get a JSON object with a list of recipes, each with an id and its ingredient lines. "
+    'Answer with a JSON object {"recipes": [{"id": <id>, "main_ingredients": [<name>, ...]}, ...]} '
+    "containing every id exactly once."
+)
+# Part of every cache key: editing a prompt invalidates the answers it produced
+PROMPT_VERSION = hashlib.sha256((SYSTEM_PROMPT + BATCH_SYSTEM_PROMPT).encode("utf-8")).hexdigest()[:12]
+
+
+def flatten_ingredients(ingredients_dict: Dict[str, List[str]]) -> List[str]:
+    all_ingredients = []
+    for category in ingredients_dict.values():
+        all_ingredients.extend(category)
+    return all_ingredients
+
+
+def parse_main_ingredients(content: str) -> List[str]:
+    """Split a single-recipe answer ("a, b, c") into clean names."""
+    return [name.strip() for name in content.split(', ') if name.strip()]
+
+
+def batch_messages(batch: Sequence[List[str]]) -> List[Dict]:
+    payload = {"recipes": [{"id": i, "ingredients": ingredients} for i, ingredients in enumerate(batch)]}
+    return [
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+    ]
+
+
+def single_messages(ingredients: List[str]) -> List[Dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"List main ingredients: {', '.join(ingredients)}"}
+    ]
+
+
+def split_batch_response(content: str, size: int) -> Dict[int, List[str]]:
+    """Map batch position -> main ingredients; ids that are missing or malformed are left out."""
+    try:
+        answers = json.loads(content).get("recipes", [])
+    except (json.JSONDecodeError, AttributeError):
+        return {}
+    results = {}
+    for answer in answers:
+        if not isinstance(answer, dict):
+            continue
+        index = answer.get("id")
+        names = answer.get("main_ingredients")
+        if isinstance(index, int) and 0 <= index < size and isinstance(names, list):
+            results[index] = [str(name).strip() for name in names if str(name).strip()]
+    return results
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+class MainIngredientExtractor:
+    """Bounded-concurrency, batched main-ingredient extraction.
+
+    `extract_many()` takes the `ingredients` dicts of many recipes and
+    returns their main ingredients in the same order (None where even the
+    single-recipe retry failed). With `local_parser`, lines the rule-based
+    ingredient_parser.py reads with confidence never reach the model. With a
+    `cache`, only ingredient lists it has not seen are sent, and identical
+    lists within a run share one answer.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        model: str = MODEL,
+        concurrency: int = CONCURRENCY,
+        batch_size: int = BATCH_SIZE,
+        max_retries: int = MAX_RETRIES,
+        cache: Optional[IngredientCache] = None,
+        local_parser: bool = True
+    ):
+        self.client = client
+        self.cache = cache
+        self.local_parser = local_parser
+        self.parsed_lines = 0
+        self.llm_lines = 0
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.requests = 0
+        self.retries = 0
+
+    async def _complete(self, messages: List[Dict], json_mode: bool = False) -> str:
+        options = {"response_format": {"type": "json_object"}} if json_mode else {}
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.semaphore:
+                    self.requests += 1
+                    response = await self.client.chat.completions.create(
+                        model=self.model, messages=messages, **options
+                    )
+                return response.choices[0].message.content or ""
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                self.retries += 1
+                # Sleep outside the semaphore so a throttled request does not hold a slot
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+                await asyncio.sleep(delay)
+
+    async def extract_one(self, ingredients: List[str]) -> Optional[List[str]]:
+        try:
+            return parse_main_ingredients(await self._complete(single_messages(ingredients)))
+        except Exception as e:
+            print(f"\nError extracting main ingredients: {str(e)}")
+            return None
+
+    async def extract_batch(self, batch: List[List[str]]) -> List[Optional[List[str]]]:
+        if len(batch) == 1:
+            return [await self.extract_one(batch[0])]
+        try:
+            results = split_batch_response(await self._complete(batch_messages(batch), json_mode=True), len(batch))
+        except Exception as e:
+            print(f"\nBatch of {len(batch)} recipes failed, retrying one by one: {str(e)}")
+            results = {}
+        missing = [i for i in range(len(batch)) if i not in results]
+        for i, names in zip(missing, await asyncio.gather(*(self.extract_one(batch[i]) for i in missing))):
+            results[i] = names
+        return [results[i] for i in range(len(batch))]
+
+    async def extract_many(self, ingredient_dicts: Sequence[Dict[str, List[str]]], progress=None) -> List[Optional[List[str]]]:
+        flat = [flatten_ingredients(ingredients) for ingredients in ingredient_dicts]
+        if not self.local_parser:
+            self.llm_lines += sum(len(lines) for lines in flat)
+            return await self._extract_lists(flat, progress)
+
+        # Parse what the rules can read; only the leftover lines of each recipe go to the model
+        parsed = [main_ingredients(lines) for lines in flat]
+        leftovers = [left for _, left in parsed]
+        self.llm_lines += sum(len(left) for left in leftovers)
+        self.parsed_lines += sum(len(lines) for lines in flat) - sum(len(left) for left in leftovers)
+        answers = await self._extract_lists(leftovers, progress)
+        results = []
+        for (names, left), answer in zip(parsed, answers):
+            if left and answer is None and not names:
+                results.append(None)
+            else:
+                results.append(merge_names(names, answer or []))
+        return results
+
+    async def _extract_lists(self, flat: List[List[str]], progress=None) -> List[Optional[List[str]]]:
+        keys = [cache_key(lines, self.model, PROMPT_VERSION) if lines else None for lines in flat]
+        known = self.cache.get_many(key for key in keys if key) if self.cache else {}
+        # One request per distinct uncached ingredient list
+        pending = {}
+        for key, lines in zip(keys, flat):
+            if key and key not in known and key not in pending:
+                pending[key] = lines
+        if progress is not None:
+            progress.update(len(flat) - len(pending))
+
+        pending_keys = list(pending)
+        batches = [pending_keys[i:i + self.batch_size] for i in range(0, len(pending_keys), self.batch_size)]
+
+        async def run(batch_keys):
+            results = await self.extract_batch([pending[key] for key in batch_keys])
+            answered = [(key, names) for key, names in zip(batch_keys, results) if names is not None]
+            if self.cache and answered:
+                self.cache.put_many(answered, self.model, PROMPT_VERSION)
+            known.update(answered)
+            if progress is not None:
+                progress.update(len(batch_keys))
+
+        await asyncio.gather(*(run(batch_keys) for batch_keys in batches))
+        return [known.get(key) if key else [] for key in keys]
+
+
+def make_client(base_url: Optional[str] = None) -> AsyncOpenAI:
+    load_dotenv()
+    # Retries are handled by MainIngredientExtractor, with backoff shared across batches
+    return AsyncOpenAI(
+        api_key=os.getenv('openai_api_key') or "not-needed",
+        base_url=base_url or os.getenv('openai_base_url'),
+        max_retries=0
+    )
+
+
+async def enrich_recipes(recipes: List[Dict], extractor: MainIngredientExtractor) -> int:
+    """Set details.main_ingredients on every recipe; returns how many succeeded."""
+    with tqdm(total=len(recipes), desc="Processing recipes") as progress:
+        extracted = await extractor.extract_many(
+            [recipe['details']['ingredients'] for recipe in recipes], progress
+        )
+    done = 0
+    for recipe, names in zip(recipes, extracted):
+        if names is None:
+            print(f"No main ingredients for: {recipe['title']}")
+            continue
+        recipe['details']['main_ingredients'] = names
+        done += 1
+    return done
+
+
+def output_path(input_filename: str, output_dir: str = "data") -> str:
+    base_name = os.path.basename(input_filename)
+    category_name = base_name.replace('recipe_titles_', '').replace('.json', '')
+    return os.path.join(output_dir, f"{category_name}.json")
+
+
+async def process_recipe_file(input_filename: str, extractor: MainIngredientExtractor, output_filename: Optional[str] = None):
+    output_filename = output_filename or output_path(input_filename)
+    with open(input_filename, 'r', encoding='utf-8') as file:
+        recipes = json.load(file)
+
+    done = await enrich_recipes(recipes, extractor)
+
+    with open(output_filename, 'w', encoding='utf-8') as file:
+        json.dump(recipes, file, indent=4)
+    print(f"{input_filename}: {done}/{len(recipes)} recipes enriched -> {output_filename}")
+
+
+async def process_recipe_files(input_filenames: List[str], extractor: MainIngredientExtractor, output_dir: str = "data"):
+    for input_filename in input_filenames:
+        await process_recipe_file(input_filename, extractor, output_path(input_filename, output_dir))
+    if extractor.cache:
+        extractor.cache.print_summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add main_ingredients to scraped recipe files with batched, concurrent LLM requests")
+    parser.add_argument("files", nargs="+", help="recipe_titles_*.json files to enrich")
+    parser.add_argument("--output-dir", default="data", help="Where to write <category>.json")
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Requests in flight at once")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Recipes per request; 1 sends the original single-recipe prompt")
+    parser.add_argument("--max-retries", type=int, default=MAX_RETRIES, help="Retries per request on rate limits, timeouts and server errors")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint, e.g. a local stub_model_server.py")
+    parser.add_argument("--cache", default=MAIN_INGREDIENTS_CACHE_FILE, help="SQLite cache of earlier answers (see ingredient_cache.py)")
+    parser.add_argument("--llm-only", action="store_true", help="Send every ingredient line to the model instead of parsing what the rules can read locally")
+    parser.add_argument("--no-cache", action="store_true", help="Ask the model for every recipe, ignoring and not filling the cache")
+    args = parser.parse_args()
+
+    async def run():
+        cache = None if args.no_cache else IngredientCache(args.cache)
+        extractor = MainIngredientExtractor(
+            make_client(args.base_url), args.model, args.concurrency, args.batch_size, args.max_retries, cache,
+            local_parser=not args.llm_only
+        )
+        try:
+            await process_recipe_files(args.files, extractor, args.output_dir)
+        finally:
+            if cache:
+                cache.close()
+        print(f"{extractor.parsed_lines} lines parsed locally, {extractor.llm_lines} sent to the model: "
+              f"{extractor.requests} requests, {extractor.retries} retries")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
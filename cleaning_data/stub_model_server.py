@@ -0,0 +1,189 @@
+"""Local OpenAI-compatible chat completions server for offline runs.
+
+Answers POST /v1/chat/completions the way llm_enrichment.py expects,
+without a model: quantities and measurements are stripped from every
+ingredient line by a few rules. Responses can be delayed (`latency` +
+up to `jitter` seconds), a share of them can be answered with 429 and
+Retry-After (`rate_limit_rate`), and a share of the items in batch answers
+can come back malformed (`malformed_rate`), with a seeded RNG so runs are
+repeatable.
+
+    python cleaning_data/stub_model_server.py --port 8001 --latency 0.8
+    python cleaning_data/llm_enrichment.py data/recipe_titles_ayam_115.json --base-url http://127.0.0.1:8001/v1
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+# Leading quantity: "2", "1/2", "1 1/2", "2-3", "½"
+_QUANTITY = re.compile(r"^\s*[\d½¼¾/.,\-\s]+")
+_UNITS = re.compile(
+    r"^(biji|ulas|batang|helai|sudu besar|sudu kecil|sudu|cawan|gram|g|kg|ml|liter|inci|keping|ekor|secubit|sedikit|tin|paket|genggam)\b\s*",
+    re.IGNORECASE
+)
+
+
+def main_ingredient(line: str) -> str:
+    """Strip quantity, unit and trailing notes from one ingredient line."""
+    name = _UNITS.sub("", _QUANTITY.sub("", line)).strip()
+    name = re.split(r"[,(]", name)[0].strip()
+    return name or line.strip()
+
+
+def _answer(request: Dict, malformed=lambda: False) -> str:
+    messages = request.get("messages", [])
+    content = messages[-1]["content"] if messages else ""
+    if (request.get("response_format") or {}).get("type") == "json_object":
+        recipes = json.loads(content).get("recipes", [])
+        answers = []
+        for recipe in recipes:
+            names = [main_ingredient(line) for line in recipe["ingredients"]]
+            # What a model sometimes does: one string instead of a list
+            answers.append({"id": recipe["id"], "main_ingredients": ", ".join(names) if malformed() else names})
+        return json.dumps({"recipes": answers}, ensure_ascii=False)
+    lines = content.split(":", 1)[-1].split(", ")
+    return ", ".join(main_ingredient(line) for line in lines if line.strip())
+
+
+class StubModelServer:
+    """Threaded stub server running in a background thread; use as a context manager."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.malformed_rate = malformed_rate
+        self.requests = 0
+        self.rate_limited = 0
+        self.malformed = 0
+        self.recipes = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _handle(self, request):
+        body = request.rfile.read(int(request.headers.get("Content-Length", 0)))
+        if request.path.rstrip("/") != "/v1/chat/completions":
+            self._send(request, 404, {"error": {"message": "Not Found"}})
+            return
+
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            limited = self._random.random() < self.rate_limit_rate
+            if limited:
+                self.rate_limited += 1
+        if limited:
+            self._send(request, 429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                       {"Retry-After": f"{self.retry_after:g}"})
+            return
+        if delay > 0:
+            time.sleep(delay)
+
+        payload = json.loads(body or b"{}")
+        content = _answer(payload, self._malformed)
+        if (payload.get("response_format") or {}).get("type") == "json_object":
+            batch = len(json.loads(content)["recipes"])
+        else:
+            batch = 1
+        with self._lock:
+            self.recipes += batch
+        self._send(request, 200, {
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        })
+
+    def _malformed(self) -> bool:
+        with self._lock:
+            malformed = self._random.random() < self.malformed_rate
+            if malformed:
+                self.malformed += 1
+        return malformed
+
+    @staticmethod
+    def _send(request, status: int, payload: Dict, headers: Dict[str, str] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a stub OpenAI chat completions endpoint locally")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra random seconds per response")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with every 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of batch answer items sent malformed")
+    args = parser.parse_args()
+
+    with StubModelServer(port=args.port, latency=args.latency, jitter=args.jitter, rate_limit_rate=args.rate_limit_rate,
+                         retry_after=args.retry_after, malformed_rate=args.malformed_rate) as stub:
+        print(f"Serving stub chat completions on {stub.base_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,187 @@
+"""Approximate nearest-neighbour (IVF) index for large recipe corpora.
+
+Brute force over vector_index.VectorIndex scans every row per query. An
+IVF index clusters the unit vectors with spherical k-means into `nlist`
+lists and stores the rows list by list, so a query only scores the
+centroids and then the rows of the `nprobe` closest lists. `nlist` is fixed
+at build time; `nprobe` trades recall for latency at query time (nprobe ==
+nlist is exact search).
+
+An IVF index directory is an exact index directory with its rows reordered
+by list plus two extra files, so VectorIndex can still open it for exact
+search and ground truth:
+
+    vectors.f32        N x dims float32 unit rows, grouped by list
+    meta.json          as for vector_index.py, plus {"kind": "ivf", "nlist", "nprobe"}
+    ivf-centroids.f32  nlist x dims float32 unit centroids
+    ivf-offsets.i64    nlist + 1 row offsets; list c is rows offsets[c]:offsets[c + 1]
+
+    python embeddings/vector_index.py build data/*.json --index recipe_index
+    python embeddings/ann_index.py build recipe_index recipe_index_ivf --nlist 64 --nprobe 8
+    SEARCH_BACKEND=local RECIPE_INDEX=recipe_index_ivf python embeddings/search_recipe.py
+"""
+import argparse
+import json
+import os
+import time
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_index import VectorIndex, normalize_rows, select_top, write_meta
+
+# k-means is trained on at most this many rows per list
+KMEANS_SAMPLE_PER_LIST = 256
+# ... and on at most this many bytes of rows (~87k rows of 1536 dims), whatever nlist is
+KMEANS_SAMPLE_BYTES = 512 * 1024 * 1024
+KMEANS_ITERATIONS = 10
+# Rows scored against the centroids, or copied into list order, at once
+ASSIGN_CHUNK = 65536
+
+_DTYPE = np.dtype("<f4")
+
+
+def default_nlist(count: int) -> int:
+    """About 4 * sqrt(N) lists, the usual starting point for IVF."""
+    return max(1, min(count, int(4 * np.sqrt(count))))
+
+
+def default_nprobe(nlist: int) -> int:
+    return max(1, nlist // 16)
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Closest centroid (highest dot product) of every row, computed in chunks to bound memory."""
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        chunk = np.asarray(vectors[start:start + ASSIGN_CHUNK], dtype=_DTYPE)
+        assignment[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignment
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of the (unit) rows; empty lists are re-seeded from random rows."""
+    rng = np.random.default_rng(seed)
+    row_bytes = vectors.shape[1] * _DTYPE.itemsize
+    take = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST, max(nlist, KMEANS_SAMPLE_BYTES // row_bytes))
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), take, replace=False))], dtype=_DTYPE)
+    centroids = sample[rng.choice(take, nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = assign_lists(sample, centroids)
+        counts = np.bincount(assignment, minlength=nlist)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        sums = np.empty_like(centroids)
+        sums[filled] = np.add.reduceat(sample[np.argsort(assignment, kind="stable")], starts[filled], axis=0)
+        sums[~filled] = sample[rng.choice(take, int((~filled).sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def build_ivf(
+    source: VectorIndex,
+    path: str,
+    nlist: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    iterations: int = KMEANS_ITERATIONS,
+    seed: int = 0
+) -> "IVFIndex":
+    """Cluster the rows of an exact index into an IVF index at `path` and open it.
+
+    The source rows stay memory-mapped and are copied into list order one
+    chunk at a time, so memory is bounded by the k-means sample (twice
+    KMEANS_SAMPLE_BYTES at most) rather than by the size of the index.
+    """
+    nlist = nlist or default_nlist(len(source))
+    nlist = min(nlist, len(source))
+    centroids = train_centroids(source.matrix, nlist, iterations, seed)
+    assignment = assign_lists(source.matrix, centroids)
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))]).astype("<i8")
+    records = [source.records[row] for row in order] if source.records else []
+
+    os.makedirs(path, exist_ok=True)
+    # An interrupted rebuild must not leave an old meta.json describing new files
+    meta_path = os.path.join(path, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    vectors_path = os.path.join(path, "vectors.f32")
+    with open(vectors_path + ".tmp", "wb") as f:
+        for start in range(0, len(order), ASSIGN_CHUNK):
+            # Source rows are already unit length
+            f.write(np.asarray(source.matrix[order[start:start + ASSIGN_CHUNK]], dtype=_DTYPE).tobytes())
+    os.replace(vectors_path + ".tmp", vectors_path)
+    for name, array in (("ivf-centroids.f32", centroids.astype(_DTYPE)), ("ivf-offsets.i64", offsets)):
+        target = os.path.join(path, name)
+        array.tofile(target + ".tmp")
+        os.replace(target + ".tmp", target)
+    extra = {"kind": "ivf", "nlist": nlist, "nprobe": min(nlist, nprobe or default_nprobe(nlist))}
+    write_meta(path, source.model, source.dims, len(order), records, extra)
+    return IVFIndex(path)
+
+
+class IVFIndex(VectorIndex):
+    """Inverted-file index: only the rows of the `nprobe` lists closest to the query are scored."""
+
+    def __init__(self, path: str, nprobe: Optional[int] = None):
+        super().__init__(path)
+        self.nlist = self.meta["nlist"]
+        self.nprobe = nprobe or self.meta.get("nprobe") or default_nprobe(self.nlist)
+        self.centroids = np.fromfile(os.path.join(path, "ivf-centroids.f32"), dtype=_DTYPE).reshape(self.nlist, self.dims)
+        self.offsets = np.fromfile(os.path.join(path, "ivf-offsets.i64"), dtype="<i8")
+
+    def top_rows(self, query_vector: Sequence[float], limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = self.normalize_query(query_vector)
+        probe = select_top(np.arange(self.nlist), self.centroids @ query, min(self.nprobe, self.nlist))[0]
+        rows, scores = [], []
+        for c in probe:
+            start, end = self.offsets[c], self.offsets[c + 1]
+            if end > start:
+                # Lists are contiguous, so this is a slice of the memmap, not a gather
+                scores.append(self.matrix[start:end] @ query)
+                rows.append(np.arange(start, end))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=_DTYPE)
+        return select_top(np.concatenate(rows), np.concatenate(scores), limit)
+
+
+def open_index(path: str) -> VectorIndex:
+    """Open an index directory as whatever kind it was built as (exact unless meta.json says otherwise)."""
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        kind = json.load(f).get("kind", "exact")
+    if kind == "ivf":
+        return IVFIndex(path)
+    if kind == "exact":
+        return VectorIndex(path)
+    raise ValueError(f"Unknown index kind {kind!r} in {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an IVF index from an exact vector index")
+    parser.add_argument("command", choices=["build", "stats"])
+    parser.add_argument("source", help="Exact index directory for build (see vector_index.py), any index for stats")
+    parser.add_argument("output", nargs="?", help="IVF index directory to write")
+    parser.add_argument("--nlist", type=int, default=None, help="Number of lists (default about 4 * sqrt(N))")
+    parser.add_argument("--nprobe", type=int, default=None, help="Lists scanned per query by default (default nlist / 16)")
+    parser.add_argument("--iterations", type=int, default=KMEANS_ITERATIONS, help="k-means iterations")
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        index = open_index(args.source)
+        stats = {"kind": index.meta.get("kind", "exact"), "count": len(index), "dims": index.dims}
+        if isinstance(index, IVFIndex):
+            sizes = np.diff(index.offsets)
+            stats.update(nlist=index.nlist, nprobe=index.nprobe, largest_list=int(sizes.max()), empty_lists=int((sizes == 0).sum()))
+        print(json.dumps(stats, indent=4))
+        return
+
+    if not args.output:
+        parser.error("build needs an output directory")
+    started = time.perf_counter()
+    index = build_ivf(VectorIndex(args.source), args.output, args.nlist, args.nprobe, args.iterations)
+    print(f"Built IVF index of {len(index)} vectors in {index.nlist} lists (nprobe {index.nprobe}) "
+          f"into {args.output} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Batched embedding requests.
+
+The embeddings endpoint takes a list of inputs, so instead of one request
+per recipe the texts are grouped into batches bounded by an item count
+and an (estimated) token budget, and the vectors are mapped back to their
+texts by the `index` of every result. Identical texts are embedded once.
+A batch that keeps failing is split in half and only the failing halves
+are retried, so one bad input cannot sink a whole file. With an
+EmbeddingCache, texts embedded before (by ingest or by an earlier search)
+skip the API entirely.
+
+    python embeddings/batch_embeddings.py data/seafood_43.json --fake
+    python embeddings/batch_embeddings.py data/*.json --batch-items 128
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Optional, Sequence
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+# The API accepts up to 2048 inputs and ~300k tokens per request; stay well below both
+MAX_BATCH_ITEMS = 256
+MAX_BATCH_TOKENS = 100_000
+# Longest single input the embedding models accept
+MAX_INPUT_TOKENS = 8191
+MAX_RETRIES = 3
+# Seconds before the first retry; doubles with every attempt
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _ENCODING = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken if installed, otherwise a conservative 3 characters per token."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 3 + 1
+
+
+def plan_batches(texts: Sequence[str], max_items: int = MAX_BATCH_ITEMS, max_tokens: int = MAX_BATCH_TOKENS) -> List[List[int]]:
+    """Group text indices into batches within the item and token budgets, keeping their order."""
+    batches = []
+    current, current_tokens = [], 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    return status
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors and connection problems are worth retrying; bad input is not."""
+    status = _status_code(error)
+    return status is None or status == 429 or status >= 500
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return float(response.headers.get("retry-after"))
+        except (TypeError, ValueError, AttributeError):
+            pass
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class BatchEmbedder:
+    """Embeds many texts with as few requests as the budgets allow.
+
+    Works with the OpenAI client or anything with the same
+    `embeddings.create(model=..., input=[...])` surface, such as
+    fake_embeddings.FakeEmbeddingClient.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str = EMBEDDING_MODEL,
+        max_items: int = MAX_BATCH_ITEMS,
+        max_tokens: int = MAX_BATCH_TOKENS,
+        max_retries: int = MAX_RETRIES,
+        cache=None
+    ):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.max_retries = max_retries
+        self.requests = 0
+        self.retries = 0
+        self.failed = 0
+
+    def _request(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.requests += 1
+                response = self.client.embeddings.create(model=self.model, input=texts)
+                # Results carry the index of their input; do not rely on response order
+                ordered = sorted(response.data, key=lambda item: item.index)
+                if len(ordered) != len(texts):
+                    raise ValueError(f"Expected {len(texts)} embeddings, got {len(ordered)}")
+                return [item.embedding for item in ordered]
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                self.retries += 1
+                time.sleep(_retry_delay(e, attempt))
+
+    def _embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        try:
+            return self._request(texts)
+        except Exception as e:
+            if len(texts) == 1:
+                print(f"✗ Embedding failed for {texts[0][:60]!r}: {str(e)}")
+                self.failed += 1
+                return [None]
+            # Only the half that still fails gets split again
+            middle = len(texts) // 2
+            return self._embed_batch(texts[:middle]) + self._embed_batch(texts[middle:])
+
+    def embed(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Embedding for every text in order; None for empty texts and inputs that failed."""
+        unique = {}
+        for text in texts:
+            if text and text.strip() and text not in unique:
+                unique[text] = len(unique)
+        vectors: Dict[str, Optional[List[float]]] = {}
+        if self.cache is not None:
+            vectors.update((text, vector.tolist()) for text, vector in self.cache.get_many(self.model, unique).items())
+        distinct = [text for text in unique if text not in vectors]
+        too_long = [text for text in distinct if estimate_tokens(text) > MAX_INPUT_TOKENS]
+        if too_long:
+            print(f"Warning: {len(too_long)} texts may exceed {MAX_INPUT_TOKENS} tokens")
+
+        for batch in plan_batches(distinct, self.max_items, self.max_tokens):
+            batch_texts = [distinct[i] for i in batch]
+            embedded = list(zip(batch_texts, self._embed_batch(batch_texts)))
+            vectors.update(embedded)
+            if self.cache is not None:
+                self.cache.put_many(self.model, [(text, vector) for text, vector in embedded if vector is not None])
+        return [vectors.get(text) for text in texts]
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = self.embed([text])[0]
+        if vector is None:
+            raise ValueError(f"Could not embed {text[:60]!r}")
+        return vector
+
+
+def ingredients_text(main_ingredients: List[str]) -> str:
+    """Text embedded for a recipe's main ingredients (see bulk_loader.py)."""
+    return ", ".join(main_ingredients)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed the main ingredients of recipe files in batches and report the cost")
+    parser.add_argument("files", nargs="+", help="Recipe JSON files with details.main_ingredients")
+    parser.add_argument("--batch-items", type=int, default=MAX_BATCH_ITEMS, help="Most texts per request")
+    parser.add_argument("--batch-tokens", type=int, default=MAX_BATCH_TOKENS, help="Most estimated tokens per request")
+    parser.add_argument("--fake", action="store_true", help="Use the local fake provider instead of the OpenAI API")
+    parser.add_argument("--cache", default=None, help="Embedding cache directory to consult and fill (see embedding_cache.py)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="With --fake, share of requests that fail with a 500")
+    args = parser.parse_args()
+
+    if args.fake:
+        from fake_embeddings import FakeEmbeddingClient
+        client = FakeEmbeddingClient(fail_rate=args.fail_rate)
+    else:
+        import os
+        from dotenv import load_dotenv
+        from openai import OpenAI
+        load_dotenv()
+        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    recipes = []
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            recipes.extend(json.load(f))
+
+    cache = None
+    if args.cache:
+        from embedding_cache import EmbeddingCache
+        cache = EmbeddingCache(args.cache)
+    embedder = BatchEmbedder(client, max_items=args.batch_items, max_tokens=args.batch_tokens, cache=cache)
+    started = time.perf_counter()
+    vectors = embedder.embed([ingredients_text(r['details'].get('main_ingredients', [])) for r in recipes])
+    elapsed = time.perf_counter() - started
+    done = sum(1 for vector in vectors if vector is not None)
+    print(f"Embedded {done}/{len(recipes)} recipes in {elapsed:.2f}s with {embedder.requests} requests "
+          f"({embedder.retries} retries, {embedder.failed} failed)")
+    if cache:
+        cache.print_summary()
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
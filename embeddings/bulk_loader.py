@@ -0,0 +1,214 @@
+"""Bulk, idempotent loader for the recipes and recipe_embeddings tables.
+
+Recipes are upserted in chunks keyed on recipe_url and the returned ids
+are used to upsert the matching chunk of embeddings keyed on recipe_id, so
+loading the same files twice updates rows instead of duplicating them.
+Several chunks are in flight at once (one chunk's embeddings are written
+while the next chunk's recipes are), and a failing chunk is reported with
+its recipe URLs instead of stopping the load.
+
+    python embeddings/bulk_loader.py data/*.json
+    python embeddings/bulk_loader.py data/*.json --memory --fake-embeddings   # no network at all
+
+The upserts need unique constraints on the conflict columns:
+
+    alter table recipes add constraint recipes_recipe_url_key unique (recipe_url);
+    alter table recipe_embeddings add constraint recipe_embeddings_recipe_id_key unique (recipe_id);
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+from batch_embeddings import BatchEmbedder, ingredients_text
+
+# Recipes per upsert; a recipe row with ingredients and instructions is a few KB
+CHUNK_SIZE = 100
+# Chunks in flight at once
+CONCURRENCY = 4
+
+
+def format_recipe_data(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    """Format recipe data for the recipes table."""
+    return {
+        'title': recipe.get('title') or recipe.get('recipe_url'),
+        'recipe_url': recipe['recipe_url'],
+        'preparation_time': recipe['details'].get('masa_penyediaan'),
+        'cooking_time': recipe['details'].get('masa_memasak'),
+        'total_time': recipe['details'].get('jumlah_masa'),
+        'servings': recipe['details'].get('hidangan'),
+        'ingredients': recipe['details']['ingredients'],
+        'instructions': recipe['details']['instructions'],
+        'tips': recipe['details'].get('tips_and_guides', []),
+        'image_url': recipe['details'].get('image_url')
+    }
+
+
+@dataclass
+class LoadReport:
+    recipes: int = 0
+    embeddings: int = 0
+    # Recipes left out before loading (no recipe_url, no embedding), with the reason
+    skipped: List[Tuple[str, str]] = field(default_factory=list)
+    # (chunk number, stage, error, recipe URLs) of every chunk that failed
+    failures: List[Tuple[int, str, str, List[str]]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed_urls(self) -> List[str]:
+        return [url for _, _, _, urls in self.failures for url in urls]
+
+    def print_summary(self):
+        print(f"Loaded {self.recipes} recipes and {self.embeddings} embeddings in {self.seconds:.2f}s")
+        for title, reason in self.skipped:
+            print(f"  skipped {title}: {reason}")
+        for chunk, stage, error, urls in self.failures:
+            print(f"✗ Chunk {chunk} failed at {stage} ({len(urls)} recipes): {error}")
+
+
+def dedupe_recipes(recipes: List[Dict[str, Any]], report: LoadReport) -> List[Dict[str, Any]]:
+    """One recipe per recipe_url, the last one read wins (an upsert cannot touch a row twice)."""
+    by_url = {}
+    for recipe in recipes:
+        url = recipe.get('recipe_url')
+        if not url:
+            report.skipped.append((recipe.get('title', 'Unknown Title'), "no recipe_url"))
+            continue
+        by_url.pop(url, None)
+        by_url[url] = recipe
+    return list(by_url.values())
+
+
+def _load_chunk(client, number: int, chunk: List[Dict[str, Any]], embeddings: List[List[float]]) -> LoadReport:
+    """Upsert one chunk of recipes, then its embeddings; runs in a loader thread."""
+    report = LoadReport()
+    urls = [recipe['recipe_url'] for recipe in chunk]
+    try:
+        response = client.table('recipes').upsert(
+            [format_recipe_data(recipe) for recipe in chunk], on_conflict='recipe_url'
+        ).execute()
+    except Exception as e:
+        report.failures.append((number, "recipes", str(e), urls))
+        return report
+    ids = {row['recipe_url']: row['id'] for row in response.data}
+    report.recipes = len(ids)
+
+    rows = []
+    for recipe, embedding in zip(chunk, embeddings):
+        recipe_id = ids.get(recipe['recipe_url'])
+        if recipe_id is None:
+            continue
+        rows.append({
+            'recipe_id': recipe_id,
+            'main_ingredients': recipe['details'].get('main_ingredients', []),
+            'ingredients_embedding': embedding
+        })
+    missing = [url for url in urls if url not in ids]
+    if missing:
+        report.failures.append((number, "recipes", "no id returned", missing))
+    try:
+        client.table('recipe_embeddings').upsert(rows, on_conflict='recipe_id').execute()
+    except Exception as e:
+        report.failures.append((number, "recipe_embeddings", str(e), [url for url in urls if url in ids]))
+        return report
+    report.embeddings = len(rows)
+    return report
+
+
+def load_recipes(
+    client,
+    recipes: List[Dict[str, Any]],
+    embedder: BatchEmbedder,
+    chunk_size: int = CHUNK_SIZE,
+    concurrency: int = CONCURRENCY
+) -> LoadReport:
+    """Upsert recipes and their main-ingredient embeddings; returns what was loaded and what failed."""
+    report = LoadReport()
+    started = time.perf_counter()
+    recipes = dedupe_recipes(recipes, report)
+
+    vectors = embedder.embed([ingredients_text(r['details'].get('main_ingredients', [])) for r in recipes])
+    ready = []
+    for recipe, vector in zip(recipes, vectors):
+        if vector is None:
+            report.skipped.append((recipe.get('title') or recipe.get('recipe_url'), "no embedding"))
+        else:
+            ready.append((recipe, vector))
+
+    chunks = [ready[i:i + chunk_size] for i in range(0, len(ready), chunk_size)]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [
+            pool.submit(_load_chunk, client, number, [r for r, _ in chunk], [v for _, v in chunk])
+            for number, chunk in enumerate(chunks, 1)
+        ]
+        for future in futures:
+            chunk_report = future.result()
+            report.recipes += chunk_report.recipes
+            report.embeddings += chunk_report.embeddings
+            report.failures.extend(chunk_report.failures)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def read_recipe_files(paths: List[str]) -> List[Dict[str, Any]]:
+    recipes = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            recipes.extend(json.load(f))
+    return recipes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upsert recipe files and their embeddings into Supabase in bulk")
+    parser.add_argument("files", nargs="+", help="Recipe JSON files with details.main_ingredients")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Recipes per upsert")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Chunks in flight at once")
+    parser.add_argument("--memory", action="store_true", help="Load into an in-memory stand-in instead of Supabase")
+    parser.add_argument("--latency", type=float, default=0.0, help="With --memory, seconds per simulated round-trip")
+    parser.add_argument("--fake-embeddings", action="store_true", help="Use the local fake embedding provider")
+    parser.add_argument("--cache", default=None, help="Embedding cache directory (default embedding_cache/, see embedding_cache.py)")
+    parser.add_argument("--no-cache", action="store_true", help="Embed every recipe again instead of consulting the embedding cache")
+    parser.add_argument("--failed-out", default=None, help="Write the recipe URLs that failed to this file, one per line")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.memory:
+        from memory_store import MemoryStorageClient
+        client = MemoryStorageClient(latency=args.latency)
+    else:
+        from supabase import create_client
+        client = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+    if args.fake_embeddings:
+        from fake_embeddings import FakeEmbeddingClient
+        openai_client = FakeEmbeddingClient()
+    else:
+        from openai import OpenAI
+        openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    cache = None
+    if not args.no_cache:
+        from embedding_cache import EmbeddingCache, EMBEDDING_CACHE_DIR
+        cache = EmbeddingCache(args.cache or EMBEDDING_CACHE_DIR)
+
+    recipes = read_recipe_files(args.files)
+    print(f"Found {len(recipes)} recipes to process")
+    try:
+        report = load_recipes(client, recipes, BatchEmbedder(openai_client, cache=cache), args.chunk_size, args.concurrency)
+    finally:
+        if cache:
+            cache.print_summary()
+            cache.close()
+    report.print_summary()
+    if args.failed_out and report.failures:
+        with open(args.failed_out, 'w', encoding='utf-8') as f:
+            f.write("\n".join(report.failed_urls) + "\n")
+        print(f"Failed recipe URLs saved to: {args.failed_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Persistent embedding cache keyed by model + normalized text.
+
+Vectors are stored as raw little-endian float32 rows in one flat file per
+dimension count (vectors-1536.f32), which is memory-mapped for reads, and
+a SQLite index maps each key to its row. Entries are evicted least
+recently used first once the vectors exceed `max_bytes`; their rows are
+reused by later inserts, so the files stay within the budget plus one batch.
+
+    python embeddings/embedding_cache.py stats
+    python embeddings/embedding_cache.py evict --max-mb 64
+
+Layout of a cache directory:
+    index.db            key -> (model, dims, row, last use)
+    vectors-1536.f32    float32 rows, 6 KB each for text-embedding-3-small
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+EMBEDDING_CACHE_DIR = "embedding_cache"
+# Room for ~40k text-embedding-3-small vectors
+MAX_BYTES = 256 * 1024 * 1024
+
+_DTYPE = np.dtype("<f4")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, collapse whitespace and space commas evenly: "Telur,bawang " == "telur, bawang"."""
+    text = re.sub(r"\s*,\s*", ", ", text.strip().lower())
+    return " ".join(text.split())
+
+
+def embedding_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Model + text -> float32 vector store with LRU eviction and hit-rate accounting."""
+
+    def __init__(self, path: str = EMBEDDING_CACHE_DIR, max_bytes: Optional[int] = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._maps: Dict[int, np.memmap] = {}
+        os.makedirs(path, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(path, "index.db"))
+        self.conn.execute("pragma journal_mode=wal")
+        self.conn.executescript(
+            """create table if not exists embeddings (
+                key text primary key,
+                model text,
+                dims integer,
+                row integer,
+                last_used_at real
+            );
+            create index if not exists embeddings_by_use on embeddings (last_used_at);
+            create table if not exists free_rows (
+                dims integer,
+                row integer,
+                primary key (dims, row)
+            );"""
+        )
+        self.conn.commit()
+
+    def close(self):
+        self._maps.clear()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _vectors_path(self, dims: int) -> str:
+        return os.path.join(self.path, f"vectors-{dims}.f32")
+
+    def _rows_in_file(self, dims: int) -> int:
+        path = self._vectors_path(dims)
+        return os.path.getsize(path) // (dims * _DTYPE.itemsize) if os.path.exists(path) else 0
+
+    def _vectors(self, dims: int) -> np.memmap:
+        """Read-only map of a vectors file, re-mapped when the file has grown."""
+        rows = self._rows_in_file(dims)
+        mapped = self._maps.get(dims)
+        if mapped is None or mapped.shape[0] != rows:
+            self._maps[dims] = np.memmap(self._vectors_path(dims), dtype=_DTYPE, mode="r", shape=(rows, dims))
+        return self._maps[dims]
+
+    def get_many(self, model: str, texts: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors of the given texts (float32 copies); marks them as used."""
+        keys = {}
+        for text in texts:
+            keys.setdefault(embedding_key(model, text), []).append(text)
+        found = {}
+        used = []
+        key_list = list(keys)
+        # SQLite caps the number of bound parameters per statement
+        for i in range(0, len(key_list), 500):
+            chunk = key_list[i:i + 500]
+            rows = self.conn.execute(
+                f"select key, dims, row from embeddings where key in ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for key, dims, row in rows:
+                vector = np.array(self._vectors(dims)[row])
+                for text in keys[key]:
+                    found[text] = vector
+                used.append(key)
+        self.hits += len(used)
+        self.misses += len(keys) - len(used)
+        if used:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany("update embeddings set last_used_at = ? where key = ?", [(now, key) for key in used])
+        return found
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        return self.get_many(model, [text]).get(text)
+
+    def put_many(self, model: str, items: Sequence[Tuple[str, Sequence[float]]]):
+        now = time.time()
+        files = {}
+        try:
+            with self.conn:
+                for text, vector in items:
+                    vector = np.asarray(vector, dtype=_DTYPE)
+                    dims = vector.shape[0]
+                    row_bytes = dims * _DTYPE.itemsize
+                    if dims not in files:
+                        path = self._vectors_path(dims)
+                        files[dims] = open(path, "r+b" if os.path.exists(path) else "w+b")
+                    f = files[dims]
+
+                    key = embedding_key(model, text)
+                    existing = self.conn.execute("select dims, row from embeddings where key = ?", (key,)).fetchone()
+                    if existing and existing[0] == dims:
+                        row = existing[1]
+                    else:
+                        if existing:
+                            self.conn.execute("insert or ignore into free_rows (dims, row) values (?, ?)", existing)
+                        free = self.conn.execute("select row from free_rows where dims = ? limit 1", (dims,)).fetchone()
+                        if free:
+                            row = free[0]
+                            self.conn.execute("delete from free_rows where dims = ? and row = ?", (dims, row))
+                        else:
+                            row = f.seek(0, os.SEEK_END) // row_bytes
+                    f.seek(row * row_bytes)
+                    f.write(vector.tobytes())
+                    self.conn.execute(
+                        "insert or replace into embeddings (key, model, dims, row, last_used_at) values (?, ?, ?, ?, ?)",
+                        (key, model, dims, row, now)
+                    )
+        finally:
+            for f in files.values():
+                f.close()
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes)
+
+    def size_bytes(self) -> int:
+        row = self.conn.execute("select coalesce(sum(dims), 0) from embeddings").fetchone()
+        return row[0] * _DTYPE.itemsize
+
+    def evict(self, max_bytes: int) -> int:
+        """Drop least recently used entries until the vectors fit in `max_bytes`; returns how many went."""
+        excess = self.size_bytes() - max_bytes
+        if excess <= 0:
+            return 0
+        victims = []
+        for key, dims, row in self.conn.execute("select key, dims, row from embeddings order by last_used_at"):
+            if excess <= 0:
+                break
+            victims.append((key, dims, row))
+            excess -= dims * _DTYPE.itemsize
+        with self.conn:
+            self.conn.executemany("delete from embeddings where key = ?", [(key,) for key, _, _ in victims])
+            # Freed rows are overwritten by the next inserts instead of growing the file
+            self.conn.executemany("insert or ignore into free_rows (dims, row) values (?, ?)", [(dims, row) for _, dims, row in victims])
+        return len(victims)
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict:
+        models = {
+            f"{model}/{dims}": count for model, dims, count in self.conn.execute(
+                "select model, dims, count(*) from embeddings group by model, dims"
+            )
+        }
+        files = sum(os.path.getsize(os.path.join(self.path, name)) for name in os.listdir(self.path) if name.endswith(".f32"))
+        return {
+            "entries": sum(models.values()),
+            "vector_bytes": self.size_bytes(),
+            "file_bytes": files,
+            "models": models,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate(), 4)
+        }
+
+    def print_summary(self):
+        print(f"Embedding cache {self.path}: {self.hits} hits, {self.misses} misses ({self.hit_rate():.0%} hit rate)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or trim the embedding cache")
+    parser.add_argument("command", choices=["stats", "evict"])
+    parser.add_argument("--cache", default=EMBEDDING_CACHE_DIR)
+    parser.add_argument("--max-mb", type=float, default=MAX_BYTES / (1024 * 1024), help="Size budget of the cached vectors")
+    args = parser.parse_args()
+
+    with EmbeddingCache(args.cache, max_bytes=None) as cache:
+        if args.command == "evict":
+            print(f"Evicted {cache.evict(int(args.max_mb * 1024 * 1024))} entries")
+        print(json.dumps(cache.stats(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,38 +2,41 @@
 import json
 from supabase import create_client
 from openai import OpenAI
+from batch_embeddings import BatchEmbedder, ingredients_text
+from embedding_cache import EmbeddingCache
 
 supabase = create_client(
     supabase_url="YOUR_SUPABASE_URL",
     supabase_key="YOUR_SUPABASE_KEY"
 )
 client = OpenAI(api_key="YOUR_OPENAI_API_KEY")
+embedder = BatchEmbedder(client, model="text-embedding-ada-002", cache=EmbeddingCache())
 
 def get_embedding(text):
-    response = client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=text
-    )
-    return response.data[0].embedding
-
-def process_recipe(recipe):
-    # Extract ingredients list
-    ingredients = [item.lower() for sublist in recipe['details']['ingredients'].values() 
-                  for item in sublist]
-    
-    text_to_embed = f"""
+    return embedder.embed_one(text)
+
+def recipe_ingredients(recipe):
+    return [item.lower() for sublist in recipe['details']['ingredients'].values() 
+            for item in sublist]
+
+def recipe_text(recipe):
+    return f"""
     Title: {recipe['title']}
-    Ingredients: {', '.join(ingredients)}
+    Ingredients: {ingredients_text(recipe_ingredients(recipe))}
     Instructions: {' '.join([step for sublist in recipe['details']['instructions'].values() 
                            for step in sublist])}
     """.strip()
 
-    embedding = get_embedding(text_to_embed)
+def process_recipe(recipe, embedding=None):
+    text_to_embed = recipe_text(recipe)
+
+    if embedding is None:
+        embedding = get_embedding(text_to_embed)
 
     data = supabase.table('recipes').insert({
         'title': recipe['title'],
         'content': text_to_embed,
-        'ingredients': ingredients,
+        'ingredients': recipe_ingredients(recipe),
         'embedding': embedding,
         'raw_data': recipe
     }).execute()
@@ -45,8 +48,13 @@ def process_recipe_file(file_path):
         with open(file_path, 'r', encoding='utf-8') as file:
             recipes = json.load(file)
         
-        for recipe in recipes:
-            result = process_recipe(recipe)
+        # Embed the whole file in a few batched requests, then insert recipe by recipe
+        embeddings = embedder.embed([recipe_text(recipe) for recipe in recipes])
+        for recipe, embedding in zip(recipes, embeddings):
+            if embedding is None:
+                print(f"Skipped recipe without embedding: {recipe['title']}")
+                continue
+            result = process_recipe(recipe, embedding)
             print(f"Processed recipe: {recipe['title']}")
             
     except Exception as e:
@@ -100,10 +108,8 @@ process_recipe_file('data/recipe_titles_telur_11.json')
 def search_similar_recipes(ingredients, match_threshold=0.7, limit=3):
     # Create embedding for search query
     search_text = f"Ingredients: {', '.join(ingredients)}"
-    embedding = client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=search_text
-    ).data[0].embedding
+    # Through the shared embedder, so a repeated search is answered from the cache
+    embedding = embedder.embed_one(search_text)
 
     # Query Supabase using vector similarity
     query = supabase.rpc(
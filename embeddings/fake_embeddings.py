@@ -0,0 +1,76 @@
+"""Local stand-in for the OpenAI embeddings API.
+
+`FakeEmbeddingClient` has the `client.embeddings.create(model, input)`
+surface of the OpenAI client and returns deterministic unit vectors: every
+comma- or space-separated term hashes to a fixed random direction and a
+text's vector is the normalised sum of its terms, so texts sharing
+ingredients come out similar, as with the real model. Failures can be
+injected (`fail_rate` for random 500s, `reject` for inputs that fail the
+whole request with a 400, like an input over the token limit) and every
+call is recorded for inspection.
+"""
+import hashlib
+import random
+import re
+from types import SimpleNamespace
+from typing import Iterable, List, Union
+
+import numpy as np
+
+# Dimensions of text-embedding-3-small
+DIMENSIONS = 1536
+# Inputs the real API accepts per request
+MAX_INPUTS = 2048
+
+
+class FakeEmbeddingError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def fake_embedding(text: str, dimensions: int = DIMENSIONS) -> List[float]:
+    vector = np.zeros(dimensions)
+    for term in re.split(r"[,\s]+", text.lower()):
+        if term:
+            seed = int.from_bytes(hashlib.sha256(term.encode("utf-8")).digest()[:8], "little")
+            vector += np.random.default_rng(seed).standard_normal(dimensions)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+class _Embeddings:
+    def __init__(self, client: "FakeEmbeddingClient"):
+        self._client = client
+
+    def create(self, model: str, input: Union[str, List[str]], **kwargs):
+        return self._client._create(model, input)
+
+
+class FakeEmbeddingClient:
+    def __init__(self, dimensions: int = DIMENSIONS, fail_rate: float = 0.0, seed: int = 0, reject: Iterable[str] = ()):
+        self.dimensions = dimensions
+        self.fail_rate = fail_rate
+        self.reject = set(reject)
+        self.calls = []
+        self._random = random.Random(seed)
+        self.embeddings = _Embeddings(self)
+
+    def _create(self, model: str, input: Union[str, List[str]]):
+        texts = [input] if isinstance(input, str) else list(input)
+        self.calls.append(len(texts))
+        if not texts or len(texts) > MAX_INPUTS:
+            raise FakeEmbeddingError(f"Expected 1 to {MAX_INPUTS} inputs, got {len(texts)}", 400)
+        if any(not text for text in texts):
+            raise FakeEmbeddingError("Input cannot be an empty string", 400)
+        if self.reject.intersection(texts):
+            raise FakeEmbeddingError("This model's maximum context length is 8192 tokens", 400)
+        if self._random.random() < self.fail_rate:
+            raise FakeEmbeddingError("The server had an error while processing your request", 500)
+        data = [
+            SimpleNamespace(object="embedding", index=index, embedding=fake_embedding(text, self.dimensions))
+            for index, text in enumerate(texts)
+        ]
+        # The real API does not promise result order either
+        self._random.shuffle(data)
+        return SimpleNamespace(data=data, model=model)
@@ -0,0 +1,123 @@
+"""In-memory stand-in for the Supabase client.
+
+Implements the slice of the supabase-py query builder the loaders use:
+`client.table(name).insert(rows)`, `.upsert(rows, on_conflict=...)`,
+`.select(columns)` with `.eq()`/`.in_()` filters, and `.execute()`
+returning an object with `.data`. Tables get an identity `id` and unique
+keys like the real schema, so idempotency and duplicate handling can be
+checked without a database. Latency and failures can be injected.
+"""
+import copy
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+# Unique key of every table in the Supabase schema (see bulk_loader.py)
+UNIQUE_KEYS = {"recipes": "recipe_url", "recipe_embeddings": "recipe_id"}
+
+
+class MemoryStoreError(Exception):
+    def __init__(self, message: str, code: str = "500"):
+        super().__init__(message)
+        self.code = code
+
+
+class _Query:
+    def __init__(self, store: "MemoryStorageClient", table: str):
+        self.store = store
+        self.table = table
+        self.action = "select"
+        self.rows = []
+        self.on_conflict = None
+        self.columns = "*"
+        self.filters = []
+
+    def insert(self, rows, **kwargs):
+        self.action = "insert"
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None, **kwargs):
+        self.action = "upsert"
+        self.rows = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = on_conflict
+        return self
+
+    def select(self, columns: str = "*", **kwargs):
+        self.columns = columns
+        return self
+
+    def eq(self, column: str, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column: str, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.store._execute(self))
+
+
+class MemoryStorageClient:
+    def __init__(self, latency: float = 0.0, fail_rate: float = 0.0, seed: int = 0, unique_keys: Dict[str, str] = None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.unique_keys = dict(UNIQUE_KEYS if unique_keys is None else unique_keys)
+        self.tables: Dict[str, Dict[int, Dict]] = {}
+        self.requests = 0
+        self._next_id: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def rows(self, table: str) -> List[Dict]:
+        return [copy.deepcopy(row) for row in self.tables.get(table, {}).values()]
+
+    def _execute(self, query: _Query) -> List[Dict]:
+        with self._lock:
+            self.requests += 1
+            fail = self._random.random() < self.fail_rate
+        if self.latency:
+            # A round-trip to the database; released outside the lock so requests overlap
+            time.sleep(self.latency)
+        if fail:
+            raise MemoryStoreError("canceling statement due to statement timeout", "57014")
+
+        with self._lock:
+            table = self.tables.setdefault(query.table, {})
+            if query.action == "select":
+                return [copy.deepcopy(row) for row in table.values() if all(f(row) for f in query.filters)]
+
+            key = query.on_conflict or self.unique_keys.get(query.table)
+            index = {row.get(key): row_id for row_id, row in table.items()} if key else {}
+            if query.action == "upsert":
+                keys = [row.get(key) for row in query.rows]
+                if len(keys) != len(set(keys)):
+                    # Postgres refuses to touch one row twice in a single statement
+                    raise MemoryStoreError("ON CONFLICT DO UPDATE command cannot affect row a second time", "21000")
+            elif key:
+                for row in query.rows:
+                    if row.get(key) in index:
+                        raise MemoryStoreError(f"duplicate key value violates unique constraint on {key}", "23505")
+
+            written = []
+            for row in query.rows:
+                existing = index.get(row.get(key)) if key else None
+                if existing is not None:
+                    table[existing].update(copy.deepcopy(row))
+                    written.append(copy.deepcopy(table[existing]))
+                    continue
+                row_id = self._next_id.get(query.table, 1)
+                self._next_id[query.table] = row_id + 1
+                stored = dict(copy.deepcopy(row), id=row_id)
+                table[row_id] = stored
+                if key:
+                    index[row.get(key)] = row_id
+                written.append(copy.deepcopy(stored))
+            return written
@@ -1,27 +1,35 @@
 import os
 from dotenv import load_dotenv
 from openai import OpenAI
-from supabase import create_client
 from typing import List, Dict, Any
+from batch_embeddings import BatchEmbedder
+from embedding_cache import EmbeddingCache
 
 # Load environment variables
 load_dotenv()
 
+# "supabase" runs match_recipes_by_ingredients in the database; "local" searches the
+# in-process index built by vector_index.py, with no database round-trip
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'supabase')
+
 # Initialize clients
 openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-supabase_client = create_client(
-    os.getenv('SUPABASE_URL'),
-    os.getenv('SUPABASE_KEY')
-)
+if SEARCH_BACKEND == 'local':
+    from vector_index import load_index
+    supabase_client = None
+else:
+    from supabase import create_client
+    supabase_client = create_client(
+        os.getenv('SUPABASE_URL'),
+        os.getenv('SUPABASE_KEY')
+    )
+# Shared with store_data.py: repeated queries and ingested ingredient lists skip the API
+embedder = BatchEmbedder(openai_client, model="text-embedding-3-small", cache=EmbeddingCache())
 
 def get_embedding(ingredients: str) -> List[float]:
     """Get embedding for ingredients string."""
     try:
-        response = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=ingredients
-        )
-        return response.data[0].embedding
+        return embedder.embed_one(ingredients)
     except Exception as e:
         print(f"Error getting embedding: {str(e)}")
         raise
@@ -42,7 +50,10 @@ def search_recipes(
     try:
         # Get embedding for the ingredients
         query_embedding = get_embedding(ingredients)
-        
+
+        if SEARCH_BACKEND == 'local':
+            return load_index().search(query_embedding, limit, similarity_threshold)
+
         # Search for similar recipes using HNSW index
         query = supabase_client.rpc(
             'match_recipes_by_ingredients',
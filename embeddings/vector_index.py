@@ -0,0 +1,219 @@
+"""Local, in-process vector index for recipe search.
+
+The whole corpus is a few hundred recipes, so instead of an RPC to
+Supabase per query the main-ingredient embeddings are kept in one
+contiguous, pre-normalized float32 matrix on disk. It is memory-mapped at
+load time and searched with a single matrix-vector product plus
+argpartition for the top k.
+
+    python embeddings/vector_index.py build data/*.json
+    python embeddings/vector_index.py search "telur, bawang, cili" --limit 3
+    SEARCH_BACKEND=local python embeddings/search_recipe.py
+
+Layout of an index directory:
+    vectors.f32    N x dims float32 rows, unit length
+    meta.json      model, dims and one record (title, url, main ingredients) per row
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_embeddings import BatchEmbedder, ingredients_text, EMBEDDING_MODEL
+
+RECIPE_INDEX_DIR = "recipe_index"
+
+_DTYPE = np.dtype("<f4")
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=_DTYPE)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _record(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': recipe.get('id'),
+        'title': recipe['title'],
+        'recipe_url': recipe.get('recipe_url'),
+        'image_url': recipe.get('details', {}).get('image_url'),
+        'main_ingredients': recipe.get('details', {}).get('main_ingredients', [])
+    }
+
+
+def write_index(path: str, vectors: np.ndarray, records: List[Dict[str, Any]], model: str, extra: Optional[Dict[str, Any]] = None):
+    """Write normalized vectors and their records (may be empty); each file is replaced atomically.
+
+    `extra` is merged into meta.json, e.g. the parameters of an ANN index (see ann_index.py).
+    """
+    os.makedirs(path, exist_ok=True)
+    matrix = normalize_rows(vectors)
+    vectors_path = os.path.join(path, "vectors.f32")
+    matrix.tofile(vectors_path + ".tmp")
+    os.replace(vectors_path + ".tmp", vectors_path)
+    write_meta(path, model, matrix.shape[1], matrix.shape[0], records, extra)
+
+
+def write_meta(path: str, model: str, dims: int, count: int, records: List[Dict[str, Any]], extra: Optional[Dict[str, Any]] = None):
+    """Publish meta.json atomically; written last, since an index without it cannot be opened."""
+    meta_path = os.path.join(path, "meta.json")
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        meta = {"model": model, "dims": int(dims), "count": int(count), "records": records}
+        json.dump(dict(meta, **(extra or {})), f, ensure_ascii=False)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def build_index(recipes: List[Dict[str, Any]], embedder: BatchEmbedder, path: str = RECIPE_INDEX_DIR) -> int:
+    """Embed the main ingredients of `recipes` (through the embedder's cache) and write the index."""
+    recipes = [r for r in recipes if r.get('details', {}).get('main_ingredients')]
+    vectors = embedder.embed([ingredients_text(r['details']['main_ingredients']) for r in recipes])
+    rows = [(recipe, vector) for recipe, vector in zip(recipes, vectors) if vector is not None]
+    if not rows:
+        raise ValueError("No recipe could be embedded")
+    write_index(path, np.array([vector for _, vector in rows]), [_record(recipe) for recipe, _ in rows], embedder.model)
+    return len(rows)
+
+
+def build_index_from_supabase(client, path: str = RECIPE_INDEX_DIR, model: str = EMBEDDING_MODEL) -> int:
+    """Export the recipe_embeddings table (as loaded by bulk_loader.py) into a local index."""
+    response = client.table('recipe_embeddings').select(
+        'recipe_id, main_ingredients, ingredients_embedding, recipes(title, recipe_url, image_url)'
+    ).execute()
+    vectors, records = [], []
+    for row in response.data:
+        embedding = row['ingredients_embedding']
+        # pgvector columns come back from PostgREST as "[0.1,0.2,...]" strings
+        vectors.append(json.loads(embedding) if isinstance(embedding, str) else embedding)
+        recipe = row.get('recipes') or {}
+        records.append({
+            'id': row['recipe_id'],
+            'title': recipe.get('title'),
+            'recipe_url': recipe.get('recipe_url'),
+            'image_url': recipe.get('image_url'),
+            'main_ingredients': row['main_ingredients']
+        })
+    write_index(path, np.array(vectors), records, model)
+    return len(records)
+
+
+class VectorIndex:
+    """Read-only cosine-similarity index over a memory-mapped float32 matrix."""
+
+    def __init__(self, path: str = RECIPE_INDEX_DIR):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.path = path
+        self.meta = meta
+        self.model = meta["model"]
+        self.dims = meta["dims"]
+        self.count = meta["count"]
+        self.records = meta["records"]
+        self.matrix = np.memmap(
+            os.path.join(path, "vectors.f32"), dtype=_DTYPE, mode="r", shape=(self.count, self.dims)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    @staticmethod
+    def normalize_query(query_vector: Sequence[float]) -> np.ndarray:
+        query = np.asarray(query_vector, dtype=_DTYPE)
+        norm = np.linalg.norm(query)
+        return query / norm if norm else query
+
+    def scores(self, query_vector: Sequence[float]) -> np.ndarray:
+        return self.matrix @ self.normalize_query(query_vector)
+
+    def top_rows(self, query_vector: Sequence[float], limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows of the `limit` most similar vectors and their scores, best first."""
+        return select_top(np.arange(self.count), self.scores(query_vector), limit)
+
+    def search(self, query_vector: Sequence[float], limit: int = 5, similarity_threshold: float = 0.5) -> List[Dict[str, Any]]:
+        """Best `limit` records with similarity above the threshold, best first, like match_recipes_by_ingredients."""
+        if not len(self) or limit <= 0:
+            return []
+        rows, scores = self.top_rows(query_vector, limit)
+        return [
+            dict(self.records[row] if self.records else {'row': int(row)}, similarity=float(score))
+            for row, score in zip(rows, scores) if score > similarity_threshold
+        ]
+
+
+def select_top(rows: np.ndarray, scores: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The `limit` highest scores and their rows, best first, without sorting everything."""
+    k = min(limit, len(scores))
+    if k <= 0:
+        return rows[:0], scores[:0]
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return rows[top], scores[top]
+
+
+_index: Optional[VectorIndex] = None
+
+
+def load_index(path: Optional[str] = None) -> VectorIndex:
+    """Process-wide index, loaded on first use from RECIPE_INDEX (or recipe_index/); exact or ANN."""
+    global _index
+    if _index is None:
+        from ann_index import open_index
+        _index = open_index(path or os.getenv('RECIPE_INDEX', RECIPE_INDEX_DIR))
+    return _index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the local recipe vector index")
+    parser.add_argument("command", choices=["build", "search"])
+    parser.add_argument("args", nargs="+", help="Recipe JSON files for build, the ingredients for search")
+    parser.add_argument("--index", default=RECIPE_INDEX_DIR)
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--nprobe", type=int, default=None, help="Lists to scan when the index is an IVF index (see ann_index.py)")
+    parser.add_argument("--fake", action="store_true", help="Use the local fake embedding provider")
+    parser.add_argument("--cache", default=None, help="Embedding cache directory (see embedding_cache.py)")
+    args = parser.parse_args()
+
+    if args.fake:
+        from fake_embeddings import FakeEmbeddingClient
+        client = FakeEmbeddingClient()
+    else:
+        from dotenv import load_dotenv
+        from openai import OpenAI
+        load_dotenv()
+        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    cache = None
+    if args.cache:
+        from embedding_cache import EmbeddingCache
+        cache = EmbeddingCache(args.cache)
+    embedder = BatchEmbedder(client, cache=cache)
+
+    if args.command == "build":
+        recipes = []
+        for path in args.args:
+            with open(path, 'r', encoding='utf-8') as f:
+                recipes.extend(json.load(f))
+        count = build_index(recipes, embedder, args.index)
+        print(f"Indexed {count} recipes into {args.index}")
+        return
+
+    from ann_index import open_index
+    index = open_index(args.index)
+    if args.nprobe and hasattr(index, "nprobe"):
+        index.nprobe = args.nprobe
+    query = " ".join(args.args)
+    query_vector = embedder.embed_one(query)
+    started = time.perf_counter()
+    results = index.search(query_vector, args.limit, args.threshold)
+    elapsed = time.perf_counter() - started
+    print(f"{len(results)} results from {len(index)} recipes in {elapsed * 1000:.3f} ms")
+    for result in results:
+        print(f"  {result['similarity']:.2%}  {result['title']}: {', '.join(result['main_ingredients'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,255 +1,216 @@
-from playwright.sync_api import sync_playwright, TimeoutError
 import json
 import time
-import random
 from datetime import datetime
-from tqdm import tqdm
 import argparse
+import asyncio
 import os
-
-def scrape_recipe_details(context, recipe_url):
-    """Scrape details for a single recipe URL using human-like behavior"""
+import sys
+
+# Shared scraping helpers live in scrape_data/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape_data"))
+from engine import ScrapeEngine, CrawlSettings, ENGINES, DETAIL_CONCURRENCY
+from worker_pool import WorkerPool
+from site_adapters import adapter_for_url
+from page_pool import RECYCLE_AFTER
+from resource_policy import POLICIES, DEFAULT_POLICY
+from page_readiness import EMULATION_CHOICES
+from page_validators import PAGE_VALIDATORS_FILE, UNCHANGED
+from ndjson_sink import NdjsonSink, append_json_array, write_json_array, is_ndjson
+
+async def scrape_single_recipe(url, settings=None):
+    """Scrape a single recipe from a given URL
+
+    Returns (recipe_data, change) where `change` says whether the recipe is
+    new, modified or unchanged according to the validator store. The URL's
+    site adapter is picked automatically and the recipe goes through the
+    shared scraping engine, HTTP fast path and browser fallback included.
+    """
+    recipe_data = {"recipe_url": url, "details": {}}
+    async with ScrapeEngine(adapter_for_url(url), settings) as engine:
+        change = await engine.scrape_details(recipe_data)
+    return recipe_data, change
+
+async def read_urls(source):
+    """Yield recipe URLs from a file, or from stdin as lines arrive when `source` is "-"
+
+    Blank lines and #comments are skipped. Reading stdin line by line lets a
+    long-lived process take URLs from a pipe or queue for as long as it stays open.
+    """
+    stream = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
     try:
-        # Create a new page with the existing context
-        page = context.new_page()
-        print(f"\nScraping details from: {recipe_url}")
-        
-        # Add reduced random delay before navigation
-        page.wait_for_timeout(random.randint(200, 500))
-        
-        # Navigate to the page with human-like behavior
-        page.goto(recipe_url, wait_until="domcontentloaded")
-        page.mouse.move(random.randint(100, 500), random.randint(100, 500))
-        page.wait_for_timeout(random.randint(200, 500))
-        
-        # Scroll down slowly like a human (with reduced interval)
-        page.evaluate('''() => {
-            return new Promise((resolve) => {
-                let totalHeight = 0;
-                const distance = 100;
-                const timer = setInterval(() => {
-                    window.scrollBy(0, distance);
-                    totalHeight += distance;
-                    if(totalHeight >= document.body.scrollHeight){
-                        clearInterval(timer);
-                        resolve();
-                    }
-                }, 50);
-            });
-        }''')
-        
-        page.wait_for_timeout(random.randint(200, 500))
-
-        # Extract all data using JavaScript evaluation
-        details = page.evaluate('''() => {
-            const result = {};
-            const contentDiv = document.querySelector('div.fusion-content-tb');
-            if (!contentDiv) return result;
-
-            // Get the title
-            const titleElement = contentDiv.querySelector('h3');
-            result.title = titleElement ? titleElement.textContent.trim() : '';
-
-            // Get the image URL from the p tag after h3 title
-            const h3Element = contentDiv.querySelector('h3');
-            if (h3Element) {
-                const pElement = h3Element.nextElementSibling;
-                if (pElement && pElement.tagName === 'P') {
-                    const imgElement = pElement.querySelector('img[srcset]');
-                    if (imgElement) {
-                        const srcset = imgElement.getAttribute('srcset');
-                        // Get the highest resolution image URL (last one in srcset)
-                        const urls = srcset.split(',').map(s => s.trim().split(' ')[0]);
-                        result.image_url = urls[urls.length - 1];
-                    }
-                }
-            }
-
-            // Get ingredients
-            result.ingredients = {};
-            let currentElement = contentDiv.querySelector('h3').nextElementSibling;
-            while (currentElement) {
-                // Stop if we reach the instructions section
-                if (currentElement.tagName === 'P' && currentElement.querySelector('strong') && 
-                    currentElement.querySelector('strong').textContent.trim().toLowerCase().startsWith('cara')) {
-                    break;
-                }
-
-                // Check if the current element is a strong tag with "Bahan-bahan"
-                if (currentElement.tagName === 'P' && currentElement.querySelector('strong')) {
-                    const header = currentElement.querySelector('strong').textContent.trim();
-                    if (header.toLowerCase().includes('bahan')) {
-                        const ingredients = [];
-                        let nextElement = currentElement.nextElementSibling;
-
-                        // Collect all ingredients from ul/ol lists
-                        while (nextElement && (nextElement.tagName === 'UL' || nextElement.tagName === 'OL')) {
-                            ingredients.push(...Array.from(nextElement.querySelectorAll('li')).map(
-                                li => li.textContent.trim()
-                            ));
-                            nextElement = nextElement.nextElementSibling;
-                        }
-
-                        // Add ingredients to the result
-                        if (ingredients.length > 0) {
-                            result.ingredients[header] = ingredients;
-                        }
-                    }
-                }
-
-                currentElement = currentElement.nextElementSibling;
-            }
-
-            // Get instructions
-            const instructions = [];
-            const instructionsHeaders = Array.from(contentDiv.querySelectorAll('p strong')).filter(
-                el => el.textContent.trim().toLowerCase().startsWith('cara')
-            );
-            if (instructionsHeaders.length > 0) {
-                for (const header of instructionsHeaders) {
-                    let currentElement = header.closest('p').nextElementSibling;
-                    while (currentElement) {
-                        if (currentElement.tagName === 'OL' || currentElement.tagName === 'UL') {
-                            // Append all steps from the list
-                            instructions.push(...Array.from(currentElement.querySelectorAll('li')).map(
-                                li => li.textContent.trim()
-                            ));
-                        } else if (currentElement.tagName === 'P' && /\\d+\\./.test(currentElement.textContent.trim())) {
-                            // Append steps from p tags containing numbers (e.g., "1.", "2.")
-                            instructions.push(currentElement.textContent.trim());
-                        }
-                        currentElement = currentElement.nextElementSibling;
-                    }
-                }
-            }
-
-            // Case 2: Instructions in p tags containing numbers (e.g., "1.", "2.")
-            if (instructions.length === 0) {
-                const instructionElements = contentDiv.querySelectorAll('p');
-                instructionElements.forEach(el => {
-                    const text = el.textContent.trim();
-                    if (/\\d+\\./.test(text)) {  // Check if the text contains a number followed by a dot
-                        instructions.push(text);
-                    }
-                });
-            }
-
-            result.instructions = instructions;
-
-            return result;
-        }''')
-
-        # Update the recipe data with all scraped details
-        recipe_data = {
-            "recipe_url": recipe_url,
-            "details": details
-        }
-        
-        page.close()
-        return recipe_data
-        
-    except Exception as e:
-        print(f"Error scraping recipe details: {str(e)}")
-        return {"recipe_url": recipe_url, "details": {}}
-
-def scrape_single_recipe(url, max_retries=3):
-    """Scrape a single recipe from a given URL"""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080},
-            extra_http_headers={
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Sec-Ch-Ua': '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-                'Sec-Ch-Ua-Mobile': '?0',
-                'Sec-Ch-Ua-Platform': '"Windows"',
-                'Upgrade-Insecure-Requests': '1',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-        )
-
-        recipe_data = None
-        for attempt in range(max_retries):
-            try:
-                recipe_data = scrape_recipe_details(context, url)
+        while True:
+            line = await asyncio.to_thread(stream.readline)
+            if not line:
                 break
-            except TimeoutError:
-                if attempt < max_retries - 1:
-                    print(f"\nTimeout occurred. Retrying... ({attempt + 1}/{max_retries})")
-                    time.sleep(3)
-                    continue
-                else:
-                    print("\nMax retries reached. Could not scrape recipe.")
-                    recipe_data = {"recipe_url": url, "details": {}}
-            except Exception as e:
-                print(f"\nError occurred: {str(e)}")
-                if attempt < max_retries - 1:
-                    print("Retrying...")
-                    time.sleep(3)
-                    continue
-                recipe_data = {"recipe_url": url, "details": {}}
-
-        context.close()
-        browser.close()
-        return recipe_data
+            url = line.strip()
+            if url and not url.startswith("#"):
+                yield url
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+async def scrape_batch(urls, settings=None, on_recipe_done=None):
+    """Scrape a stream of recipe URLs, keeping one engine (and browser) per site alive
+
+    `urls` is any async iterable, so the batch can be a fixed list or a queue
+    that keeps growing. Per URL the cost is one HTTP fetch or one navigation
+    on a warm page instead of a browser launch. `on_recipe_done(recipe_data,
+    change)` fires as soon as each recipe is scraped. Returns the number of
+    recipes handled.
+    """
+    settings = settings or CrawlSettings()
+    engines = {}
+    engines_lock = asyncio.Lock()
+    handled = 0
+
+    async def engine_for(url):
+        adapter = adapter_for_url(url)
+        async with engines_lock:
+            if adapter.name not in engines:
+                engines[adapter.name] = await ScrapeEngine(adapter, settings).open()
+            return engines[adapter.name]
+
+    async def worker(url):
+        nonlocal handled
+        recipe_data = {"recipe_url": url, "details": {}}
+        change = None
+        try:
+            engine = await engine_for(url)
+            change = await engine.scrape_details(recipe_data)
+        except Exception as e:
+            print(f"\nError scraping {url}: {str(e)}")
+        handled += 1
+        if on_recipe_done:
+            on_recipe_done(recipe_data, change)
+
+    try:
+        # A bounded queue keeps a huge URL file from being read ahead of the workers
+        async with WorkerPool(worker, settings.concurrency, maxsize=settings.concurrency * 2) as workers:
+            async for url in urls:
+                await workers.put(url)
+    finally:
+        for engine in engines.values():
+            await engine.close()
+    return handled
+
+def append_recipes(records, filename):
+    """Append recipes to a file without rewriting what is already there
+
+    .ndjson/.jsonl files get one line per recipe; a .json array file only has
+    its closing bracket rewritten, so repeated runs stay linear in I/O.
+    """
+    if is_ndjson(filename):
+        with NdjsonSink(filename) as sink:
+            sink.write_many(records)
+        return
+    try:
+        append_json_array(records, filename)
+    except ValueError:
+        # A single saved object is wrapped into an array once, anything else is replaced
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                records = [json.load(f)] + records
+        except json.JSONDecodeError:
+            print(f"Warning: Existing file {filename} is not valid JSON. Creating new file.")
+        write_json_array(records, filename)
 
 def save_recipe(recipe_data, filename):
-    """Save recipe data to a file, appending if the file exists"""
+    """Append recipe data (one recipe or a list) to `filename`"""
     if recipe_data:
-        existing_data = []
-        
-        # If file exists, load existing data
-        if os.path.exists(filename):
-            try:
-                with open(filename, "r", encoding="utf-8") as f:
-                    existing_data = json.load(f)
-                    if not isinstance(existing_data, list):
-                        existing_data = [existing_data]
-            except json.JSONDecodeError:
-                print(f"Warning: Existing file {filename} is not valid JSON. Creating new file.")
-                existing_data = []
-            
-        # Append new recipe data
-        if isinstance(recipe_data, list):
-            existing_data.extend(recipe_data)
-        else:
-            existing_data.append(recipe_data)
-        
-        # Save combined data
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, indent=4, ensure_ascii=False)
+        existed = os.path.exists(filename)
+        append_recipes(recipe_data if isinstance(recipe_data, list) else [recipe_data], filename)
         
         print(f"\nSuccessfully scraped recipe!")
-        print(f"Data {'appended to' if os.path.exists(filename) else 'saved to'}: {filename}")
+        print(f"Data {'appended to' if existed else 'saved to'}: {filename}")
     else:
         print("\nNo recipe to save.")
 
+async def batch_urls(first_url, source):
+    """The positional URL (if any) followed by every URL read from `source`"""
+    if first_url:
+        yield first_url
+    async for url in read_urls(source):
+        yield url
+
 def main():
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Scrape recipe details from MyResipi.com")
-    parser.add_argument("url", help="URL of the recipe to scrape")
-    parser.add_argument("filename", nargs="?", default=None, help="Optional: Name of the file to save/append the recipe data")
+    parser.add_argument("url", nargs="?", default=None, help="URL of the recipe to scrape")
+    parser.add_argument("filename", nargs="?", default=None, help="Optional: File to append the recipe to (a .json array, or .ndjson/.jsonl lines)")
+    parser.add_argument("-o", "--output", default=None, help="File to append recipes to; same as the filename argument, handy with --urls")
+    parser.add_argument("--ndjson", action="store_true", help="Default to a .ndjson file (one recipe per line) instead of a .json array")
+    parser.add_argument("--urls", default=None, help="Batch mode: file with one recipe URL per line, or - to keep reading URLs from stdin")
+    parser.add_argument("--concurrency", type=int, default=DETAIL_CONCURRENCY, help="Number of recipes scraped in parallel in batch mode")
+    parser.add_argument("--recycle-after", type=int, default=RECYCLE_AFTER, help="Navigations per browser context before it is replaced")
+    parser.add_argument("--engine", choices=ENGINES, default="http", help="Static HTTP parse with browser fallback, or browser only")
+    parser.add_argument("--emulation", choices=EMULATION_CHOICES, default="none", help="Opt-in human emulation (random waits, mouse move, scrolling) around the page load")
+    parser.add_argument("--block", choices=POLICIES, default=DEFAULT_POLICY, help="Browser request blocking: off, light (images/media/fonts/third-party scripts) or strict (also stylesheets and all scripts)")
+    parser.add_argument("--archive", default=None, help="Keep every fetched listing/detail page in this compressed archive for offline re-extraction (see page_archive.py)")
+    parser.add_argument("--validators", default=PAGE_VALIDATORS_FILE, help="SQLite store of ETag/Last-Modified/content hash per recipe_url")
+    parser.add_argument("--incremental", action="store_true", help="Use a conditional request and skip saving when the recipe is unchanged")
     args = parser.parse_args()
 
+    if args.url is None and args.urls is None:
+        parser.error("give a recipe URL or --urls")
+    if args.output:
+        args.filename = args.output
+
     # If no filename is provided, create one with timestamp
     if args.filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        args.filename = f"recipe_{timestamp}.json"
+        args.filename = f"{'recipes' if args.urls else 'recipe'}_{timestamp}.{'ndjson' if args.ndjson else 'json'}"
 
     start_time = time.time()
     
     print("\nScraping recipe from MyResipi.com")
     print("=============================================================================================================")
     
-    # Scrape the single recipe
-    recipe_data = scrape_single_recipe(args.url)
-    save_recipe(recipe_data, args.filename)
+    # A one-off run keeps validators but no crawl journal
+    settings = CrawlSettings(
+        concurrency=args.concurrency,
+        recycle_after=args.recycle_after,
+        engine=args.engine,
+        state_file=None,
+        validators_file=args.validators,
+        incremental=args.incremental,
+        resource_policy=args.block,
+        emulation=args.emulation,
+        archive_dir=args.archive
+    )
+
+    if args.urls:
+        saved = 0
+        # JSON Lines output stays open for the whole batch; a .json array only gets its bracket moved
+        sink = NdjsonSink(args.filename) if is_ndjson(args.filename) else None
+
+        def recipe_done(recipe_data, change):
+            nonlocal saved
+            if args.incremental and change == UNCHANGED:
+                print(f"Unchanged: {recipe_data['recipe_url']}")
+                return
+            if sink:
+                sink.write(recipe_data)
+            else:
+                append_recipes([recipe_data], args.filename)
+            saved += 1
+            print(f"{'Scraped' if recipe_data['details'] else 'No details for'}: {recipe_data['recipe_url']}")
+
+        try:
+            handled = asyncio.run(scrape_batch(batch_urls(args.url, args.urls), settings, recipe_done))
+        finally:
+            if sink:
+                sink.close()
+        print(f"\nScraped {handled} recipes, {saved} saved to: {args.filename}")
+    else:
+        # Scrape the single recipe
+        recipe_data, change = asyncio.run(scrape_single_recipe(args.url, settings))
+        if args.incremental and change == UNCHANGED:
+            print("\nRecipe unchanged since the last scrape, nothing to save.")
+        else:
+            save_recipe(recipe_data, args.filename)
     
     elapsed_time = time.time() - start_time
     print(f"\nScraping completed in {elapsed_time:.2f} seconds")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,148 @@
+import json
+import math
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Upper bounds (seconds) of the Prometheus histogram buckets, from a cache hit
+# to a page that needed every retry
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PERCENTILES = (50, 95, 99)
+# Prefix of every exported Prometheus metric
+METRIC_PREFIX = "scraper"
+
+
+class Histogram:
+    """Durations of one phase.
+
+    Raw samples are kept so the percentiles are exact; a crawl records a few
+    thousand samples per phase at most. Cumulative bucket counts are derived
+    from them for the Prometheus exposition.
+    """
+
+    def __init__(self):
+        self.samples = []
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self.total += seconds
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile, 0.0 without samples."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def buckets(self):
+        """(upper bound, cumulative count) pairs, ending with +Inf."""
+        ordered = sorted(self.samples)
+        counts = [(bound, bisect_right(ordered, bound)) for bound in BUCKETS]
+        return counts + [(math.inf, len(ordered))]
+
+    def summary(self) -> Dict:
+        count = len(self.samples)
+        summary = {
+            "count": count,
+            "sum": round(self.total, 4),
+            "mean": round(self.total / count, 4) if count else 0.0,
+            "max": round(max(self.samples), 4) if count else 0.0
+        }
+        for p in PERCENTILES:
+            summary[f"p{p}"] = round(self.percentile(p), 4)
+        return summary
+
+
+class CrawlMetrics:
+    """Per-phase timing histograms and counters for one crawl.
+
+    Phases are timed with `with metrics.phase("goto"):` (also inside async
+    code, the block may await). `count()` bumps counters such as retries,
+    failures and recipes with empty details. `report()` turns everything
+    into a JSON-friendly dict with p50/p95/p99 per phase and throughput.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._clock = time.perf_counter()
+        self.phases = {}
+        self.counters = {}
+
+    def observe(self, name: str, seconds: float):
+        if name not in self.phases:
+            self.phases[name] = Histogram()
+        self.phases[name].observe(seconds)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the block as one sample of `name`, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._clock
+
+    def report(self) -> Dict:
+        elapsed = self.elapsed()
+        minutes = elapsed / 60 if elapsed > 0 else 0
+        recipes = self.counters.get("recipes", 0)
+        pages = recipes + self.counters.get("listing_pages", 0)
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "elapsed_seconds": round(elapsed, 3),
+            "recipes_per_minute": round(recipes / minutes, 2) if minutes else 0.0,
+            "pages_per_minute": round(pages / minutes, 2) if minutes else 0.0,
+            "counters": dict(sorted(self.counters.items())),
+            "phases": {name: self.phases[name].summary() for name in sorted(self.phases)}
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of the same data."""
+        lines = [
+            f"# HELP {METRIC_PREFIX}_phase_seconds Time spent per crawl phase.",
+            f"# TYPE {METRIC_PREFIX}_phase_seconds histogram"
+        ]
+        for name in sorted(self.phases):
+            histogram = self.phases[name]
+            for bound, count in histogram.buckets():
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'{METRIC_PREFIX}_phase_seconds_bucket{{phase="{name}",le="{le}"}} {count}')
+            lines.append(f'{METRIC_PREFIX}_phase_seconds_sum{{phase="{name}"}} {histogram.total:.6f}')
+            lines.append(f'{METRIC_PREFIX}_phase_seconds_count{{phase="{name}"}} {len(histogram.samples)}')
+        for name in sorted(self.counters):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {self.counters[name]}")
+        report = self.report()
+        for name in ("recipes_per_minute", "pages_per_minute", "elapsed_seconds"):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {report[name]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path: Optional[str] = None, prometheus_path: Optional[str] = None):
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, indent=4)
+            print(f"Metrics report saved to: {json_path}")
+        if prometheus_path:
+            with open(prometheus_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+            print(f"Prometheus metrics saved to: {prometheus_path}")
+
+    def print_summary(self, label="Phase timings"):
+        report = self.report()
+        print(f"{label}: {report['recipes_per_minute']} recipes/min, {report['pages_per_minute']} pages/min")
+        for name, s in report["phases"].items():
+            print(f"  {name}: n={s['count']} p50={s['p50']}s p95={s['p95']}s p99={s['p99']}s max={s['max']}s")
+        if report["counters"]:
+            print("  " + ", ".join(f"{name}={value}" for name, value in report["counters"].items()))
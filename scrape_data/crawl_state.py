@@ -0,0 +1,171 @@
+import json
+import sqlite3
+from datetime import datetime
+from typing import Optional, Dict, List
+
+# Default location of the crawl journal, relative to the working directory
+CRAWL_STATE_FILE = "crawl_state.db"
+
+DISCOVERED = "discovered"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+create table if not exists categories (
+    category text primary key,
+    url text,
+    total_pages integer
+);
+create table if not exists listing_pages (
+    category text,
+    page_number integer,
+    page_url text,
+    primary key (category, page_number)
+);
+create table if not exists recipes (
+    recipe_url text primary key,
+    category text,
+    title text,
+    page_url text,
+    page_number integer,
+    position integer,
+    status text not null,
+    details text,
+    attempts integer not null default 0,
+    error text,
+    updated_at text
+);
+create index if not exists recipes_by_page on recipes (category, page_number, position);
+"""
+
+
+class CrawlState:
+    """SQLite journal of a crawl so an interrupted run can pick up where it stopped.
+
+    Every listing page and recipe URL is recorded as soon as it is discovered,
+    and each recipe moves through discovered -> in_flight -> done/failed with
+    its extracted details. Every write is committed immediately, so a crash or
+    Ctrl-C loses at most the recipes that were in flight.
+    """
+
+    def __init__(self, path: str = CRAWL_STATE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("pragma journal_mode=wal")
+        self.conn.execute("pragma synchronous=normal")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def reset_in_flight(self) -> int:
+        """Requeue recipes that were mid-scrape when the previous run died."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "update recipes set status = ? where status = ?", (DISCOVERED, IN_FLIGHT)
+            )
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------ listing
+
+    def total_pages(self, category: str) -> Optional[int]:
+        row = self.conn.execute("select total_pages from categories where category = ?", (category,)).fetchone()
+        return row["total_pages"] if row else None
+
+    def record_total_pages(self, category: str, url: str, total_pages: int):
+        with self.conn:
+            self.conn.execute(
+                "insert or replace into categories (category, url, total_pages) values (?, ?, ?)",
+                (category, url, total_pages)
+            )
+
+    def listing_page(self, category: str, page_number: int) -> Optional[List[Dict]]:
+        """Recipes recorded for an already-read listing page, or None if it was never read."""
+        row = self.conn.execute(
+            "select 1 from listing_pages where category = ? and page_number = ?", (category, page_number)
+        ).fetchone()
+        if not row:
+            return None
+        rows = self.conn.execute(
+            "select * from recipes where category = ? and page_number = ? order by position",
+            (category, page_number)
+        ).fetchall()
+        return [self._recipe(row) for row in rows]
+
+    def record_listing_page(self, category: str, page_number: int, page_url: str, recipes: List[Dict]):
+        """Record every recipe found on a listing page and mark the page as read."""
+        now = datetime.now().isoformat()
+        with self.conn:
+            for position, recipe in enumerate(recipes):
+                if not recipe["recipe_url"]:
+                    continue
+                self.conn.execute(
+                    """insert into recipes (recipe_url, category, title, page_url, page_number, position, status, updated_at)
+                       values (?, ?, ?, ?, ?, ?, ?, ?)
+                       on conflict (recipe_url) do update set
+                           category = excluded.category, title = excluded.title, page_url = excluded.page_url,
+                           page_number = excluded.page_number, position = excluded.position""",
+                    (recipe["recipe_url"], category, recipe.get("title"), page_url, page_number, position, DISCOVERED, now)
+                )
+            self.conn.execute(
+                "insert or replace into listing_pages (category, page_number, page_url) values (?, ?, ?)",
+                (category, page_number, page_url)
+            )
+
+    # ------------------------------------------------------------------ recipes
+
+    def status(self, recipe_url: str) -> Optional[str]:
+        row = self.conn.execute("select status from recipes where recipe_url = ?", (recipe_url,)).fetchone()
+        return row["status"] if row else None
+
+    def details(self, recipe_url: str) -> Optional[Dict]:
+        row = self.conn.execute("select details from recipes where recipe_url = ?", (recipe_url,)).fetchone()
+        return json.loads(row["details"]) if row and row["details"] else None
+
+    def mark_in_flight(self, recipe_url: str):
+        with self.conn:
+            self.conn.execute(
+                "update recipes set status = ?, attempts = attempts + 1, updated_at = ? where recipe_url = ?",
+                (IN_FLIGHT, datetime.now().isoformat(), recipe_url)
+            )
+
+    def mark_done(self, recipe_url: str, details: Dict):
+        with self.conn:
+            self.conn.execute(
+                "update recipes set status = ?, details = ?, error = null, updated_at = ? where recipe_url = ?",
+                (DONE, json.dumps(details, ensure_ascii=False), datetime.now().isoformat(), recipe_url)
+            )
+
+    def mark_failed(self, recipe_url: str, error: str):
+        with self.conn:
+            self.conn.execute(
+                "update recipes set status = ?, error = ?, updated_at = ? where recipe_url = ?",
+                (FAILED, error, datetime.now().isoformat(), recipe_url)
+            )
+
+    def counts(self, category: Optional[str] = None) -> Dict[str, int]:
+        """Number of recipes per status, optionally for one category."""
+        query = "select status, count(*) as n from recipes"
+        params = ()
+        if category is not None:
+            query += " where category = ?"
+            params = (category,)
+        rows = self.conn.execute(query + " group by status", params).fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def _recipe(self, row) -> Dict:
+        return {
+            "title": row["title"],
+            "page_url": row["page_url"],
+            "recipe_url": row["recipe_url"],
+            "details": json.loads(row["details"]) if row["details"] else {}
+        }
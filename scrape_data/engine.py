@@ -0,0 +1,633 @@
+"""The one scraping engine behind every entry point.
+
+ScrapeEngine owns the browser, the listing and detail page pools, the
+pooled HTTP client, the adaptive rate limiter, the resource-blocking
+policy, the crawl journal and the page validators. A SiteAdapter
+(site_adapters.py) supplies everything site-specific, so the same fast
+paths apply to resepichenom.com, myresipi.com and any site added later.
+
+Two ways in:
+- `crawl_categories`: discover recipes from category listings and scrape
+  them (scrape_data/main.py).
+- `scrape_recipes`: scrape an already known list of recipe URLs
+  (Step2_Scrape_fromjson.py, main.py).
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, Callable, List, Tuple
+
+from playwright.async_api import async_playwright
+from tqdm import tqdm
+
+from worker_pool import HostPoliteness, WorkerPool
+from rate_limiter import AdaptiveRateLimiter, BACKOFF_STATUSES, MAX_RATE
+from page_pool import PagePool, POOL_SIZE, RECYCLE_AFTER
+from http_extractor import AsyncHtmlFetcher, has_details, report_fetch
+from crawl_state import CrawlState, CRAWL_STATE_FILE, DONE
+from page_validators import PageValidators, UNCHANGED
+from resource_policy import ResourcePolicy, DEFAULT_POLICY
+from page_readiness import navigate, wait_ready, get_profile
+from site_adapters import SiteAdapter, adapter_for_url
+from sharding import shard_of
+from crawl_metrics import CrawlMetrics
+from page_archive import PageArchive, DETAIL, LISTING
+
+LISTING_CONTEXT_OPTIONS = {
+    "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    "viewport": {'width': 1920, 'height': 1080}
+}
+
+# Number of detail pages scraped concurrently across the whole crawl
+DETAIL_CONCURRENCY = 4
+# Politeness towards a single host: in-flight cap and the starting spacing between
+# request starts, which the adaptive rate limiter then tunes
+PER_HOST_CONCURRENCY = 4
+PER_HOST_DELAY = 0.5
+# Number of listing pages fetched concurrently across the whole crawl
+LISTING_CONCURRENCY = 3
+# Attempts per recipe for each engine before it is marked failed
+MAX_RETRIES = 3
+# "http" parses static HTML and only falls back to Chromium on empty results
+ENGINES = ["http", "browser"]
+
+
+def browser_options():
+    return {
+        "headless": True,
+        "args": [
+            "--disable-gpu",
+            "--disable-dev-shm-usage",
+            "--disable-setuid-sandbox",
+            "--no-first-run",
+            "--no-sandbox",
+            "--no-zygote",
+            f"--window-size={random.randint(1024, 1920)},{random.randint(768, 1080)}",
+            "--disable-notifications",
+            "--disable-popup-blocking",
+            "--disable-automation",
+            "--disable-blink-features=AutomationControlled"
+        ]
+    }
+
+
+@dataclass
+class CrawlSettings:
+    """Knobs shared by every category of one crawl."""
+    concurrency: int = DETAIL_CONCURRENCY
+    per_host: int = PER_HOST_CONCURRENCY
+    delay: float = PER_HOST_DELAY
+    pool_size: int = POOL_SIZE
+    recycle_after: int = RECYCLE_AFTER
+    engine: str = "http"
+    listing_concurrency: int = LISTING_CONCURRENCY
+    # Ceiling for the adaptive per-host request rate (requests per second)
+    max_rate: float = MAX_RATE
+    # SQLite journal used to resume interrupted crawls; None disables it
+    state_file: Optional[str] = CRAWL_STATE_FILE
+    # Store of ETag/Last-Modified/content hashes; None keeps them in state_file
+    validators_file: Optional[str] = None
+    # Re-check every recipe with conditional requests instead of trusting the journal
+    incremental: bool = False
+    # Request blocking on detail contexts: "off", "light" or "strict"
+    resource_policy: str = DEFAULT_POLICY
+    # Human emulation profile for detail pages, "none" waits only for readiness
+    emulation: str = "none"
+    # Directory of the record-and-replay page archive; None keeps no copies of fetched pages
+    archive_dir: Optional[str] = None
+    # Where to write the per-phase timing report (JSON) and its Prometheus text form
+    metrics_file: Optional[str] = None
+    prometheus_file: Optional[str] = None
+    # (index, count) of a URL-sharded crawl: only recipes hashing to this shard are scraped
+    shard: Optional[Tuple[int, int]] = None
+    # Requeue recipes left in flight by a dead run when the journal is opened;
+    # shard processes leave this to the parent (see requeue_interrupted)
+    reset_in_flight: bool = True
+    # Allow crawl_categories on adapters whose listing hooks are unverified
+    experimental_listing: bool = False
+
+
+def shard_settings(settings: CrawlSettings, count: int, index: Optional[int] = None) -> CrawlSettings:
+    """Settings for one of `count` shard processes.
+
+    Each process has its own rate limiter, so the per-host rate budget is
+    split between them to keep the crawl as a whole as polite as one
+    process. With `index` the shard also filters recipes by URL hash.
+    """
+    return replace(
+        settings,
+        delay=settings.delay * count,
+        max_rate=settings.max_rate / count,
+        shard=(index, count) if index is not None else None,
+        # Shards share the journal; one shard requeueing in-flight rows would
+        # steal recipes the others are scraping
+        reset_in_flight=False
+    )
+
+
+def requeue_interrupted(settings: CrawlSettings) -> int:
+    """Requeue the journal's in-flight recipes once, before shard processes start."""
+    if not settings.state_file:
+        return 0
+    with CrawlState(settings.state_file) as state:
+        requeued = state.reset_in_flight()
+    if requeued:
+        print(f"Requeued {requeued} interrupted recipes in {settings.state_file}")
+    return requeued
+
+
+class CategoryCrawl:
+    """Progress of one category inside a multi-category crawl."""
+
+    def __init__(self, category: str, url: str):
+        self.category = category
+        self.url = url
+        # Per-page buckets keep the output in listing order whichever page finishes first
+        self.page_titles = []
+        self.pending = 0
+        self.listing_done = False
+        self.completed = False
+        # New or modified recipes, the only ones later stages need to reprocess
+        self.changed = []
+        self.unchanged = 0
+
+    @property
+    def titles(self) -> list:
+        return [recipe for titles in self.page_titles for recipe in titles]
+
+
+async def _setup_listing_context(context):
+    await context.route("**/*analytics*.js", lambda route: route.abort())
+    await context.route("**/*tracking*.js", lambda route: route.abort())
+    await context.route("**/*advertisement*.js", lambda route: route.abort())
+
+
+class ScrapeEngine:
+    """Shared pools, politeness, journal and validators for one scraping run.
+
+    Chromium is only launched when a page actually has to be rendered, so
+    an HTTP-engine run whose static parses all succeed never starts it.
+    Use as `async with ScrapeEngine(adapter, settings) as engine:`.
+    """
+
+    def __init__(self, adapter: SiteAdapter, settings: Optional[CrawlSettings] = None):
+        self.adapter = adapter
+        self.settings = settings or CrawlSettings()
+        self.profile = get_profile(self.settings.emulation)
+        # `delay` sets the starting rate; the limiter then adapts it to how the host responds
+        self.limiter = AdaptiveRateLimiter(
+            rate=1 / self.settings.delay if self.settings.delay > 0 else self.settings.max_rate,
+            max_rate=self.settings.max_rate
+        )
+        self.politeness = HostPoliteness(self.settings.per_host, self.settings.delay, self.limiter)
+        # Images, fonts and third-party scripts are aborted on detail pages
+        self.resource_policy = ResourcePolicy(self.settings.resource_policy)
+        self.state = None
+        self.validators = None
+        self.archive = None
+        self.fetcher = None
+        self.browser = None
+        self.listing_pool = None
+        self.page_pool = None
+        self.browser_fallbacks = 0
+        self.resumed = 0
+        self.detail_count = 0
+        # Per-phase timing histograms and retry/failure counters for the run
+        self.metrics = CrawlMetrics()
+        self._playwright = None
+        self._browser_lock = None
+
+    async def open(self):
+        settings = self.settings
+        self._browser_lock = asyncio.Lock()
+        if settings.state_file:
+            self.state = CrawlState(settings.state_file)
+            requeued = self.state.reset_in_flight() if settings.reset_in_flight else 0
+            counts = self.state.counts()
+            if counts:
+                print(f"Resuming from {settings.state_file}: {counts} ({requeued} interrupted recipes requeued)")
+        if settings.archive_dir:
+            self.archive = PageArchive(settings.archive_dir)
+        validators_file = settings.validators_file or settings.state_file
+        if validators_file:
+            self.validators = PageValidators(validators_file)
+        # Pooled HTTP client for the browser-free fast path and conditional re-checks
+        if settings.engine == "http" or (settings.incremental and self.validators):
+            self.fetcher = AsyncHtmlFetcher()
+        return self
+
+    async def close(self):
+        try:
+            if self.fetcher:
+                await self.fetcher.aclose()
+                print(f"Browser fallbacks: {self.browser_fallbacks}/{self.detail_count} recipes")
+            if self.page_pool:
+                await self.page_pool.close()
+                self.page_pool.print_stats("Detail page pool")
+                self.resource_policy.print_stats()
+            self.limiter.print_stats()
+            if self.listing_pool:
+                await self.listing_pool.close()
+            if self.browser:
+                await self.browser.close()
+            if self._playwright:
+                await self._playwright.__aexit__(None, None, None)
+            self.metrics.print_summary()
+            self.metrics.write(self.settings.metrics_file, self.settings.prometheus_file)
+        finally:
+            if self.state:
+                print(f"Crawl state: {self.state.counts()} ({self.resumed} recipes reused from {self.settings.state_file})")
+                self.state.close()
+            if self.validators:
+                self.validators.close()
+            if self.archive:
+                self.archive.close()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _ensure_browser(self):
+        """Launch Chromium and its page pools on first use."""
+        async with self._browser_lock:
+            if self.browser is None:
+                self._playwright = async_playwright()
+                p = await self._playwright.__aenter__()
+                # Launch overhead is paid once for the whole run
+                with self.metrics.phase("browser_launch"):
+                    self.browser = await p.chromium.launch(**browser_options())
+                print("Browser launched successfully.")
+                settings = self.settings
+                # One warm page per concurrent listing fetch
+                self.listing_pool = PagePool(self.browser, settings.listing_concurrency, settings.recycle_after, LISTING_CONTEXT_OPTIONS, _setup_listing_context, self.metrics)
+                # Warm detail pages shared by every worker instead of one context per recipe
+                self.page_pool = PagePool(self.browser, settings.pool_size, settings.recycle_after, self.adapter.context_options, self.resource_policy.install, self.metrics)
+
+    # ------------------------------------------------------------------ details
+
+    async def _render_details(self, detail_page, url):
+        """Load one detail page and run the adapter's extractor, or return None.
+
+        The host's politeness slot is only held up to the response, so the
+        limiter sees the host's response time, not how long the page takes
+        to render and pass the readiness check.
+        """
+        try:
+            waited = time.perf_counter()
+            async with self.politeness.slot(url) as outcome:
+                self.metrics.observe("rate_wait", time.perf_counter() - waited)
+                response = await navigate(detail_page, url, self.profile, self.metrics)
+                outcome.report(response.status if response else None, error=response is None)
+            # Wait for the adapter's readiness check instead of fixed sleeps; emulation is opt-in
+            await wait_ready(detail_page, self.adapter.ready, self.profile, metrics=self.metrics)
+            if self.archive:
+                self.archive.store(url, await detail_page.content(), DETAIL, "browser")
+            with self.metrics.phase("evaluate"):
+                return await detail_page.evaluate(self.adapter.detail_script)
+        except Exception as e:
+            print(f"\nError scraping recipe details: {str(e)}")
+            return None
+
+    async def scrape_details(self, recipe_data: Dict) -> Optional[str]:
+        """Fill in `details` for one recipe, with retries.
+
+        Tries a (conditional) static fetch first, then the browser. Returns
+        NEW, MODIFIED or UNCHANGED from the validators, or None when there
+        is no validator store or nothing was extracted.
+        """
+        with self.metrics.phase("recipe"):
+            change = await self._scrape_details(recipe_data)
+        self.metrics.count("recipes")
+        if not recipe_data["details"]:
+            self.metrics.count("failures")
+        return change
+
+    async def _scrape_details(self, recipe_data: Dict) -> Optional[str]:
+        settings = self.settings
+        recipe_url = recipe_data["recipe_url"]
+        label = recipe_data.get("title") or recipe_url
+        self.detail_count += 1
+        if self.state:
+            self.state.mark_in_flight(recipe_url)
+
+        previous = self.validators.get(recipe_url) if self.validators and settings.incremental else None
+        result = None
+        if self.fetcher:
+            for attempt in range(MAX_RETRIES):
+                if attempt:
+                    self.metrics.count("http_retries")
+                waited = time.perf_counter()
+                async with self.politeness.slot(recipe_url) as outcome:
+                    self.metrics.observe("rate_wait", time.perf_counter() - waited)
+                    with self.metrics.phase("http_fetch"):
+                        if previous:
+                            result = await self.fetcher.fetch_conditional(recipe_url, previous["etag"], previous["last_modified"])
+                        else:
+                            result = await self.fetcher.fetch_conditional(recipe_url)
+                    report_fetch(outcome, result)
+                # Throttled or failed: the limiter has paused the host, try again after it
+                if result.status is not None and result.status not in BACKOFF_STATUSES:
+                    break
+                self.metrics.count("http_errors")
+
+            if self.archive and result.status == 200 and result.text:
+                self.archive.store(recipe_url, result.text, DETAIL, "http")
+
+            if result.status == 304 and previous:
+                # Not modified since the last crawl, reuse what was extracted then
+                recipe_data["details"] = previous["details"]
+                self.metrics.count("not_modified")
+            elif settings.engine == "http":
+                try:
+                    with self.metrics.phase("parse"):
+                        details = self.adapter.parse_details(result.text) if result.text else None
+                except Exception as e:
+                    print(f"\nError parsing {recipe_url}: {str(e)}")
+                    details = None
+                if has_details(details):
+                    recipe_data["details"] = details
+                else:
+                    # Static HTML came back empty, render the page instead
+                    self.browser_fallbacks += 1
+                    self.metrics.count("browser_fallbacks")
+
+        if not recipe_data["details"]:
+            await self._ensure_browser()
+            for attempt in range(MAX_RETRIES):
+                if attempt:
+                    self.metrics.count("retries")
+                try:
+                    async with self.page_pool.lease() as detail_page:
+                        self.resource_policy.start(detail_page)
+                        recipe_details = await self._render_details(detail_page, recipe_url)
+                        usage = self.resource_policy.finish(detail_page)
+                    if usage and self.resource_policy.enabled:
+                        print(f"\n{label}: {self.resource_policy.format_usage(usage)}")
+                    if recipe_details:
+                        recipe_data["details"] = recipe_details
+                        break
+                    self.metrics.count("empty_details")
+                    print(f"Attempt {attempt + 1}: Failed to get details for {label}, retrying...")
+                except Exception as e:
+                    print(f"Error on attempt {attempt + 1}: {str(e)}")
+                if attempt < MAX_RETRIES - 1:  # If not the last attempt
+                    with self.metrics.phase("backoff"):
+                        await asyncio.sleep(self.limiter.backoff(attempt))  # Wait before retry
+
+        if self.state:
+            if recipe_data["details"]:
+                self.state.mark_done(recipe_url, recipe_data["details"])
+            else:
+                self.state.mark_failed(recipe_url, "no details extracted")
+
+        if self.validators and recipe_data["details"]:
+            return self.validators.record(
+                recipe_url,
+                recipe_data["details"],
+                result.etag if result else None,
+                result.last_modified if result else None
+            )
+        return None
+
+    def owns(self, recipe_url: str) -> bool:
+        """Whether this engine's shard is responsible for `recipe_url`."""
+        if not self.settings.shard:
+            return True
+        index, count = self.settings.shard
+        return shard_of(recipe_url, count) == index
+
+    def _reuse_done(self, recipe_data) -> bool:
+        """Take a recipe finished by an earlier run straight from the journal."""
+        recipe_url = recipe_data["recipe_url"]
+        if self.state and not self.settings.incremental and recipe_url and self.state.status(recipe_url) == DONE:
+            recipe_data["details"] = self.state.details(recipe_url)
+            self.resumed += 1
+            self.metrics.count("resumed")
+            return True
+        return False
+
+    async def scrape_recipes(
+        self,
+        recipes: List[Dict],
+        source: str = "recipes",
+        on_recipe_done: Optional[Callable[[Dict], None]] = None
+    ) -> List[Dict]:
+        """Fill in `details` for known recipe URLs; return the new or modified ones.
+
+        `recipes` are dicts with at least `recipe_url` and `details`, updated
+        in place. With a journal they are recorded under `source` (e.g. the
+        input file) so an interrupted run resumes where it stopped.
+        """
+        changed = []
+        if self.state:
+            self.state.record_listing_page(source, 1, source, recipes)
+
+        pbar = tqdm(total=len(recipes), desc="Scraping recipes")
+
+        async def worker(recipe_data):
+            try:
+                change = await self.scrape_details(recipe_data)
+                # Without a validator store every extracted recipe counts as changed
+                if recipe_data["details"] and change != UNCHANGED:
+                    changed.append(recipe_data)
+                if on_recipe_done:
+                    on_recipe_done(recipe_data)
+            finally:
+                pbar.update(1)
+
+        try:
+            async with WorkerPool(worker, self.settings.concurrency) as workers:
+                for recipe_data in recipes:
+                    if not recipe_data["recipe_url"]:
+                        pbar.update(1)
+                        continue
+                    if self._reuse_done(recipe_data):
+                        if on_recipe_done:
+                            on_recipe_done(recipe_data)
+                        pbar.update(1)
+                        continue
+                    await workers.put(recipe_data)
+        finally:
+            pbar.close()
+        return changed
+
+    # ------------------------------------------------------------------ listings
+
+    async def crawl_categories(
+        self,
+        categories: Dict[str, str],
+        on_category_done: Optional[Callable[[str, list, list], None]] = None,
+        on_recipe_done: Optional[Callable[[str, dict], None]] = None
+    ) -> Dict[str, list]:
+        """Crawl several categories under one global budget.
+
+        `categories` maps a category name to its listing URL. Listing discovery
+        for every category runs at once and feeds a single detail queue, so the
+        listing/detail concurrency and per-host politeness are shared across the
+        whole run. `on_category_done(category, titles, changed)` fires as soon
+        as a category's listing pages and detail pages have all finished;
+        `changed` holds only the recipes that are new or modified since the
+        last crawl recorded in the state file. `on_recipe_done(category,
+        recipe)` fires for every recipe as soon as its details are settled, so
+        results can be streamed to disk instead of waiting for the category.
+
+        With a state file, listing pages already read and recipes already done
+        in a previous run are taken from the journal instead of being fetched
+        again; failed and unfinished recipes are retried. In incremental mode
+        every listing page is read again and every recipe is re-checked with a
+        conditional request against its stored ETag/Last-Modified, falling back
+        to comparing a hash of the extracted details.
+        """
+        settings = self.settings
+        state = self.state
+        adapter = self.adapter
+        if adapter.experimental_listing and not settings.experimental_listing:
+            raise ValueError(
+                f"The {adapter.name} listing crawl is experimental; set experimental_listing "
+                "or scrape known recipe URLs with scrape_recipes"
+            )
+        crawls = [CategoryCrawl(category, url) for category, url in categories.items()]
+        # Incremental runs re-read the listings to pick up new recipes
+        replay = state and not settings.incremental
+
+        try:
+            # Listing pages always need the browser
+            await self._ensure_browser()
+
+            pbar = tqdm(total=0, desc="Scraping recipe details")
+
+            def finish_if_complete(crawl):
+                if crawl.listing_done and crawl.pending == 0 and not crawl.completed:
+                    crawl.completed = True
+                    if on_category_done:
+                        on_category_done(crawl.category, crawl.titles, crawl.changed)
+
+            async def scrape_details_worker(item):
+                crawl, recipe_data = item
+                try:
+                    change = await self.scrape_details(recipe_data)
+                    if change == UNCHANGED:
+                        crawl.unchanged += 1
+                    elif change is not None:
+                        crawl.changed.append(recipe_data)
+                    if on_recipe_done:
+                        on_recipe_done(crawl.category, recipe_data)
+                finally:
+                    pbar.update(1)
+                    crawl.pending -= 1
+                    finish_if_complete(crawl)
+
+            # Detail workers start draining the queue while listing pages are still being read
+            workers = WorkerPool(scrape_details_worker, settings.concurrency).start()
+
+            async def discover_category(crawl):
+                """Read every listing page of one category and queue its recipes."""
+                try:
+                    total_pages = state.total_pages(crawl.category) if replay else None
+                    if total_pages is None:
+                        # First, get the total number of pages
+                        print(f"\nAccessing initial URL: {crawl.url}")
+                        async with self.listing_pool.lease() as page, self.politeness.slot(crawl.url):
+                            await page.goto(crawl.url, wait_until="domcontentloaded")
+                            total_pages = await adapter.read_total_pages(page)
+                        if state:
+                            state.record_total_pages(crawl.category, crawl.url, total_pages)
+                    print(f"\nTotal pages found for {crawl.category}: {total_pages}")
+
+                    crawl.page_titles = [[] for _ in range(total_pages)]
+
+                    async def scrape_listing_worker(current_page):
+                        page_url = adapter.listing_page_url(crawl.url, current_page)
+                        recipes = state.listing_page(crawl.category, current_page) if replay else None
+                        if recipes is None:
+                            try:
+                                # The listing pool bounds the fan-out, politeness spaces requests to the host
+                                async with self.listing_pool.lease() as page, self.politeness.slot(page_url):
+                                    with self.metrics.phase("listing_page"):
+                                        await page.goto(page_url, wait_until="domcontentloaded")
+                                        cards = await adapter.read_listing(page)
+                                    if self.archive:
+                                        self.archive.store(page_url, await page.content(), LISTING, "browser")
+                                self.metrics.count("listing_pages")
+                            except Exception as e:
+                                print(f"\nError processing {crawl.category} page {current_page}: {str(e)}")
+                                return
+                            print(f"\nFound {len(cards)} recipes on {crawl.category} page {current_page}/{total_pages}")
+
+                            recipes = [
+                                {"title": title, "page_url": page_url, "recipe_url": recipe_url, "details": {}}
+                                for title, recipe_url in cards
+                            ]
+                            if state:
+                                state.record_listing_page(crawl.category, current_page, page_url, recipes)
+
+                        for recipe_data in recipes:
+                            crawl.page_titles[current_page - 1].append(recipe_data)
+
+                            # Other shards scrape the recipes they own; this one only keeps their listing entry
+                            if recipe_data["recipe_url"] and not self.owns(recipe_data["recipe_url"]):
+                                continue
+
+                            # Recipes finished by an earlier run come straight from the journal
+                            if self._reuse_done(recipe_data):
+                                if on_recipe_done:
+                                    on_recipe_done(crawl.category, recipe_data)
+                                continue
+
+                            # Stream each URL to the detail workers as soon as its page is read
+                            if recipe_data["recipe_url"]:
+                                crawl.pending += 1
+                                pbar.total += 1
+                                pbar.refresh()
+                                await workers.put((crawl, recipe_data))
+
+                    await asyncio.gather(*(scrape_listing_worker(n) for n in range(1, total_pages + 1)))
+                except Exception as e:
+                    print(f"\nError discovering category {crawl.category}: {str(e)}")
+                finally:
+                    crawl.listing_done = True
+                    finish_if_complete(crawl)
+
+            try:
+                # Every category's discovery runs at once under the shared pools
+                await asyncio.gather(*(discover_category(crawl) for crawl in crawls))
+            finally:
+                # Wait for the workers to finish everything already queued
+                await workers.close()
+                pbar.close()
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+        return {crawl.category: crawl.titles for crawl in crawls if crawl.completed}
+
+
+async def crawl_categories(
+    categories: Dict[str, str],
+    settings: Optional[CrawlSettings] = None,
+    on_category_done: Optional[Callable[[str, list, list], None]] = None,
+    on_recipe_done: Optional[Callable[[str, dict], None]] = None,
+    adapter: Optional[SiteAdapter] = None
+) -> Dict[str, list]:
+    """Crawl categories of one site with a fresh engine; see ScrapeEngine.crawl_categories."""
+    adapter = adapter or adapter_for_url(next(iter(categories.values())))
+    async with ScrapeEngine(adapter, settings) as engine:
+        return await engine.crawl_categories(categories, on_category_done, on_recipe_done)
+
+
+async def scrape_recipes(
+    recipes: List[Dict],
+    settings: Optional[CrawlSettings] = None,
+    source: str = "recipes",
+    on_recipe_done: Optional[Callable[[Dict], None]] = None,
+    adapter: Optional[SiteAdapter] = None
+) -> List[Dict]:
+    """Scrape known recipe URLs with a fresh engine; see ScrapeEngine.scrape_recipes."""
+    urls = [recipe["recipe_url"] for recipe in recipes if recipe["recipe_url"]]
+    if not urls:
+        return []
+    adapter = adapter or adapter_for_url(urls[0])
+    async with ScrapeEngine(adapter, settings) as engine:
+        return await engine.scrape_recipes(recipes, source, on_recipe_done)
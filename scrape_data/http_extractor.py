@@ -0,0 +1,281 @@
+"""Browser-free fast path for recipe detail pages.
+
+The detail extractors only read static DOM, so the same fields can be
+pulled from the raw HTML with a pooled HTTP client and selectolax instead
+of a full Chromium load. The parsers below mirror each site adapter's
+`detail_script` (run with page.evaluate, see site_adapters.py) and return
+the same `details` dict. The engine falls back to Playwright when
+`has_details()` is False.
+"""
+import re
+from typing import Optional, Dict, Any, NamedTuple
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Connection pool shared by every request of one fetcher
+MAX_CONNECTIONS = 10
+HTTP_TIMEOUT = 15.0
+
+_NUMBERED_STEP = re.compile(r'\d+\.')
+
+
+class FetchResult(NamedTuple):
+    """Outcome of a (conditional) GET; `status` is None when the request failed."""
+    status: Optional[int]
+    text: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Seconds from a 429/503 Retry-After header, when the server sent one
+    retry_after: Optional[float] = None
+
+
+def report_fetch(outcome, result: FetchResult):
+    """Feed a fetch result into a rate limiter's RequestOutcome."""
+    outcome.report(result.status, error=result.status is None, retry_after=result.retry_after)
+
+
+def _conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    # Only the delta-seconds form; an HTTP-date falls back to the limiter's own backoff
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def _fetch_result(url: str, response) -> FetchResult:
+    if response.status_code not in (200, 304):
+        print(f"\nHTTP {response.status_code} for {url}")
+    return FetchResult(
+        response.status_code,
+        response.text if response.status_code == 200 else None,
+        response.headers.get('etag'),
+        response.headers.get('last-modified'),
+        _retry_after(response.headers.get('retry-after'))
+    )
+
+
+def _text(node) -> str:
+    """textContent().trim() equivalent."""
+    return node.text(deep=True).strip() if node is not None else ''
+
+
+def _classes(node):
+    return (node.attributes.get('class') or '').split()
+
+
+def _next_element(node):
+    """nextElementSibling equivalent (skips text and comment nodes)."""
+    sibling = node.next
+    while sibling is not None and not sibling.tag[:1].isalpha():
+        sibling = sibling.next
+    return sibling
+
+
+def _closest(node, tag, cls=None):
+    """Element.closest('tag.cls') equivalent, starting from the node itself."""
+    while node is not None:
+        if node.tag == tag and (cls is None or cls in _classes(node)):
+            return node
+        node = node.parent
+    return None
+
+
+def _last_child_span(node):
+    """querySelector('span:last-child') equivalent."""
+    for span in node.css('span'):
+        if _next_element(span) is None:
+            return span
+    return None
+
+
+def has_details(details: Optional[Dict[str, Any]]) -> bool:
+    """True when a static parse found recipe content worth keeping."""
+    return bool(details) and bool(details.get('ingredients') or details.get('instructions'))
+
+
+def parse_resepichenom_details(html: str, base_domain: str = "https://resepichenom.com") -> Dict[str, Any]:
+    """Extract a resepichenom.com recipe page into the scrape_recipe_details dict."""
+    tree = LexborHTMLParser(html)
+    result = {}
+
+    #================ Extract Image URL ======================
+    img_element = next((img for img in tree.css('img') if 'alt' in img.attributes), None)
+    src = img_element.attributes.get('src') if img_element is not None else None
+    if src:
+        result['image_url'] = src if src.startswith('http') else base_domain + (src if src.startswith('/') else '/' + src)
+    else:
+        result['image_url'] = None
+
+    # Extract timing and serving information
+    paragraphs = tree.css('p')
+    for text in ['Masa Penyediaan', 'Masa Memasak', 'Jumlah Masa', 'Hidangan']:
+        label = next((p for p in paragraphs if _text(p) == text), None)
+        if label is not None and label.parent is not None:
+            value_element = label.parent.css_first('p.font-semibold')
+            if value_element is not None:
+                result[text.lower().replace(' ', '_', 1)] = _text(value_element)
+
+    section_titles = tree.css('div.font-semibold')
+
+    def sections(title, list_tag, item_selector):
+        """Map each h4 header in the titled rounded-xl card to its list items."""
+        found = {}
+        heading = next((div for div in section_titles if _text(div) == title), None)
+        container = _closest(heading, 'div', 'rounded-xl') if heading is not None else None
+        if container is None:
+            return found
+        for header in container.css('h4.font-medium'):
+            items = []
+            lst = _next_element(header)
+            if lst is not None and lst.tag == list_tag:
+                for li in lst.css('li'):
+                    span = item_selector(li)
+                    text = _text(span) if span is not None else _text(li)
+                    if text:
+                        items.append(text)
+            if items:
+                found[_text(header)] = items
+        return found
+
+    #====================== Extract ingredients sections==============================================================
+    result['ingredients'] = sections('Bahan-bahan', 'ul', _last_child_span)
+
+    #====================== Extract cooking instructions==============================================================
+    result['instructions'] = sections('Cara Memasak', 'ol', lambda li: li.css_first('span.flex-1'))
+
+    #====================== Extract Tips & Guides==============================================================
+    result['tips_and_guides'] = []
+    tips_section = next((div for div in tree.css('div.text-2xl.font-bold') if 'Petua & Panduan' in div.text(deep=True)), None)
+    tips_container = _closest(tips_section, 'div', 'rounded-xl') if tips_section is not None else None
+    tips_list = tips_container.css_first('ul') if tips_container is not None else None
+    if tips_list is not None:
+        for li in tips_list.css('li'):
+            tip_span = li.css_first('span.text-gray-700')
+            text = _text(tip_span) if tip_span is not None else _text(li)
+            if text:
+                result['tips_and_guides'].append(text)
+
+    return result
+
+
+def parse_myresipi_details(html: str) -> Dict[str, Any]:
+    """Extract a myresipi.com recipe page into the scrape_recipe_details dict."""
+    tree = LexborHTMLParser(html)
+    result = {}
+    content_div = tree.css_first('div.fusion-content-tb')
+    if content_div is None:
+        return result
+
+    # The browser extractor throws (and yields empty details) without a title
+    h3_element = content_div.css_first('h3')
+    if h3_element is None:
+        return {}
+
+    # Get the title
+    result['title'] = _text(h3_element)
+
+    # Get the image URL from the p tag after h3 title
+    p_element = _next_element(h3_element)
+    if p_element is not None and p_element.tag == 'p':
+        img_element = p_element.css_first('img[srcset]')
+        if img_element is not None:
+            # Get the highest resolution image URL (last one in srcset)
+            urls = [s.strip().split(' ')[0] for s in img_element.attributes.get('srcset', '').split(',')]
+            result['image_url'] = urls[-1]
+
+    # Get ingredients
+    result['ingredients'] = {}
+    current = _next_element(h3_element)
+    while current is not None:
+        strong = current.css_first('strong') if current.tag == 'p' else None
+        # Stop if we reach the instructions section
+        if strong is not None and _text(strong).lower().startswith('cara'):
+            break
+
+        # Check if the current element is a strong tag with "Bahan-bahan"
+        if strong is not None:
+            header = _text(strong)
+            if 'bahan' in header.lower():
+                ingredients = []
+                next_element = _next_element(current)
+                # Collect all ingredients from ul/ol lists
+                while next_element is not None and next_element.tag in ('ul', 'ol'):
+                    ingredients.extend(_text(li) for li in next_element.css('li'))
+                    next_element = _next_element(next_element)
+                if ingredients:
+                    result['ingredients'][header] = ingredients
+
+        current = _next_element(current)
+
+    # Get instructions
+    instructions = []
+    instruction_headers = [el for el in content_div.css('p strong') if _text(el).lower().startswith('cara')]
+    for header in instruction_headers:
+        current = _next_element(_closest(header, 'p'))
+        while current is not None:
+            if current.tag in ('ol', 'ul'):
+                # Append all steps from the list
+                instructions.extend(_text(li) for li in current.css('li'))
+            elif current.tag == 'p' and _NUMBERED_STEP.search(_text(current)):
+                # Append steps from p tags containing numbers (e.g., "1.", "2.")
+                instructions.append(_text(current))
+            current = _next_element(current)
+
+    # Case 2: Instructions in p tags containing numbers (e.g., "1.", "2.")
+    if not instructions:
+        instructions = [_text(el) for el in content_div.css('p') if _NUMBERED_STEP.search(_text(el))]
+
+    result['instructions'] = instructions
+
+    return result
+
+
+class AsyncHtmlFetcher:
+    """Pooled async HTTP client returning page HTML, or None on any failure."""
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS, timeout: float = HTTP_TIMEOUT):
+        self.client = httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def fetch(self, url: str) -> Optional[str]:
+        return (await self.fetch_conditional(url)).text
+
+    async def fetch_conditional(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
+        """GET with If-None-Match/If-Modified-Since; a 304 comes back with no text."""
+        try:
+            response = await self.client.get(url, headers=_conditional_headers(etag, last_modified))
+            return _fetch_result(url, response)
+        except httpx.HTTPError as e:
+            print(f"\nHTTP error fetching {url}: {str(e)}")
+            return FetchResult(None)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
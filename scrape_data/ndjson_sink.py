@@ -0,0 +1,204 @@
+"""Append-only JSON Lines output for the scrapers.
+
+Every scraped recipe is written as one line the moment it is ready, so a
+crash loses at most the records since the last fsync and a growing file is
+never re-read or rewritten. The pretty-printed array format used in
+data/*.json is still what the cleaning and embedding steps read; the
+converters below go between the two without holding a whole file as one
+JSON document.
+
+    python scrape_data/ndjson_sink.py to-json recipes.ndjson recipes.json
+    python scrape_data/ndjson_sink.py to-ndjson data/ayam_115.json ayam.ndjson
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+# A sink fsyncs after this many records or this many seconds, whichever comes first
+FSYNC_EVERY = 50
+FSYNC_INTERVAL = 5.0
+
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+def is_ndjson(path: str) -> bool:
+    return path.lower().endswith(NDJSON_EXTENSIONS)
+
+
+class NdjsonSink:
+    """Append records to a JSON Lines file with batched fsync.
+
+    Each `write` goes to the OS straight away; `os.fsync` is only paid once
+    per `fsync_every` records or `fsync_interval` seconds, and on close.
+    """
+
+    def __init__(self, path: str, fsync_every: int = FSYNC_EVERY, fsync_interval: float = FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.written += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def sync(self):
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_ndjson(path: str) -> Iterator[Dict]:
+    """Yield the records of a JSON Lines file.
+
+    A torn last line (the process died mid-write) is skipped with a warning.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        pending_error = None
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if pending_error:
+                # A bad line followed by more data is real corruption, not a torn write
+                raise pending_error
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                pending_error = ValueError(f"{path}:{line_number}: {e}")
+        if pending_error:
+            print(f"Warning: skipping incomplete last line of {path}")
+
+
+def _dedupe(records: Iterable[Dict], key: str) -> Iterator[Dict]:
+    """Keep the last record per `key`, in first-seen order."""
+    latest = {}
+    for record in records:
+        latest[record.get(key)] = record
+    return iter(latest.values())
+
+
+def write_json_array(records: Iterable[Dict], path: str) -> int:
+    """Write records as the indent=4 array of data/*.json, one element at a time.
+
+    The output is byte-identical to `json.dump(list(records), f, indent=4,
+    ensure_ascii=False)` without building the list or the whole string.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            element = json.dumps(record, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+            f.write(("[\n    " if count == 0 else ",\n    ") + element)
+            count += 1
+        f.write("\n]" if count else "[]")
+    return count
+
+
+def append_json_array(records: Iterable[Dict], path: str) -> int:
+    """Append records to an existing indent=4 array file in place.
+
+    Only the closing bracket is rewritten, so the cost is the size of the new
+    records rather than of the whole file. Missing or empty files are created.
+    """
+    records = list(records)
+    if not records:
+        return 0
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return write_json_array(records, path)
+
+    with open(path, "rb+") as f:
+        # Walk back over trailing whitespace to the closing bracket
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            f.seek(end - 1)
+            char = f.read(1)
+            if not char.isspace():
+                break
+            end -= 1
+        if char != b"]":
+            raise ValueError(f"{path} is not a JSON array")
+
+        # An empty array ("[]") takes the first element without a comma
+        position = end - 1
+        while position > 0:
+            f.seek(position - 1)
+            char = f.read(1)
+            if not char.isspace():
+                break
+            position -= 1
+        separator = "\n    " if char == b"[" else ",\n    "
+
+        f.seek(position)
+        f.truncate()
+        chunks = [json.dumps(record, indent=4, ensure_ascii=False).replace("\n", "\n    ") for record in records]
+        f.write((separator + ",\n    ".join(chunks) + "\n]").encode("utf-8"))
+    return len(records)
+
+
+def ndjson_to_json(src: str, dst: str, dedupe_key: Optional[str] = "recipe_url") -> int:
+    """Convert a JSON Lines file to the data/*.json array format.
+
+    Re-scraped URLs appear more than once in an append-only file; with
+    `dedupe_key` only the latest record per key is kept.
+    """
+    records = read_ndjson(src)
+    if dedupe_key:
+        records = _dedupe(records, dedupe_key)
+    return write_json_array(records, dst)
+
+
+def json_to_ndjson(src: str, dst: str) -> int:
+    """Convert a data/*.json array file to JSON Lines."""
+    with open(src, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        data = [data]
+    with open(dst, "w", encoding="utf-8") as f:
+        for record in data:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between JSON Lines and the pretty-printed recipe array format")
+    parser.add_argument("direction", choices=["to-json", "to-ndjson"])
+    parser.add_argument("src", help="Input file")
+    parser.add_argument("dst", help="Output file")
+    parser.add_argument("--keep-duplicates", action="store_true", help="to-json: keep every record instead of the latest per recipe_url")
+    args = parser.parse_args()
+
+    if args.direction == "to-json":
+        count = ndjson_to_json(args.src, args.dst, None if args.keep_duplicates else "recipe_url")
+    else:
+        count = json_to_ndjson(args.src, args.dst)
+    print(f"Wrote {count} records to {args.dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Record-and-replay archive of fetched pages.
+
+Every listing and detail page the crawlers fetch can be kept in a local,
+compressed, content-addressed archive (WARC-style: one capture per URL and
+fetch time, identical bodies stored once). Replay re-runs extraction on
+the archived HTML with no network at all, so a fix to the `ingredients`
+or `instructions` parsing no longer needs a re-crawl:
+
+    python scrape_data/page_archive.py stats
+    python scrape_data/page_archive.py replay --output recipes.ndjson
+    python scrape_data/page_archive.py replay --update data/*.json
+
+Layout of an archive directory:
+    index.db                 SQLite index: url, fetched_at, digest, kind, source
+    objects/ab/abcdef....gz  gzip-compressed page body named by its SHA-256
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from site_adapters import adapter_for_url
+from http_extractor import has_details
+from ndjson_sink import NdjsonSink, write_json_array, read_ndjson, is_ndjson
+
+PAGE_ARCHIVE_DIR = "page_archive"
+
+DETAIL = "detail"
+LISTING = "listing"
+
+# Pages per worker task when replaying in several processes
+REPLAY_CHUNK = 64
+
+_SCHEMA = """
+create table if not exists captures (
+    url text not null,
+    fetched_at text not null,
+    digest text not null,
+    kind text not null,
+    source text,
+    status integer,
+    primary key (url, fetched_at)
+);
+create index if not exists captures_by_kind on captures (kind, url);
+"""
+
+
+class PageArchive:
+    """Compressed, content-addressed store of fetched pages.
+
+    `store()` is cheap to call from a crawl: the body is hashed, written
+    once under objects/ (atomically, so shard processes can share one
+    archive), and a capture row links it to the URL and fetch time.
+    """
+
+    def __init__(self, path: str = PAGE_ARCHIVE_DIR):
+        self.path = path
+        os.makedirs(os.path.join(path, "objects"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(path, "index.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("pragma journal_mode=wal")
+        self.conn.execute("pragma synchronous=normal")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.path, "objects", digest[:2], digest + ".gz")
+
+    def store(self, url: str, html: str, kind: str = DETAIL, source: Optional[str] = None,
+              status: Optional[int] = 200, fetched_at: Optional[str] = None) -> str:
+        """Archive one fetched page and return its digest."""
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temp_path = f"{object_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(temp_path, object_path)
+        with self.conn:
+            self.conn.execute(
+                "insert or replace into captures (url, fetched_at, digest, kind, source, status) values (?, ?, ?, ?, ?, ?)",
+                (url, fetched_at or datetime.now().isoformat(), digest, kind, source, status)
+            )
+        return digest
+
+    def load(self, digest: str) -> str:
+        with open(self._object_path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def latest(self, url: str) -> Optional[str]:
+        """Most recently archived body of `url`, or None."""
+        row = self.conn.execute(
+            "select digest from captures where url = ? order by fetched_at desc limit 1", (url,)
+        ).fetchone()
+        return self.load(row["digest"]) if row else None
+
+    def captures(self, url: str) -> List[Dict]:
+        rows = self.conn.execute(
+            "select * from captures where url = ? order by fetched_at", (url,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest_captures(self, kind: str = DETAIL) -> List[Tuple[str, str]]:
+        """(url, digest) of the newest capture of every archived URL of one kind."""
+        rows = self.conn.execute(
+            """select url, digest from captures c
+               where kind = ? and fetched_at = (select max(fetched_at) from captures where url = c.url)
+               order by url""",
+            (kind,)
+        ).fetchall()
+        return [(row["url"], row["digest"]) for row in rows]
+
+    def stats(self) -> Dict:
+        counts = {row["kind"]: row["n"] for row in self.conn.execute(
+            "select kind, count(distinct url) as n from captures group by kind"
+        )}
+        captures = self.conn.execute("select count(*) from captures").fetchone()[0]
+        objects = self.conn.execute("select count(distinct digest) from captures").fetchone()[0]
+        size = 0
+        for root, _, files in os.walk(os.path.join(self.path, "objects")):
+            size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return {"urls": counts, "captures": captures, "objects": objects, "bytes": size}
+
+
+# ---------------------------------------------------------------------- replay
+
+def _site_of(url: str) -> Optional[str]:
+    """Adapter name for an archived URL; None for hosts without an adapter."""
+    try:
+        return adapter_for_url(url).name
+    except ValueError:
+        return None
+
+
+def _extract(job: Tuple[str, str, str]) -> Tuple[str, Dict]:
+    """Static extraction of one archived page; runs in replay worker processes."""
+    url, archive_path, digest = job
+    with open(os.path.join(archive_path, "objects", digest[:2], digest + ".gz"), "rb") as f:
+        html = gzip.decompress(f.read()).decode("utf-8")
+    try:
+        details = adapter_for_url(url).parse_details(html)
+    except Exception as e:
+        print(f"\nError parsing {url}: {str(e)}")
+        details = {}
+    return url, details if has_details(details) else {}
+
+
+def replay_details(archive: PageArchive, processes: int = 1, site: Optional[str] = None) -> Iterator[Dict]:
+    """Re-extract every archived detail page with the static parsers.
+
+    Yields {"recipe_url", "details"} in URL order. Pure CPU: no browser and
+    no network; `processes` > 1 spreads the parsing over several cores.
+    """
+    jobs = [
+        (url, archive.path, digest) for url, digest in archive.latest_captures(DETAIL)
+        if _site_of(url) and (site is None or _site_of(url) == site)
+    ]
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for url, details in pool.map(_extract, jobs, chunksize=REPLAY_CHUNK):
+                yield {"recipe_url": url, "details": details}
+    else:
+        for job in jobs:
+            url, details = _extract(job)
+            yield {"recipe_url": url, "details": details}
+
+
+async def replay_details_browser(archive: PageArchive, site: Optional[str] = None) -> List[Dict]:
+    """Re-extract archived detail pages with each adapter's page.evaluate script.
+
+    The archived HTML is loaded with `set_content` into a page whose every
+    request is aborted, so the JavaScript extractor runs exactly as in a
+    crawl but nothing leaves the machine.
+    """
+    from playwright.async_api import async_playwright
+
+    records = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context()
+        # Archived pages reference images, fonts and scripts; none of them is fetched
+        await context.route("**/*", lambda route: route.abort())
+        page = await context.new_page()
+        for url, digest in archive.latest_captures(DETAIL):
+            if not _site_of(url) or (site is not None and _site_of(url) != site):
+                continue
+            adapter = adapter_for_url(url)
+            try:
+                await page.set_content(archive.load(digest), wait_until="domcontentloaded")
+                details = await page.evaluate(adapter.detail_script)
+            except Exception as e:
+                print(f"\nError replaying {url}: {str(e)}")
+                details = {}
+            records.append({"recipe_url": url, "details": details or {}})
+        await browser.close()
+    return records
+
+
+def update_files(records: Dict[str, Dict], paths: List[str]) -> int:
+    """Replace `details` of every recipe in existing output files by its re-extraction.
+
+    Recipes that were not archived keep their old details. Each file is
+    rewritten atomically in its own format (JSON array or JSON Lines).
+    Returns the number of recipes updated.
+    """
+    updated = 0
+    for path in paths:
+        if is_ndjson(path):
+            recipes = list(read_ndjson(path))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                recipes = json.load(f)
+        count = 0
+        for recipe in recipes:
+            replayed = records.get(recipe.get("recipe_url"))
+            if replayed and replayed["details"]:
+                recipe["details"] = replayed["details"]
+                count += 1
+        temp_path = path + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        if is_ndjson(path):
+            with NdjsonSink(temp_path) as sink:
+                sink.write_many(recipes)
+        else:
+            write_json_array(recipes, temp_path)
+        os.replace(temp_path, path)
+        print(f"{path}: {count}/{len(recipes)} recipes re-extracted")
+        updated += count
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a page archive or re-extract recipes from it offline")
+    parser.add_argument("command", choices=["stats", "replay"])
+    parser.add_argument("--archive", default=PAGE_ARCHIVE_DIR, help="Archive directory written by a crawl run with --archive")
+    parser.add_argument("--site", choices=["resepichenom", "myresipi"], default=None, help="Only replay pages of this site")
+    parser.add_argument("--engine", choices=["http", "browser"], default="http", help="Re-extract with the static parsers or with the page.evaluate scripts in an offline browser")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes for static re-extraction")
+    parser.add_argument("--output", default=None, help="Write every re-extracted recipe to this .ndjson or .json file")
+    parser.add_argument("--update", nargs="*", default=[], help="Rewrite the details of these existing recipe files in place")
+    args = parser.parse_args()
+
+    with PageArchive(args.archive) as archive:
+        if args.command == "stats":
+            print(json.dumps(archive.stats(), indent=4))
+            return
+
+        if args.engine == "browser":
+            records = asyncio.run(replay_details_browser(archive, args.site))
+        else:
+            records = list(replay_details(archive, args.processes, args.site))
+
+    extracted = sum(1 for record in records if record["details"])
+    print(f"Re-extracted {extracted}/{len(records)} archived detail pages")
+    if args.output:
+        if is_ndjson(args.output):
+            with NdjsonSink(args.output) as sink:
+                sink.write_many(records)
+        else:
+            write_json_array(records, args.output)
+        print(f"Data saved to: {args.output}")
+    if args.update:
+        update_files({record["recipe_url"]: record for record in records}, args.update)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+# Number of warm contexts (one page each) kept by a pool
+POOL_SIZE = 4
+# Navigations a context serves before it is closed and replaced
+RECYCLE_AFTER = 50
+
+DEFAULT_CONTEXT_OPTIONS = {
+    "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    "viewport": {'width': 1920, 'height': 1080},
+    # Add additional headers
+    "extra_http_headers": {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Sec-Ch-Ua': '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+        'Sec-Ch-Ua-Mobile': '?0',
+        'Sec-Ch-Ua-Platform': '"Windows"',
+        'Upgrade-Insecure-Requests': '1',
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive'
+    }
+}
+
+
+class _Slot:
+    """A browser context with its single warm page."""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.crashed = False
+        page.on("crash", lambda _: setattr(self, "crashed", True))
+
+
+class _PoolStats:
+    def __init__(self):
+        self.contexts_created = 0
+        self.recycled = 0
+        self.discarded = 0
+        self.leases = 0
+
+    def stats(self):
+        return {
+            "contexts_created": self.contexts_created,
+            "recycled": self.recycled,
+            "discarded": self.discarded,
+            "leases": self.leases
+        }
+
+    def print_stats(self, label="Page pool"):
+        s = self.stats()
+        print(f"{label}: {s['contexts_created']} contexts created, "
+              f"{s['recycled']} recycled, {s['discarded']} discarded after errors, {s['leases']} leases")
+
+
+class PagePool(_PoolStats):
+    """Async pool that leases warm pages to workers.
+
+    Contexts are created lazily up to `size`. A leased page is reset to
+    about:blank when it is returned, and its context is closed and replaced
+    after `recycle_after` navigations or when the page crashes.
+    `setup` is an optional coroutine run on every new context (e.g. to
+    install routes). With `metrics` (a CrawlMetrics) lease waits and
+    context creation are timed.
+    """
+
+    def __init__(self, browser, size=POOL_SIZE, recycle_after=RECYCLE_AFTER, context_options=None, setup=None, metrics=None):
+        super().__init__()
+        self.metrics = metrics
+        self.browser = browser
+        self.size = max(1, size)
+        self.recycle_after = max(1, recycle_after)
+        self.context_options = context_options if context_options is not None else DEFAULT_CONTEXT_OPTIONS
+        self.setup = setup
+        self._idle = []
+        self._open = 0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow a warm page for one navigation."""
+        started = time.perf_counter()
+        slot = await self._acquire()
+        if self.metrics:
+            self.metrics.observe("page_lease", time.perf_counter() - started)
+        healthy = True
+        try:
+            yield slot.page
+        except BaseException:
+            # Only keep the page if it survived whatever went wrong
+            healthy = not slot.page.is_closed()
+            raise
+        finally:
+            slot.uses += 1
+            self.leases += 1
+            await self._release(slot, healthy)
+
+    async def close(self):
+        async with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for slot in idle:
+            await self._close_slot(slot)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _acquire(self):
+        async with self._cond:
+            while not self._idle and self._open >= self.size:
+                await self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+        try:
+            return await self._new_slot()
+        except BaseException:
+            async with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    async def _release(self, slot, healthy):
+        keep = healthy and not slot.crashed and not slot.page.is_closed()
+        if keep and slot.uses >= self.recycle_after:
+            self.recycled += 1
+            keep = False
+        elif not keep:
+            self.discarded += 1
+
+        if keep:
+            try:
+                # Drop the previous document (and its timers) before the next lease
+                await slot.page.goto("about:blank")
+            except Exception:
+                self.discarded += 1
+                keep = False
+
+        if not keep:
+            await self._close_slot(slot)
+
+        async with self._cond:
+            if keep:
+                self._idle.append(slot)
+            else:
+                # The replacement is created lazily by the next lease
+                self._open -= 1
+            self._cond.notify()
+
+    async def _new_slot(self):
+        started = time.perf_counter()
+        context = await self.browser.new_context(**self.context_options)
+        self.contexts_created += 1
+        try:
+            if self.setup:
+                await self.setup(context)
+            page = await context.new_page()
+        except BaseException:
+            await context.close()
+            raise
+        if self.metrics:
+            self.metrics.observe("context_create", time.perf_counter() - started)
+        return _Slot(context, page)
+
+    async def _close_slot(self, slot):
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
@@ -0,0 +1,108 @@
+import random
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# How long to wait for the extractor's selectors before extracting anyway
+READY_TIMEOUT = 5000
+
+# Readiness checks matching what each extractor reads first
+RESEPICHENOM_READY = '''() => Array.from(document.querySelectorAll('div.font-semibold')).some(
+    div => div.textContent.trim() === 'Bahan-bahan' && div.closest('div.rounded-xl')
+)'''
+MYRESIPI_READY = "() => !!document.querySelector('div.fusion-content-tb h3')"
+
+_SCROLL_JS = '''([distance, interval, budget]) => {
+    return new Promise((resolve) => {
+        let totalHeight = 0;
+        const started = Date.now();
+        const timer = setInterval(() => {
+            window.scrollBy(0, distance);
+            totalHeight += distance;
+            if (totalHeight >= document.body.scrollHeight || Date.now() - started >= budget) {
+                clearInterval(timer);
+                resolve();
+            }
+        }, interval);
+    });
+}'''
+
+
+@dataclass
+class HumanProfile:
+    """Opt-in human emulation around a page load. Durations are in milliseconds."""
+    pre_wait: Tuple[int, int] = (100, 500)
+    post_goto_wait: Tuple[int, int] = (1000, 2000)
+    scroll_step: int = 100
+    scroll_interval: int = 100
+    # Scrolling stops after this long even if the bottom was not reached
+    scroll_budget: int = 3000
+    settle_wait: Tuple[int, int] = (1000, 2000)
+    mouse_move: bool = True
+
+
+# "human" is the behaviour the scrapers used to hard-code; "human-fast" the
+# shorter waits of the myresipi scripts
+HUMAN_PROFILES = {
+    "human": HumanProfile(),
+    "human-fast": HumanProfile(pre_wait=(200, 500), post_goto_wait=(200, 500), scroll_interval=50, settle_wait=(200, 500))
+}
+EMULATION_CHOICES = ["none"] + list(HUMAN_PROFILES)
+
+
+def get_profile(name: Optional[str]) -> Optional[HumanProfile]:
+    """Profile for an --emulation choice; "none" or None disables emulation."""
+    if not name or name == "none":
+        return None
+    return HUMAN_PROFILES[name]
+
+
+def _pause(bounds):
+    return random.randint(*bounds)
+
+
+def _phase(metrics, name):
+    return metrics.phase(name) if metrics else nullcontext()
+
+
+async def navigate(page, url, profile: Optional[HumanProfile] = None, metrics=None):
+    """Navigate and return the response as soon as it arrives.
+
+    Only the request itself is covered, so the caller can hold a per-host
+    slot (and time the host) for just this part; `wait_ready` does the rest.
+    With a profile the human pause before the navigation comes first.
+    """
+    if profile:
+        await page.wait_for_timeout(_pause(profile.pre_wait))
+    with _phase(metrics, "goto"):
+        return await page.goto(url, wait_until="commit")
+
+
+async def wait_ready(page, ready, profile: Optional[HumanProfile] = None, timeout: int = READY_TIMEOUT, metrics=None):
+    """After `navigate`, return once the `ready` predicate holds.
+
+    Without a profile nothing sleeps: the page is extracted as soon as the
+    content the extractor needs is in the DOM, or after `timeout` ms. A
+    timeout is not an error; the extractor then sees whatever is there.
+    With `metrics` (a CrawlMetrics) the DOM load, emulation and readiness
+    wait are timed as separate phases.
+    """
+    with _phase(metrics, "dom_loaded"):
+        await page.wait_for_load_state("domcontentloaded")
+    if profile:
+        with _phase(metrics, "emulation"):
+            if profile.mouse_move:
+                await page.mouse.move(random.randint(100, 500), random.randint(100, 500))
+            await page.wait_for_timeout(_pause(profile.post_goto_wait))
+            await page.evaluate(_SCROLL_JS, [profile.scroll_step, profile.scroll_interval, profile.scroll_budget])
+            await page.wait_for_timeout(_pause(profile.settle_wait))
+    try:
+        with _phase(metrics, "ready_wait"):
+            await page.wait_for_function(ready, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        if metrics:
+            metrics.count("ready_timeouts")
+        return False
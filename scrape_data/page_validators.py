@@ -0,0 +1,93 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from typing import Optional, Dict
+
+# Default store for the myresipi scrapers; the category crawler keeps its
+# validators next to its journal in crawl_state.db
+PAGE_VALIDATORS_FILE = "page_validators.db"
+
+NEW = "new"
+MODIFIED = "modified"
+UNCHANGED = "unchanged"
+
+
+def content_hash(details: Dict) -> str:
+    """Stable hash of extracted details.
+
+    The extracted fields are hashed rather than the raw HTML so that
+    per-request noise in the page (nonces, timestamps, ads) does not count
+    as a change.
+    """
+    canonical = json.dumps(details, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class PageValidators:
+    """Per-recipe_url HTTP validators (ETag/Last-Modified) plus a content hash.
+
+    Used by incremental re-crawls: a stored ETag/Last-Modified turns the next
+    fetch into a conditional request, and the content hash catches pages that
+    re-render identically without validator support.
+    """
+
+    def __init__(self, path: str = PAGE_VALIDATORS_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("pragma journal_mode=wal")
+        self.conn.execute(
+            """create table if not exists validators (
+                recipe_url text primary key,
+                etag text,
+                last_modified text,
+                content_hash text,
+                details text,
+                checked_at text
+            )"""
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get(self, recipe_url: str) -> Optional[Dict]:
+        row = self.conn.execute("select * from validators where recipe_url = ?", (recipe_url,)).fetchone()
+        if not row:
+            return None
+        return {
+            "etag": row["etag"],
+            "last_modified": row["last_modified"],
+            "content_hash": row["content_hash"],
+            "details": json.loads(row["details"]) if row["details"] else {}
+        }
+
+    def record(self, recipe_url: str, details: Dict, etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        """Store the latest validators and details; return NEW, MODIFIED or UNCHANGED."""
+        previous = self.get(recipe_url)
+        digest = content_hash(details)
+        if previous is None:
+            change = NEW
+        elif previous["content_hash"] == digest:
+            change = UNCHANGED
+        else:
+            change = MODIFIED
+
+        # Unchanged content (e.g. a 304) keeps any validators the response did not repeat
+        if change == UNCHANGED:
+            etag = etag or previous["etag"]
+            last_modified = last_modified or previous["last_modified"]
+
+        with self.conn:
+            self.conn.execute(
+                "insert or replace into validators (recipe_url, etag, last_modified, content_hash, details, checked_at) values (?, ?, ?, ?, ?, ?)",
+                (recipe_url, etag, last_modified, digest, json.dumps(details, ensure_ascii=False), datetime.now().isoformat())
+            )
+        return change
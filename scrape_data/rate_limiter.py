@@ -0,0 +1,184 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+from urllib.parse import urlparse
+
+# Requests per second per host: where a host starts, and the range it may move in
+DEFAULT_RATE = 2.0
+MIN_RATE = 0.2
+MAX_RATE = 8.0
+# Requests a host may receive back to back after being idle
+BURST = 2
+# Responses faster than this (seconds) let the rate creep up
+HEALTHY_LATENCY = 1.5
+# Additive increase per healthy response, multiplicative decrease on trouble
+RATE_INCREASE = 0.1
+RATE_DECREASE = 0.5
+# Exponential backoff bounds (seconds) for retries and throttled hosts
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+# Responses that mean "slow down"
+BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt: int, base: float = BASE_BACKOFF, cap: float = MAX_BACKOFF) -> float:
+    """Exponential backoff with equal jitter for the given 0-based attempt."""
+    ceiling = min(cap, base * (2 ** attempt))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class RequestOutcome:
+    """What the caller learned about one request, fed back to the limiter."""
+
+    def __init__(self):
+        self.status = None
+        self.error = False
+        self.retry_after = None
+
+    def report(self, status: Optional[int] = None, error: bool = False, retry_after: Optional[float] = None):
+        self.status = status
+        self.error = error
+        self.retry_after = retry_after
+
+
+class _HostBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        self.requests = 0
+        self.backoffs = 0
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket that adapts its rate to how the host responds.
+
+    Each host starts at `rate` requests per second. Healthy responses add
+    `increase` to the rate up to `max_rate`; a 429/5xx, a timeout or any
+    other failure multiplies it by `decrease` (down to `min_rate`) and
+    pauses the host for an exponentially growing, jittered backoff, or for
+    the server's Retry-After. Tokens are reserved when a wait is computed,
+    so concurrent asyncio callers queue up without a lock.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        burst: int = BURST,
+        healthy_latency: float = HEALTHY_LATENCY,
+        increase: float = RATE_INCREASE,
+        decrease: float = RATE_DECREASE,
+        base_backoff: float = BASE_BACKOFF,
+        max_backoff: float = MAX_BACKOFF
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.burst = max(1, burst)
+        self.healthy_latency = healthy_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._hosts = {}
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = _HostBucket(self.rate, self.burst)
+        return self._hosts[host]
+
+    def reserve(self, url: str) -> float:
+        """Take the host's next token and return how long to wait before using it."""
+        bucket = self._bucket(url)
+        now = time.monotonic()
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+        bucket.updated = now
+        bucket.requests += 1
+
+        wait = max(0.0, bucket.blocked_until - now)
+        if bucket.tokens < 1:
+            wait = max(wait, (1 - bucket.tokens) / bucket.rate)
+        # Going negative queues this caller behind earlier reservations
+        bucket.tokens -= 1
+        return wait
+
+    async def acquire(self, url: str):
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, url: str):
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, url: str, status: Optional[int] = None, latency: Optional[float] = None,
+               error: bool = False, retry_after: Optional[float] = None):
+        """Adjust the host's rate from one response (or failure)."""
+        bucket = self._bucket(url)
+        if error or status in BACKOFF_STATUSES:
+            bucket.failures += 1
+            bucket.backoffs += 1
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            pause = retry_after if retry_after is not None else backoff_delay(bucket.failures - 1, self.base_backoff, self.max_backoff)
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + pause)
+            # Drop any saved-up burst so the host is approached gently afterwards
+            bucket.tokens = min(bucket.tokens, 0.0)
+            return
+
+        bucket.failures = 0
+        if latency is None or latency <= self.healthy_latency:
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+        elif latency > 2 * self.healthy_latency:
+            # Slow but successful: ease off before the server starts refusing
+            bucket.rate = max(self.min_rate, bucket.rate * 0.9)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (0-based)."""
+        return backoff_delay(attempt, self.base_backoff, self.max_backoff)
+
+    @asynccontextmanager
+    async def track(self, url: str):
+        """Wait for a token, then time the block and record its outcome."""
+        await self.acquire(url)
+        outcome = RequestOutcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            outcome.report(error=True)
+            raise
+        finally:
+            self.record(url, outcome.status, time.monotonic() - started, outcome.error, outcome.retry_after)
+
+    @contextmanager
+    def track_sync(self, url: str):
+        """Sync counterpart of track."""
+        self.acquire_sync(url)
+        outcome = RequestOutcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            outcome.report(error=True)
+            raise
+        finally:
+            self.record(url, outcome.status, time.monotonic() - started, outcome.error, outcome.retry_after)
+
+    def stats(self):
+        return {
+            host: {"rate": round(bucket.rate, 2), "requests": bucket.requests, "backoffs": bucket.backoffs}
+            for host, bucket in self._hosts.items()
+        }
+
+    def print_stats(self, label="Rate limiter"):
+        for host, s in self.stats().items():
+            print(f"{label} {host}: {s['requests']} requests, {s['backoffs']} backoffs, ended at {s['rate']} req/s")
@@ -0,0 +1,163 @@
+import weakref
+from urllib.parse import urlparse
+
+# Request blocking levels for detail contexts
+POLICIES = ["off", "light", "strict"]
+DEFAULT_POLICY = "light"
+
+# Resource types the extractors never need: image_url is read from the
+# src/srcset attributes, not from the downloaded bytes
+LIGHT_BLOCKED_TYPES = {"image", "media", "font"}
+# Strict mode also drops styling; the extractors only read the DOM
+STRICT_BLOCKED_TYPES = LIGHT_BLOCKED_TYPES | {"stylesheet"}
+
+# Script URLs that are never needed to render recipe content
+TRACKER_PATTERNS = (
+    "analytics", "tracking", "advertisement", "googletagmanager", "google-analytics",
+    "doubleclick", "googlesyndication", "adservice", "facebook.net", "hotjar", "pixel"
+)
+
+# Rough transfer size of a blocked request, by resource type. Aborted requests
+# are never downloaded, so "bytes saved" is an estimate based on these figures.
+ESTIMATED_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 30_000,
+    "stylesheet": 20_000,
+    "script": 40_000
+}
+
+
+class ResourceUsage:
+    """Requests and bytes of one context since its last reset."""
+
+    def __init__(self):
+        self.host = None
+        self.reset()
+
+    def reset(self):
+        self.blocked = 0
+        self.blocked_bytes = 0
+        self.loaded = 0
+        self.loaded_bytes = 0
+
+    def snapshot(self):
+        return {
+            "requests_blocked": self.blocked,
+            "bytes_saved": self.blocked_bytes,
+            "requests_loaded": self.loaded,
+            "bytes_loaded": self.loaded_bytes
+        }
+
+
+def _kb(n):
+    return f"{n / 1024:.0f} KB"
+
+
+class ResourcePolicy:
+    """Request-interception policy for detail page contexts.
+
+    "light" aborts images, media, fonts, known tracker scripts and scripts
+    from other hosts; "strict" also aborts stylesheets and every script, for
+    pages whose content is fully server-rendered; "off" lets everything
+    through. Pass `install` as a PagePool's `setup`, and bracket each recipe
+    with `start(page)` / `finish(page)` to get its requests and bytes saved.
+    """
+
+    def __init__(self, name=DEFAULT_POLICY):
+        if name not in POLICIES:
+            raise ValueError(f"Unknown resource policy: {name}")
+        self.name = name
+        self.blocked_types = STRICT_BLOCKED_TYPES if name == "strict" else LIGHT_BLOCKED_TYPES
+        self.recipes = 0
+        self.total_blocked = 0
+        self.total_bytes_saved = 0
+        self._usage = weakref.WeakKeyDictionary()
+
+    @property
+    def enabled(self):
+        return self.name != "off"
+
+    def should_block(self, request, usage):
+        resource_type = request.resource_type
+        if resource_type in self.blocked_types:
+            return True
+        if resource_type == "script":
+            if self.name == "strict":
+                return True
+            url = request.url.lower()
+            if any(pattern in url for pattern in TRACKER_PATTERNS):
+                return True
+            # Third-party scripts (ads, widgets, embeds) are not part of the recipe
+            return usage.host is not None and urlparse(request.url).netloc != usage.host
+        return False
+
+    def _route_decision(self, route, usage):
+        request = route.request
+        if request.resource_type == "document" and request.is_navigation_request():
+            # The top-level document decides which scripts count as first-party
+            try:
+                if request.frame.parent_frame is None:
+                    usage.host = urlparse(request.url).netloc
+            except Exception:
+                pass
+        if self.should_block(request, usage):
+            usage.blocked += 1
+            usage.blocked_bytes += ESTIMATED_BYTES.get(request.resource_type, 0)
+            return False
+        return True
+
+    def _watch(self, context):
+        usage = ResourceUsage()
+        self._usage[context] = usage
+
+        def on_response(response):
+            usage.loaded += 1
+            try:
+                usage.loaded_bytes += int(response.headers.get("content-length", 0))
+            except ValueError:
+                pass
+
+        context.on("response", on_response)
+        return usage
+
+    async def install(self, context):
+        """PagePool setup hook."""
+        usage = self._watch(context)
+        if not self.enabled:
+            return
+
+        async def handle(route):
+            if self._route_decision(route, usage):
+                await route.continue_()
+            else:
+                await route.abort()
+
+        await context.route("**/*", handle)
+
+    def start(self, page):
+        """Reset the counters of the page's context before a recipe is loaded."""
+        usage = self._usage.get(page.context)
+        if usage is not None:
+            usage.reset()
+
+    def finish(self, page):
+        """Return {requests_blocked, bytes_saved, ...} for the recipe just loaded."""
+        usage = self._usage.get(page.context)
+        if usage is None:
+            return None
+        self.recipes += 1
+        self.total_blocked += usage.blocked
+        self.total_bytes_saved += usage.blocked_bytes
+        return usage.snapshot()
+
+    def format_usage(self, usage):
+        return (f"blocked {usage['requests_blocked']} requests (~{_kb(usage['bytes_saved'])} saved), "
+                f"loaded {usage['requests_loaded']} ({_kb(usage['bytes_loaded'])})")
+
+    def print_stats(self, label="Resource policy"):
+        if not self.recipes:
+            return
+        print(f"{label} '{self.name}': blocked {self.total_blocked} requests (~{_kb(self.total_bytes_saved)} saved) "
+              f"over {self.recipes} recipes, {self.total_blocked / self.recipes:.1f} requests "
+              f"(~{_kb(self.total_bytes_saved / self.recipes)}) per recipe")
@@ -0,0 +1,86 @@
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+def resolve_shards(shards: int) -> int:
+    """Number of worker processes for a --shards value; 0 means one per CPU core."""
+    return shards if shards > 0 else (os.cpu_count() or 1)
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Stable shard index for a key.
+
+    crc32 rather than hash(): the built-in string hash is salted per process,
+    so it would send the same URL to different shards in every worker and run.
+    """
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+def shard_path(path: Optional[str], index: int) -> Optional[str]:
+    """Per-shard variant of an output path: metrics.json -> metrics.shard0.json."""
+    if not path:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.shard{index}{ext}"
+
+
+def split_by_key(items: Sequence, shards: int, key: Callable) -> List[list]:
+    """Split items into `shards` lists by hashing key(item), keeping their order."""
+    buckets = [[] for _ in range(shards)]
+    for item in items:
+        buckets[shard_of(key(item), shards)].append(item)
+    return buckets
+
+
+def run_sharded(func: Callable, shard_args: Sequence[tuple]) -> List[Optional[object]]:
+    """Run func(*args) for every shard in its own process.
+
+    Results come back in shard order whatever finishes first, so merging
+    them is deterministic. A shard that crashes is reported and yields None
+    instead of taking the other shards' results down with it.
+    """
+    results = []
+    # Spawned, not forked: Playwright's driver and a running event loop do not survive a fork
+    with ProcessPoolExecutor(max_workers=len(shard_args), mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(func, *args) for args in shard_args]
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"\nShard {index + 1}/{len(shard_args)} failed: {str(e)}")
+                results.append(None)
+    return results
+
+
+def merge_by_owner(shard_lists: Sequence[List[Dict]], key: str = "recipe_url") -> List[Dict]:
+    """Merge per-shard copies of one ordered list into a single list.
+
+    Every shard of a URL-sharded crawl reads the same listing pages but only
+    fills in the recipes it owns. The merged list keeps the listing order and
+    takes each record from the shard that owns its key.
+    """
+    shards = len(shard_lists)
+    owned = {}
+    for index, records in enumerate(shard_lists):
+        for record in records:
+            if record.get(key) and shard_of(record[key], shards) == index:
+                owned[record[key]] = record
+
+    merged = []
+    seen = set()
+    for index, records in enumerate(shard_lists):
+        for record in records:
+            value = record.get(key)
+            if not value:
+                # Keyless records are identical in every shard, keep the first shard's
+                if index == 0:
+                    merged.append(record)
+                continue
+            if value in seen:
+                continue
+            seen.add(value)
+            merged.append(owned.get(value, record))
+    return merged
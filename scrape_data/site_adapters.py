@@ -0,0 +1,404 @@
+"""Per-site knowledge for the scraping engine.
+
+A SiteAdapter says how a recipe site paginates its category listings, how
+recipe cards are read from a listing page, which selectors mean a detail
+page is ready, and how details are extracted, both in the browser
+(`detail_script`, run with page.evaluate) and from static HTML
+(`parse_details`, the browser-free fast path). Everything else (pooling,
+concurrency, rate limiting, resource blocking, checkpointing) lives in
+engine.py and applies to every adapter. A new site is a new subclass
+registered in ADAPTERS. An adapter whose listing hooks have not been checked
+against the live site sets `experimental_listing`; the engine then only
+crawls its categories when CrawlSettings.experimental_listing is on, and
+its recipes are scraped from known URLs (scrape_recipes) instead.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from http_extractor import parse_resepichenom_details, parse_myresipi_details
+from page_readiness import RESEPICHENOM_READY, MYRESIPI_READY, READY_TIMEOUT
+
+# The pre-refactor myresipi scrapers sent these instead of the pool defaults
+MYRESIPI_CONTEXT_OPTIONS = {
+    "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    "viewport": {'width': 1920, 'height': 1080},
+    "extra_http_headers": {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Sec-Ch-Ua': '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+        'Sec-Ch-Ua-Mobile': '?0',
+        'Sec-Ch-Ua-Platform': '"Windows"',
+        'Upgrade-Insecure-Requests': '1',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive'
+    }
+}
+
+RESEPICHENOM_DETAIL_JS = '''() => {
+    const result = {};
+    const base_domain = "https://resepichenom.com";
+    
+    //================ Extract Image URL ======================
+    const imgElement = document.querySelector('img[alt]');
+    if(imgElement) {
+        let src = imgElement.getAttribute('src');
+        
+        if (src.startsWith('http')) {
+            result.image_url = src;
+        } else {
+            result.image_url = base_domain + (src.startsWith('/') ? src : '/' + src);
+        }
+    } else {
+        result.image_url = null;
+    }
+    
+    // Extract timing and serving information
+    const texts = ['Masa Penyediaan', 'Masa Memasak', 'Jumlah Masa', 'Hidangan'];
+    texts.forEach(text => {
+        const elements = Array.from(document.querySelectorAll('p')).filter(p => 
+            p.textContent.trim() === text
+        );
+        if(elements.length > 0) {
+            const valueElement = elements[0].parentElement.querySelector('p.font-semibold');
+            if(valueElement) {
+                result[text.toLowerCase().replace(' ', '_')] = valueElement.textContent.trim();
+            }
+        }
+    });
+    
+    //====================== Extract ingredients sections==============================================================
+    result.ingredients = {};
+    
+    // Find the main ingredients container with title "Bahan-bahan"
+    const ingredientsSection = Array.from(document.querySelectorAll('div.font-semibold')).find(
+        div => div.textContent.trim() === 'Bahan-bahan'
+    );
+    
+    if (ingredientsSection) {
+        // Get the parent container that contains all ingredients
+        const ingredientsContainer = ingredientsSection.closest('div.rounded-xl');
+        
+        if (ingredientsContainer) {
+            // Find all h4 headers within this container
+            const headers = Array.from(ingredientsContainer.querySelectorAll('h4.font-medium'));
+            
+            headers.forEach(header => {
+                const sectionName = header.textContent.trim();
+                let ingredientsList = [];
+                
+                // Find the ul element that follows this header
+                const ul = header.nextElementSibling;
+                if (ul && ul.tagName === 'UL') {
+                    ingredientsList = Array.from(ul.querySelectorAll('li')).map(li => {
+                        // Get the last span which contains the ingredient text
+                        const span = li.querySelector('span:last-child');
+                        return span ? span.textContent.trim() : li.textContent.trim();
+                    }).filter(text => text);
+                }
+                
+                if (ingredientsList.length > 0) {
+                    result.ingredients[sectionName] = ingredientsList;
+                }
+            });
+        }
+    }
+    
+    //====================== Extract cooking instructions==============================================================
+    result.instructions = {};
+    
+    // Find the main instructions container with title "Cara Memasak"
+    const instructionsSection = Array.from(document.querySelectorAll('div.font-semibold')).find(
+        div => div.textContent.trim() === 'Cara Memasak'
+    );
+    
+    if (instructionsSection) {
+        // Get the parent container that contains all instructions
+        const instructionsContainer = instructionsSection.closest('div.rounded-xl');
+        
+        if (instructionsContainer) {
+            // Find all h4 headers within this container
+            const headers = Array.from(instructionsContainer.querySelectorAll('h4.font-medium'));
+            
+            headers.forEach(header => {
+                const sectionName = header.textContent.trim();
+                let instructionsList = [];
+                
+                // Find the ol element that follows this header
+                const ol = header.nextElementSibling;
+                if (ol && ol.tagName === 'OL') {
+                    instructionsList = Array.from(ol.querySelectorAll('li')).map(li => {
+                        // Get the last span which contains the instruction text
+                        const span = li.querySelector('span.flex-1');
+                        return span ? span.textContent.trim() : li.textContent.trim();
+                    }).filter(text => text);
+                }
+                
+                if (instructionsList.length > 0) {
+                    result.instructions[sectionName] = instructionsList;
+                }
+            });
+        }
+    }
+    
+    //====================== Extract Tips & Guides==============================================================
+    result.tips_and_guides = [];
+    
+    // Find the tips section with title "Petua & Panduan"
+    const tipsSection = Array.from(document.querySelectorAll('div.text-2xl.font-bold')).find(
+        div => div.textContent.includes('Petua & Panduan')
+    );
+    
+    if (tipsSection) {
+        // Get the parent container and find the ul element
+        const tipsContainer = tipsSection.closest('div.rounded-xl');
+        
+        if (tipsContainer) {
+            const tipsList = tipsContainer.querySelector('ul');
+            if (tipsList) {
+                result.tips_and_guides = Array.from(tipsList.querySelectorAll('li')).map(li => {
+                    // Get the text content from the span with class text-gray-700
+                    const tipSpan = li.querySelector('span.text-gray-700');
+                    return tipSpan ? tipSpan.textContent.trim() : li.textContent.trim();
+                }).filter(text => text);
+            }
+        }
+    }
+    
+    return result;
+}'''
+
+MYRESIPI_DETAIL_JS = '''() => {
+    const result = {};
+    const contentDiv = document.querySelector('div.fusion-content-tb');
+    if (!contentDiv) return result;
+
+    // Get the title
+    const titleElement = contentDiv.querySelector('h3');
+    result.title = titleElement ? titleElement.textContent.trim() : '';
+
+    // Get the image URL from the p tag after h3 title
+    const h3Element = contentDiv.querySelector('h3');
+    if (h3Element) {
+        const pElement = h3Element.nextElementSibling;
+        if (pElement && pElement.tagName === 'P') {
+            const imgElement = pElement.querySelector('img[srcset]');
+            if (imgElement) {
+                const srcset = imgElement.getAttribute('srcset');
+                // Get the highest resolution image URL (last one in srcset)
+                const urls = srcset.split(',').map(s => s.trim().split(' ')[0]);
+                result.image_url = urls[urls.length - 1];
+            }
+        }
+    }
+
+    // Get ingredients
+    result.ingredients = {};
+    let currentElement = contentDiv.querySelector('h3').nextElementSibling;
+    while (currentElement) {
+        // Stop if we reach the instructions section
+        if (currentElement.tagName === 'P' && currentElement.querySelector('strong') && 
+            currentElement.querySelector('strong').textContent.trim().toLowerCase().startsWith('cara')) {
+            break;
+        }
+
+        // Check if the current element is a strong tag with "Bahan-bahan"
+        if (currentElement.tagName === 'P' && currentElement.querySelector('strong')) {
+            const header = currentElement.querySelector('strong').textContent.trim();
+            if (header.toLowerCase().includes('bahan')) {
+                const ingredients = [];
+                let nextElement = currentElement.nextElementSibling;
+
+                // Collect all ingredients from ul/ol lists
+                while (nextElement && (nextElement.tagName === 'UL' || nextElement.tagName === 'OL')) {
+                    ingredients.push(...Array.from(nextElement.querySelectorAll('li')).map(
+                        li => li.textContent.trim()
+                    ));
+                    nextElement = nextElement.nextElementSibling;
+                }
+
+                // Add ingredients to the result
+                if (ingredients.length > 0) {
+                    result.ingredients[header] = ingredients;
+                }
+            }
+        }
+
+        currentElement = currentElement.nextElementSibling;
+    }
+
+    // Get instructions
+    const instructions = [];
+    const instructionsHeaders = Array.from(contentDiv.querySelectorAll('p strong')).filter(
+        el => el.textContent.trim().toLowerCase().startsWith('cara')
+    );
+    if (instructionsHeaders.length > 0) {
+        for (const header of instructionsHeaders) {
+            let currentElement = header.closest('p').nextElementSibling;
+            while (currentElement) {
+                if (currentElement.tagName === 'OL' || currentElement.tagName === 'UL') {
+                    // Append all steps from the list
+                    instructions.push(...Array.from(currentElement.querySelectorAll('li')).map(
+                        li => li.textContent.trim()
+                    ));
+                } else if (currentElement.tagName === 'P' && /\\d+\\./.test(currentElement.textContent.trim())) {
+                    // Append steps from p tags containing numbers (e.g., "1.", "2.")
+                    instructions.push(currentElement.textContent.trim());
+                }
+                currentElement = currentElement.nextElementSibling;
+            }
+        }
+    }
+
+    // Case 2: Instructions in p tags containing numbers (e.g., "1.", "2.")
+    if (instructions.length === 0) {
+        const instructionElements = contentDiv.querySelectorAll('p');
+        instructionElements.forEach(el => {
+            const text = el.textContent.trim();
+            if (/\\d+\\./.test(text)) {  // Check if the text contains a number followed by a dot
+                instructions.push(text);
+            }
+        });
+    }
+
+    result.instructions = instructions;
+
+    return result;
+}'''
+
+MYRESIPI_LISTING_JS = '''() => {
+    const articles = document.querySelectorAll('article.fusion-post-grid');
+    return Array.from(articles).map(article => {
+        const linkElement = article.querySelector('h2.blog-shortcode-post-title a');
+        return linkElement ? [linkElement.textContent.trim(), linkElement.href] : null;
+    }).filter(item => item !== null);
+}'''
+
+MYRESIPI_TOTAL_PAGES_JS = '''() => {
+    const numbers = Array.from(document.querySelectorAll('.pagination a, .pagination span'))
+        .map(el => parseInt(el.textContent.trim(), 10))
+        .filter(n => !isNaN(n));
+    return numbers.length ? Math.max(...numbers) : 1;
+}'''
+
+
+class SiteAdapter(ABC):
+    """Base class; subclasses set the class attributes and implement the abstract hooks."""
+    name = None
+    host = None
+    # JS predicate that holds once a detail page has what detail_script reads
+    ready = None
+    # JS function returning the details dict
+    detail_script = None
+    # Browser context options for detail pages; None uses the pool defaults
+    context_options = None
+    # Listing hooks not verified against the live site
+    experimental_listing = False
+
+    def matches(self, url: str) -> bool:
+        return urlparse(url).netloc.endswith(self.host)
+
+    @abstractmethod
+    def parse_details(self, html: str) -> Dict[str, Any]:
+        """Static-HTML counterpart of detail_script."""
+
+    @abstractmethod
+    def listing_page_url(self, category_url: str, page_number: int) -> str:
+        """URL of page `page_number` (from 1) of a category listing."""
+
+    async def read_total_pages(self, page) -> int:
+        """Number of listing pages, read from a category's first page."""
+        return 1
+
+    @abstractmethod
+    async def read_listing(self, page) -> List[Tuple[str, Optional[str]]]:
+        """(title, recipe_url) for every recipe card on a loaded listing page."""
+
+
+class ResepichenomAdapter(SiteAdapter):
+    name = "resepichenom"
+    host = "resepichenom.com"
+    ready = RESEPICHENOM_READY
+    detail_script = RESEPICHENOM_DETAIL_JS
+
+    def parse_details(self, html):
+        return parse_resepichenom_details(html)
+
+    def listing_page_url(self, category_url, page_number):
+        return f"{category_url}?page={page_number}"
+
+    async def read_total_pages(self, page):
+        """Extract the total number of pages from the pagination section."""
+        try:
+            await page.wait_for_selector("span.text-sm.text-gray-600", timeout=READY_TIMEOUT)
+        except Exception:
+            return 1  # Single-page categories have no pagination
+        try:
+            # Find the span containing page information
+            page_info = await page.query_selector("span.text-sm.text-gray-600")
+            if page_info:
+                text = await page_info.inner_text()
+                # Extract total pages from text like "Halaman 1 / 10"
+                return int(text.split('/')[-1].strip())
+        except Exception as e:
+            print(f"Error getting total pages: {str(e)}")
+        return 1
+
+    async def read_listing(self, page):
+        await page.wait_for_selector("h2", timeout=READY_TIMEOUT)
+
+        cards = []
+        title_elements = await page.query_selector_all("h2")
+        for element in title_elements:
+            try:
+                title = await element.inner_text()
+
+                # Get the recipe URL
+                recipe_url = await element.evaluate('node => node.closest("a")?.href')
+                cards.append((title.strip(), recipe_url))
+            except Exception as e:
+                print(f"\nError processing recipe: {str(e)}")
+                continue
+        return cards
+
+
+class MyresipiAdapter(SiteAdapter):
+    name = "myresipi"
+    host = "myresipi.com"
+    ready = MYRESIPI_READY
+    detail_script = MYRESIPI_DETAIL_JS
+    context_options = MYRESIPI_CONTEXT_OPTIONS
+    # The card selectors are those of Step1_GetRecipeTitles.py; the page
+    # count and /page/N/ URLs past page 2 are guesses at the WordPress theme
+    experimental_listing = True
+
+    def parse_details(self, html):
+        return parse_myresipi_details(html)
+
+    def listing_page_url(self, category_url, page_number):
+        # WordPress pagination: /category/resipi/, /category/resipi/page/2/, ...
+        if page_number == 1:
+            return category_url
+        return f"{category_url.rstrip('/')}/page/{page_number}/"
+
+    async def read_total_pages(self, page):
+        try:
+            return await page.evaluate(MYRESIPI_TOTAL_PAGES_JS)
+        except Exception as e:
+            print(f"Error getting total pages: {str(e)}")
+            return 1
+
+    async def read_listing(self, page):
+        await page.wait_for_selector("article.fusion-post-grid", timeout=READY_TIMEOUT)
+        return [tuple(card) for card in await page.evaluate(MYRESIPI_LISTING_JS)]
+
+
+ADAPTERS = {adapter.name: adapter for adapter in (ResepichenomAdapter(), MyresipiAdapter())}
+
+
+def adapter_for_url(url: str) -> SiteAdapter:
+    """Adapter whose host serves `url`."""
+    for adapter in ADAPTERS.values():
+        if adapter.matches(url):
+            return adapter
+    raise ValueError(f"No site adapter for {url}")
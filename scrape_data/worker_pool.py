@@ -0,0 +1,92 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from rate_limiter import RequestOutcome
+
+# Sentinel pushed once per worker to tell it the queue is closed
+_DONE = object()
+
+
+class HostPoliteness:
+    """Per-host politeness: caps in-flight requests and spaces out request starts.
+
+    With a `limiter` (an AdaptiveRateLimiter) request starts follow its
+    adaptive per-host rate instead of the fixed `min_delay`, and `slot()`
+    yields a RequestOutcome the caller can fill in with the response status.
+    """
+
+    def __init__(self, max_per_host: int = 2, min_delay: float = 1.0, limiter=None):
+        self.max_per_host = max_per_host
+        self.min_delay = min_delay
+        self.limiter = limiter
+        self._semaphores = {}
+        self._locks = {}
+        self._last_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold one of the host's request slots for the duration of the block."""
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+
+        async with semaphore:
+            if self.limiter:
+                async with self.limiter.track(url) as outcome:
+                    yield outcome
+                return
+
+            lock = self._locks.setdefault(host, asyncio.Lock())
+            # Serialise the start times so requests to one host are spaced by min_delay
+            async with lock:
+                wait = self._last_start.get(host, 0.0) + self.min_delay - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[host] = time.monotonic()
+            yield RequestOutcome()
+
+
+class WorkerPool:
+    """Bounded pool of async workers draining a shared queue.
+
+    Producers call `put()` as work is discovered; `close()` waits until every
+    queued item has been handled and the workers have exited.
+    """
+
+    def __init__(self, handler, concurrency: int = 4, maxsize: int = 0):
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.queue = asyncio.Queue(maxsize)
+        self._workers = []
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        return self
+
+    async def put(self, item):
+        await self.queue.put(item)
+
+    async def close(self):
+        for _ in self._workers:
+            await self.queue.put(_DONE)
+        await asyncio.gather(*self._workers)
+        self._workers = []
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            try:
+                if item is _DONE:
+                    return
+                await self.handler(item)
+            except Exception as e:
+                print(f"\nWorker error: {str(e)}")
+            finally:
+                self.queue.task_done()
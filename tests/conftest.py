@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The pipeline folders are flat script directories whose modules import each other by plain name
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("cleaning_data", "embeddings"):
+    sys.path.insert(0, os.path.join(REPO_DIR, folder))
@@ -0,0 +1,70 @@
+from batch_embeddings import BatchEmbedder, estimate_tokens
+from fake_embeddings import FakeEmbeddingClient, fake_embedding
+
+TEXTS = [
+    "ayam, serai, santan",
+    "telur, bawang, cili",
+    "ikan siakap, tomato, sos cili",
+    "udang, asam gelugor",
+    "daging, kicap manis, halia",
+    "sotong, cili padi",
+    "kentang, lobak merah",
+    "tauhu, taugeh, kicap",
+]
+
+
+def test_results_are_mapped_back_by_index_when_shuffled():
+    # The same seed answers this request out of order
+    response = FakeEmbeddingClient(seed=3).embeddings.create(model="m", input=TEXTS)
+    assert [item.index for item in response.data] != list(range(len(TEXTS)))
+
+    client = FakeEmbeddingClient(seed=3)
+    vectors = BatchEmbedder(client).embed(TEXTS)
+
+    assert client.calls == [len(TEXTS)]
+    assert vectors == [fake_embedding(text) for text in TEXTS]
+
+
+def test_identical_texts_are_embedded_once():
+    client = FakeEmbeddingClient()
+    vectors = BatchEmbedder(client).embed([TEXTS[0], TEXTS[1], TEXTS[0], "", TEXTS[1]])
+
+    assert client.calls == [2]
+    assert vectors[0] == vectors[2] == fake_embedding(TEXTS[0])
+    assert vectors[1] == vectors[4] == fake_embedding(TEXTS[1])
+    assert vectors[3] is None
+
+
+def test_batches_respect_the_item_budget():
+    client = FakeEmbeddingClient()
+    vectors = BatchEmbedder(client, max_items=3).embed(TEXTS)
+
+    assert client.calls == [3, 3, 2]
+    assert vectors == [fake_embedding(text) for text in TEXTS]
+
+
+def test_batches_respect_the_token_budget():
+    texts = [f"bahan {i:02d}" for i in range(6)]
+    # Room for exactly two of these equally long texts per request
+    budget = 2 * estimate_tokens(texts[0])
+    client = FakeEmbeddingClient()
+    vectors = BatchEmbedder(client, max_tokens=budget).embed(texts)
+
+    assert client.calls == [2, 2, 2]
+    assert vectors == [fake_embedding(text) for text in texts]
+
+
+def test_only_the_failing_half_is_split_until_the_bad_input_is_alone():
+    bad = TEXTS[0]
+    client = FakeEmbeddingClient(reject=[bad])
+    embedder = BatchEmbedder(client)
+    vectors = embedder.embed(TEXTS)
+
+    # 8 fails -> 4 with the bad input fails -> 2 fails -> the bad input alone fails;
+    # its neighbour and the healthy halves are each sent once
+    assert client.calls == [8, 4, 2, 1, 1, 2, 4]
+    assert vectors[0] is None
+    assert vectors[1:] == [fake_embedding(text) for text in TEXTS[1:]]
+    assert embedder.failed == 1
+    # A 400 is not retried as such, it is only split
+    assert embedder.retries == 0
@@ -0,0 +1,105 @@
+from batch_embeddings import BatchEmbedder
+from bulk_loader import load_recipes
+from fake_embeddings import FakeEmbeddingClient
+from memory_store import MemoryStorageClient, MemoryStoreError
+
+
+def recipe(n, title=None):
+    return {
+        'title': title or f"Resepi {n}",
+        'recipe_url': f"https://resepichenom.com/resepi/resepi-{n}",
+        'details': {
+            'ingredients': {'Bahan-bahan': [f"{n} biji telur"]},
+            'instructions': ["Goreng."],
+            'main_ingredients': ["telur", f"bahan {n}"]
+        }
+    }
+
+
+def embedder():
+    return BatchEmbedder(FakeEmbeddingClient(dimensions=8))
+
+
+class FailingStore(MemoryStorageClient):
+    """Fails every upsert into `table` that touches the recipe whose main ingredients include `marker`."""
+
+    def __init__(self, table, marker):
+        super().__init__()
+        self.fail_table = table
+        self.marker = marker
+
+    def _execute(self, query):
+        if query.table == self.fail_table and query.action == "upsert" and any(
+            self.marker in row.get('main_ingredients', []) or self.marker in row.get('ingredients', {}).get('Bahan-bahan', [])
+            for row in query.rows
+        ):
+            raise MemoryStoreError("canceling statement due to statement timeout", "57014")
+        return super()._execute(query)
+
+
+def test_loading_the_same_recipes_twice_updates_instead_of_duplicating():
+    client = MemoryStorageClient()
+    recipes = [recipe(n) for n in range(5)]
+
+    first = load_recipes(client, recipes, embedder(), chunk_size=2)
+    ids = {row['recipe_url']: row['id'] for row in client.rows('recipes')}
+    second = load_recipes(client, recipes, embedder(), chunk_size=2)
+
+    assert (first.recipes, first.embeddings) == (second.recipes, second.embeddings) == (5, 5)
+    assert len(client.rows('recipes')) == 5
+    assert len(client.rows('recipe_embeddings')) == 5
+    assert {row['recipe_url']: row['id'] for row in client.rows('recipes')} == ids
+    assert sorted(row['recipe_id'] for row in client.rows('recipe_embeddings')) == sorted(ids.values())
+
+
+def test_duplicate_urls_in_one_load_keep_the_last_recipe_read():
+    client = MemoryStorageClient()
+    recipes = [recipe(1, "Telur Dadar"), recipe(2), recipe(1, "Telur Dadar Pedas")]
+
+    report = load_recipes(client, recipes, embedder(), chunk_size=10)
+
+    assert not report.failures
+    assert report.recipes == 2
+    titles = sorted(row['title'] for row in client.rows('recipes'))
+    assert titles == ["Resepi 2", "Telur Dadar Pedas"]
+    assert len(client.rows('recipe_embeddings')) == 2
+
+
+def test_chunk_failing_at_the_recipes_stage_is_reported_and_the_rest_load():
+    recipes = [recipe(n) for n in range(6)]
+    # Chunks of two: recipes 2 and 3 make up chunk 2
+    client = FailingStore('recipes', "2 biji telur")
+
+    report = load_recipes(client, recipes, embedder(), chunk_size=2)
+
+    assert [(number, stage) for number, stage, _, _ in report.failures] == [(2, "recipes")]
+    assert report.failed_urls == [recipes[2]['recipe_url'], recipes[3]['recipe_url']]
+    assert (report.recipes, report.embeddings) == (4, 4)
+    assert len(client.rows('recipes')) == 4
+    assert len(client.rows('recipe_embeddings')) == 4
+
+
+def test_chunk_failing_at_the_embeddings_stage_is_reported_and_the_rest_load():
+    recipes = [recipe(n) for n in range(6)]
+    client = FailingStore('recipe_embeddings', "bahan 5")
+
+    report = load_recipes(client, recipes, embedder(), chunk_size=2)
+
+    assert [(number, stage) for number, stage, _, _ in report.failures] == [(3, "recipe_embeddings")]
+    assert report.failed_urls == [recipes[4]['recipe_url'], recipes[5]['recipe_url']]
+    # The recipes of the failed chunk were written; only their embeddings are missing
+    assert (report.recipes, report.embeddings) == (6, 4)
+    assert len(client.rows('recipes')) == 6
+    assert len(client.rows('recipe_embeddings')) == 4
+
+
+def test_recipes_without_a_title_fall_back_to_their_url():
+    client = MemoryStorageClient()
+    untitled, unembeddable = recipe(1), recipe(2)
+    del untitled['title'], unembeddable['title']
+    unembeddable['details']['main_ingredients'] = []
+
+    report = load_recipes(client, [untitled, unembeddable], embedder())
+
+    assert report.skipped == [(unembeddable['recipe_url'], "no embedding")]
+    assert [row['title'] for row in client.rows('recipes')] == [untitled['recipe_url']]
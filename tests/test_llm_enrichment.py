@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("openai")
+
+from llm_enrichment import MainIngredientExtractor, make_client
+from stub_model_server import StubModelServer, main_ingredient
+
+RECIPES = [
+    {"Bahan-bahan": ["2 ulas bawang putih", "1 sudu besar kicap manis"]},
+    {"Bahan-bahan": ["500 gram ayam", "3 batang serai"], "Kuah": ["1 cawan santan"]},
+    {"Bahan-bahan": ["4 biji telur", "1/2 sudu kecil garam"]},
+    {"Bahan-bahan": ["1 ekor ikan siakap", "2 helai daun kari"]},
+    {"Bahan-bahan": ["200 gram udang", "2 keping asam gelugor"]},
+]
+
+
+def expected(recipe):
+    return [main_ingredient(line) for lines in recipe.values() for line in lines]
+
+
+def extract(stub, recipes, **options):
+    # local_parser=False so every line reaches the stub model
+    extractor = MainIngredientExtractor(make_client(stub.base_url), local_parser=False, **options)
+    return extractor, asyncio.run(extractor.extract_many(recipes))
+
+
+def test_batched_answer_is_split_back_into_recipes():
+    with StubModelServer() as stub:
+        extractor, results = extract(stub, RECIPES, batch_size=5)
+
+    assert results == [expected(recipe) for recipe in RECIPES]
+    # One JSON-mode request for the whole batch, no single-recipe fallbacks
+    assert stub.requests == 1
+    assert stub.recipes == len(RECIPES)
+
+
+def test_rate_limited_requests_are_retried_after_retry_after():
+    with StubModelServer(rate_limit_rate=0.5, retry_after=0.05, seed=1) as stub:
+        started = time.perf_counter()
+        extractor, results = extract(stub, RECIPES, batch_size=1, concurrency=1, max_retries=20)
+        elapsed = time.perf_counter() - started
+
+    assert results == [expected(recipe) for recipe in RECIPES]
+    assert stub.rate_limited > 0
+    assert extractor.retries == stub.rate_limited
+    assert stub.requests == len(RECIPES) + stub.rate_limited
+    # Requests run one at a time, so every Retry-After was waited out in turn
+    assert elapsed >= 0.05 * stub.rate_limited
+
+
+def test_malformed_batch_items_fall_back_to_single_recipe_requests():
+    with StubModelServer(malformed_rate=1.0) as stub:
+        extractor, results = extract(stub, RECIPES[:3], batch_size=3)
+
+    assert results == [expected(recipe) for recipe in RECIPES[:3]]
+    assert stub.malformed == 3
+    # The batch request plus one plain request per recipe it failed to answer
+    assert stub.requests == 1 + 3